@@ -0,0 +1,66 @@
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# ---------------------------------------------------------
+# PATHS (same layout trick as streamlit_app.py)
+# ---------------------------------------------------------
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT_DIR / "src"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.append(str(SRC_DIR))
+
+
+# ---------------------------------------------------------
+# STATS HELPERS
+# ---------------------------------------------------------
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict:
+    """Latency summary in milliseconds plus ops/sec over the wall-clock run."""
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3) if samples else 0.0,
+        "throughput_ops": round(len(samples) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def timed_call(samples: List[float], fn, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        samples.append(time.perf_counter() - start)
+
+
+# ---------------------------------------------------------
+# RESULTS FILES
+# ---------------------------------------------------------
+def write_results(name: str, payload: Dict, out_dir: Path = RESULTS_DIR) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = out_dir / f"{name}-{stamp}.json"
+    payload = dict(payload)
+    payload.setdefault("meta", {}).update({
+        "python": sys.version.split()[0],
+        "pid": os.getpid(),
+        "timestamp": stamp,
+    })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
@@ -0,0 +1,256 @@
+"""
+Micro-benchmarks for the QuizEngine hot path (backend/logic.py).
+
+Covers engine construction for several bank sizes, simulated answer cycles
+(get_current_question -> check_answer -> next_question) and history growth /
+memory per session.
+
+    python benchmarks/bench_engine.py                 # run and compare to baseline
+    python benchmarks/bench_engine.py --save-baseline # refresh stored baseline
+
+The baseline lives in benchmarks/baselines/engine.json. A metric that gets
+slower (or bigger) than the baseline by more than --tolerance is reported as
+a regression and the script exits non-zero.
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from _common import summarize, write_results
+
+from backend.logic import HistoryRecord, QuizEngine
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "engine.json"
+BANK_SIZES = [10, 100, 1000, 10000]
+
+
+# ---------------------------------------------------------
+# SYNTHETIC BANKS
+# ---------------------------------------------------------
+def make_bank(size: int) -> List[Dict]:
+    rng = random.Random(size)
+    bank = []
+    for i in range(size):
+        options = [f"{i}-{k}" for k in range(4)]
+        bank.append({
+            "id": f"BENCH_Q{i}",
+            "question": f"Benchmark question number {i}: pick option {i % 4}",
+            "options": options,
+            "answer": options[i % 4],
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "hints": ["First hint.", "Second hint."],
+            "explanation": "Synthetic item used for benchmarking.",
+            "tts_text": f"Benchmark question number {i}",
+        })
+    return bank
+
+
+class BankEngine(QuizEngine):
+    """QuizEngine that reads its bank from an arbitrary JSON file."""
+
+    bank_path: Path = None
+
+    def load_questions(self):
+        with open(self.bank_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def engine_for(bank_path: Path) -> QuizEngine:
+    BankEngine.bank_path = bank_path
+    return BankEngine("standard", "math")
+
+
+# ---------------------------------------------------------
+# BENCHMARKS
+# ---------------------------------------------------------
+def bench_construction(tmp_dir: Path, repeat: int) -> Dict:
+    results = {}
+    for size in BANK_SIZES:
+        path = tmp_dir / f"bank_{size}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(make_bank(size), f)
+
+        samples = []
+        start = time.perf_counter()
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            engine_for(path)
+            samples.append(time.perf_counter() - t0)
+        results[str(size)] = summarize(samples, time.perf_counter() - start)
+
+    samples = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        QuizEngine("standard", "math")
+        samples.append(time.perf_counter() - t0)
+    results["builtin_math"] = summarize(samples, time.perf_counter() - start)
+    return results
+
+
+def answer_cycles(engine: QuizEngine, cycles: int, rng: random.Random) -> List[float]:
+    samples = []
+    n = len(engine.questions)
+    for i in range(cycles):
+        if engine.current_index >= n:
+            engine.current_index = 0
+        t0 = time.perf_counter()
+        q = engine.get_current_question()
+        choice = q["answer"] if rng.random() < 0.7 else q["options"][0]
+        engine.check_answer(choice)
+        engine.next_question()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def bench_answer_cycles(tmp_dir: Path, cycles: int) -> Dict:
+    engine = engine_for(tmp_dir / "bank_100.json")
+    start = time.perf_counter()
+    samples = answer_cycles(engine, cycles, random.Random(0))
+    return summarize(samples, time.perf_counter() - start)
+
+
+def bench_history_memory(tmp_dir: Path, cycles: int) -> Dict:
+    engine = engine_for(tmp_dir / "bank_100.json")
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    answer_cycles(engine, cycles, random.Random(1))
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "records": len(engine.history),
+        "history_bytes": after - before,
+        "bytes_per_record": round((after - before) / max(len(engine.history), 1), 1),
+        "peak_bytes": peak,
+    }
+
+
+def _legacy_record(q: Dict, selected: str) -> Dict:
+    # the per-answer dict check_answer used to append
+    return {
+        "id": q.get("id"),
+        "question": q["question"],
+        "subject": "math",
+        "mode": "standard",
+        "selected": selected,
+        "correct": selected == q["answer"],
+        "correct_answer": q["answer"],
+        "difficulty": q.get("difficulty", "unknown"),
+        "time_taken": 3.21,
+        "points": 100,
+    }
+
+
+def _slotted_record(q: Dict, selected: str) -> HistoryRecord:
+    return HistoryRecord(q, "math", "standard", selected, selected == q["answer"], 3.21, 100)
+
+
+def bench_history_layouts(count: int) -> Dict:
+    """Bytes per record for the old dict layout vs HistoryRecord, same answers."""
+    bank = make_bank(100)
+    results = {}
+    for name, build in (("dict", _legacy_record), ("slotted", _slotted_record)):
+        # selections arrive as fresh strings from the UI, not the bank's objects
+        answers = [("" + bank[i % 100]["options"][i % 4] + " ")[:-1] for i in range(count)]
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        records = [build(bank[i % 100], answers[i]) for i in range(count)]
+        del answers
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[f"{name}_bytes_per_record"] = round((after - before) / count, 1)
+        del records
+    results["saved_pct"] = round(
+        100 * (1 - results["slotted_bytes_per_record"] / results["dict_bytes_per_record"]), 1
+    )
+    return results
+
+
+# ---------------------------------------------------------
+# BASELINE COMPARISON
+# ---------------------------------------------------------
+def flatten(results: Dict) -> Dict[str, float]:
+    """Metrics where smaller is better, keyed by a dotted path."""
+    flat = {}
+    for size, stats in results["construction"].items():
+        flat[f"construction.{size}.p50_ms"] = stats["p50_ms"]
+    flat["answer_cycles.p50_ms"] = results["answer_cycles"]["p50_ms"]
+    flat["answer_cycles.p99_ms"] = results["answer_cycles"]["p99_ms"]
+    flat["history.bytes_per_record"] = results["history"]["bytes_per_record"]
+    return flat
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    base = flatten(baseline)
+    for key, value in flatten(current).items():
+        ref = base.get(key)
+        if ref and value > ref * (1 + tolerance):
+            regressions.append(f"{key}: {value} vs baseline {ref} (+{(value / ref - 1) * 100:.0f}%)")
+    return regressions
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="signsense-banks-") as tmp:
+        tmp_dir = Path(tmp)
+        results = {
+            "config": vars(args),
+            "construction": bench_construction(tmp_dir, args.repeat),
+            "answer_cycles": bench_answer_cycles(tmp_dir, args.cycles),
+            "history": bench_history_memory(tmp_dir, args.cycles),
+            "history_layouts": bench_history_layouts(args.cycles),
+        }
+
+    for size, stats in results["construction"].items():
+        print(f"construction[{size}]".ljust(28), f"p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms")
+    stats = results["answer_cycles"]
+    print("answer cycle".ljust(28), f"p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms "
+          f"{stats['throughput_ops']} cycles/s")
+    print("history".ljust(28), f"{results['history']['bytes_per_record']} bytes/record")
+    layouts = results["history_layouts"]
+    print("history layouts".ljust(28), f"dict={layouts['dict_bytes_per_record']} "
+          f"slotted={layouts['slotted_bytes_per_record']} bytes/record "
+          f"({layouts['saved_pct']}% saved)")
+    print(f"Results written to {write_results('engine', results)}")
+
+    if args.save_baseline:
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return
+
+    if not BASELINE_PATH.exists():
+        print("No baseline stored yet; run with --save-baseline.")
+        return
+
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Cold-start import benchmark for streamlit_app.py, driven by `python -X importtime`.
+
+Each sample is a fresh interpreter that imports streamlit first (a worker
+already has it loaded) and then the app, optionally followed by the module
+behind one page. The cost reported is everything the app pulls in on top of
+streamlit: total milliseconds, modules loaded and the heaviest imports.
+
+    python benchmarks/bench_import.py                 # run and compare to baseline
+    python benchmarks/bench_import.py --save-baseline # refresh stored baseline
+
+The baseline lives in benchmarks/baselines/import.json; a scenario whose p50
+grows by more than --tolerance is reported as a regression (exit code 1).
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from _common import ROOT_DIR, SRC_DIR, percentile, write_results
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "import.json"
+
+# scenario -> modules imported after streamlit_app (the first visit to that page)
+SCENARIOS = {
+    "app": [],
+    "solo_quiz": ["backend.profile_store"],
+    "classroom": ["backend.cloud_store"],
+    "revision": ["revision.revision_ui"],
+    "dashboard": ["frontend.dashboard"],
+    "admin": ["ai.ai_builder"],
+}
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+# ---------------------------------------------------------
+# -X importtime RUNS
+# ---------------------------------------------------------
+def run_importtime(modules: List[str]) -> List[Tuple[int, int, int, str]]:
+    """(self_us, cumulative_us, depth, module) for everything imported after streamlit."""
+    code = "; ".join(
+        [f"import sys; sys.path[:0] = [{str(ROOT_DIR)!r}, {str(SRC_DIR)!r}]", "import streamlit",
+         "import streamlit_app"] + [f"import {m}" for m in modules]
+    )
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cum_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cum_us), (len(indent) - 1) // 2, name))
+
+    # importtime prints children before parents; keep what comes after streamlit
+    for i, row in enumerate(rows):
+        if row[3] == "streamlit" and row[2] == 0:
+            return rows[i + 1:]
+    return rows
+
+
+def bench_scenario(modules: List[str], repeat: int) -> Dict:
+    totals, counts, heaviest = [], [], {}
+    for _ in range(repeat):
+        rows = run_importtime(modules)
+        totals.append(sum(r[1] for r in rows if r[2] == 0) / 1000)
+        counts.append(len(rows))
+        for self_us, _, _, name in rows:
+            heaviest.setdefault(name, []).append(self_us / 1000)
+
+    top = sorted(
+        ((name, round(percentile(ms, 50), 3)) for name, ms in heaviest.items()),
+        key=lambda kv: kv[1], reverse=True,
+    )[:10]
+    return {
+        "p50_ms": round(percentile(totals, 50), 3),
+        "p99_ms": round(percentile(totals, 99), 3),
+        "modules": max(counts) if counts else 0,
+        "heaviest_self_ms": dict(top),
+    }
+
+
+# ---------------------------------------------------------
+# BASELINE COMPARISON
+# ---------------------------------------------------------
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, stats in current["scenarios"].items():
+        ref = baseline.get("scenarios", {}).get(name, {}).get("p50_ms")
+        value = stats["p50_ms"]
+        if ref and value > ref * (1 + tolerance):
+            regressions.append(f"{name}.p50_ms: {value} vs baseline {ref} (+{(value / ref - 1) * 100:.0f}%)")
+    return regressions
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="limit to some scenarios (repeatable)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    results = {"config": vars(args), "scenarios": {}}
+    for name in names:
+        stats = bench_scenario(SCENARIOS[name], args.repeat)
+        results["scenarios"][name] = stats
+        heavy = ", ".join(f"{m} {ms}ms" for m, ms in list(stats["heaviest_self_ms"].items())[:3])
+        print(f"{name}".ljust(12), f"p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms "
+              f"modules={stats['modules']}  [{heavy}]")
+    print(f"Results written to {write_results('import', results)}")
+
+    if args.save_baseline:
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return
+
+    if not BASELINE_PATH.exists():
+        print("No baseline stored yet; run with --save-baseline.")
+        return
+
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Scale benchmark for the item-analysis job (backend/item_analysis.py).
+
+Generates synthetic attempts from a 2-parameter logistic model (learner
+ability, item difficulty, item discrimination) and times analyze() at
+several sizes. It also checks that the estimates recover the generating
+parameters: the p-value should correlate with -difficulty, and the
+point-biserial with the true discrimination.
+
+    python benchmarks/bench_item_analysis.py
+    python benchmarks/bench_item_analysis.py --attempts 1000000 5000000 --items 5000
+"""
+
+import argparse
+import time
+from typing import Dict
+
+import numpy as np
+
+from _common import write_results
+
+from backend.item_analysis import analyze
+
+
+def synthetic_attempts(n: int, learners: int, items: int, rng) -> Dict:
+    ability = rng.normal(size=learners)
+    difficulty = rng.normal(size=items)
+    discrimination = rng.uniform(0.2, 2.0, size=items)
+    learner = rng.integers(0, learners, n).astype(np.int32)
+    item = rng.integers(0, items, n).astype(np.int32)
+    logit = discrimination[item] * (ability[learner] - difficulty[item])
+    correct = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(np.int8)
+    seconds = rng.lognormal(2.0, 0.5, n).astype(np.float32)
+    seconds[rng.random(n) < 0.3] = np.nan   # classroom answers carry no timing
+    return {
+        "arrays": (learner, item, correct, seconds),
+        "difficulty": difficulty,
+        "discrimination": discrimination,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--learners", type=int, default=50_000)
+    parser.add_argument("--items", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    keys = [f"q{i}" for i in range(args.items)]
+    results = {"config": vars(args), "runs": {}}
+    for n in args.attempts:
+        data = synthetic_attempts(n, args.learners, args.items, rng)
+        start = time.perf_counter()
+        report = analyze(*data["arrays"], keys, min_attempts=1)
+        elapsed = time.perf_counter() - start
+
+        p_value = np.array([report[k]["p_value"] for k in keys], dtype=float)
+        disc = np.array([report[k]["discrimination"] for k in keys], dtype=float)
+        ok = np.isfinite(disc)
+        entry = {
+            "seconds": round(elapsed, 3),
+            "attempts_per_s": round(n / elapsed),
+            "corr_p_value_vs_difficulty": round(float(np.corrcoef(p_value, -data["difficulty"])[0, 1]), 3),
+            "corr_discrimination": round(float(np.corrcoef(disc[ok], data["discrimination"][ok])[0, 1]), 3),
+        }
+        results["runs"][str(n)] = entry
+        print(f"{n:>10} attempts".ljust(22), f"{entry['seconds']}s  "
+              f"({entry['attempts_per_s']}/s)  r(p)={entry['corr_p_value_vs_difficulty']} "
+              f"r(disc)={entry['corr_discrimination']}")
+
+    print(f"Results written to {write_results('item_analysis', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark for the pre-aggregated global leaderboards (backend/leaderboard.py).
+
+Replays synthetic score events spread over --days days into a leaderboard
+on the chosen state backend. It measures event throughput, then the query
+latency of each window (today, this week, all-time, last 30 days merged)
+as history grows. Query cost should stay flat with the number of events.
+Top-k results are checked against a brute-force recomputation from the
+raw events.
+
+    python benchmarks/bench_leaderboard.py
+    python benchmarks/bench_leaderboard.py --events 200000 --backend sqlite:///tmp/lb.sqlite3
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from _common import summarize, timed_call, write_results
+
+from backend.leaderboard import Leaderboards, bucket_id
+from backend.state_backend import Namespace, backend_from_url
+
+SUBJECTS = ["math", "english"]
+MODES = ["standard", "isl", "adhd", "dyslexia"]
+DAY = 86400
+
+
+def synthetic_events(n: int, players: int, days: int, now: float, rng: random.Random) -> List[Dict]:
+    events = []
+    for _ in range(n):
+        events.append({
+            "name": f"player{int(rng.paretovariate(1.2)) % players}",
+            "score": int(rng.gauss(800, 250)),
+            "mode": rng.choice(MODES),
+            "subject": rng.choice(SUBJECTS),
+            "now": now - rng.random() * days * DAY,
+        })
+    events.sort(key=lambda e: e["now"])
+    return events
+
+
+def brute_force(events: List[Dict], since: float, bucket_day: str, k: int, subject=None) -> List:
+    best: Dict[str, int] = {}
+    for e in events:
+        if bucket_day and bucket_id("day", e["now"]) != bucket_day:
+            continue
+        if e["now"] < since or (subject and e["subject"] != subject):
+            continue
+        best[e["name"]] = max(best.get(e["name"], -1), e["score"])
+    return sorted(best.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+
+
+def bench_queries(boards: Leaderboards, now: float, repeats: int) -> Dict:
+    queries = {
+        "day": lambda: boards.top("day", now=now),
+        "week": lambda: boards.top("week", now=now),
+        "all": lambda: boards.top("all", now=now),
+        "all_math_isl": lambda: boards.top("all", "math", "isl", now=now),
+        "last_30_days": lambda: boards.top_days(30, now=now),
+    }
+    out = {}
+    for name, query in queries.items():
+        samples: List[float] = []
+        start = time.perf_counter()
+        for _ in range(repeats):
+            timed_call(samples, query)
+        out[name] = summarize(samples, time.perf_counter() - start)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--players", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--backend", default="memory", help="state backend URL")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = time.time()
+    events = synthetic_events(args.events, args.players, args.days, now, rng)
+    boards = Leaderboards(Namespace(f"bench-leaderboard-{int(now)}", backend_from_url(args.backend)))
+
+    results = {"config": vars(args), "checkpoints": {}}
+    checkpoints = sorted({args.events // 10, args.events // 2, args.events})
+    done, ingest_time = 0, 0.0
+    for checkpoint in checkpoints:
+        start = time.perf_counter()
+        for e in events[done:checkpoint]:
+            boards.record(e["name"], e["score"], e["mode"], e["subject"], now=e["now"])
+        ingest_time += time.perf_counter() - start
+        done = checkpoint
+        queries = bench_queries(boards, now, args.repeats)
+        results["checkpoints"][str(checkpoint)] = {
+            "events_per_s": round(done / ingest_time, 1),
+            "queries": queries,
+        }
+        print(f"{checkpoint:>9} events  ingest {done / ingest_time:,.0f}/s  " + "  ".join(
+            f"{name} p50={q['p50_ms']}ms" for name, q in queries.items()))
+
+    today = bucket_id("day", now)
+    checks = {
+        "all": [(r["name"], r["score"]) for r in boards.top("all", k=args.k, now=now)]
+        == brute_force(events, 0, None, args.k),
+        "all_math": [(r["name"], r["score"]) for r in boards.top("all", "math", k=args.k, now=now)]
+        == brute_force(events, 0, None, args.k, "math"),
+        "day": [(r["name"], r["score"]) for r in boards.top("day", k=args.k, now=now)]
+        == brute_force(events, 0, today, args.k),
+    }
+    results["matches_brute_force"] = checks
+    print("matches brute force:", checks)
+    print(f"Results written to {write_results('leaderboard', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Localhost load test for the asyncio room server (src/live/room_server.py).
+
+Starts a server on an ephemeral port (or targets --url), connects --players
+websocket clients to one room, then measures:
+  - join/answer request latency (p50/p99) and throughput,
+  - fan-out latency of a host "next" broadcast to every subscriber,
+  - lost updates (the final tally must account for every answer).
+
+    python benchmarks/bench_room_server.py --players 2000
+
+Clients and server share one event loop unless --url points at a server
+started separately (python src/live/room_server.py), which isolates the
+server on its own core.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from _common import summarize, write_results
+
+from websockets.asyncio.client import connect  # type: ignore
+
+from live.room_server import RoomServer
+
+
+async def call(ws, op: str, **params) -> Dict:
+    await ws.send(json.dumps({"op": op, **params}))
+    while True:
+        reply = json.loads(await ws.recv())
+        if "ok" in reply:
+            return reply
+
+
+async def wait_for_event(ws, event: str) -> float:
+    while True:
+        msg = json.loads(await ws.recv())
+        if msg.get("event") == event:
+            return time.perf_counter()
+
+
+async def run(url: str, players: int, options: int) -> Dict:
+    host = await connect(url)
+    code = (await call(host, "create"))["room"]["code"]
+
+    samples: Dict[str, List[float]] = {"join": [], "answer": []}
+    clients = []
+
+    async def open_player(i: int):
+        ws = await connect(url, max_queue=None)
+        t0 = time.perf_counter()
+        await call(ws, "join", code=code, name=f"player-{i}")
+        samples["join"].append(time.perf_counter() - t0)
+        await call(ws, "subscribe", code=code)
+        clients.append(ws)
+
+    start = time.perf_counter()
+    # open connections in waves so the listen backlog is not overrun
+    for wave in range(0, players, 200):
+        await asyncio.gather(*(open_player(i) for i in range(wave, min(wave + 200, players))))
+    join_elapsed = time.perf_counter() - start
+
+    # fan-out: host advances, every subscriber must see the state event
+    waiters = [asyncio.create_task(wait_for_event(ws, "state")) for ws in clients]
+    sent = time.perf_counter()
+    await call(host, "start", code=code)
+    received = await asyncio.gather(*waiters)
+    fanout = [t - sent for t in received]
+
+    async def answer(i: int, ws):
+        t0 = time.perf_counter()
+        await call(ws, "answer", code=code, name=f"player-{i}", q_index=0,
+                   answer=f"option-{i % options}", correct_answer="option-0")
+        samples["answer"].append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(answer(i, ws) for i, ws in enumerate(clients)))
+    answer_elapsed = time.perf_counter() - start
+
+    room = (await call(host, "get", code=code))["room"]
+    tally = room["tallies"].get("0", {})
+    lost = players - sum(tally.values())
+
+    await asyncio.gather(*(ws.close() for ws in clients))
+    await host.close()
+
+    return {
+        "join": summarize(samples["join"], join_elapsed),
+        "answer": summarize(samples["answer"], answer_elapsed),
+        "broadcast_fanout": summarize(fanout, max(fanout) if fanout else 0),
+        "lost_updates": lost,
+        "tally": tally,
+    }
+
+
+async def main_async(args) -> Dict:
+    if args.url:
+        return await run(args.url, args.players, args.options)
+
+    server = RoomServer(Path(tempfile.mkdtemp(prefix="signsense-room-server-")))
+    ready = asyncio.Event()
+    task = asyncio.create_task(server.serve("127.0.0.1", 0, ready))
+    await ready.wait()
+    try:
+        return await run(f"ws://127.0.0.1:{server.port}", args.players, args.options)
+    finally:
+        task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--options", type=int, default=4)
+    parser.add_argument("--url", default="")
+    args = parser.parse_args()
+
+    # each player holds a socket (two when the server is in-process)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, args.players * 2 + 256)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    results = asyncio.run(main_async(args))
+    for key in ("join", "answer", "broadcast_fanout"):
+        stats = results[key]
+        print(f"{key:<18} p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms {stats['throughput_ops']} ops/s")
+    print(f"lost updates: {results['lost_updates']}")
+    print(f"Results written to {write_results('room-server', {'config': vars(args), 'results': results})}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Load-testing harness for live rooms (live_sync) and classrooms (cloud_store).
+
+Simulates N hosts and M players per room with thread or process workers and
+reports p50/p99 latency, throughput and lost-update counts per operation.
+
+    python benchmarks/bench_rooms.py --hosts 10 --players 30 --workers 32
+    python benchmarks/bench_rooms.py --target classrooms --pool thread
+
+Results are written to benchmarks/results/rooms-<backend>-<timestamp>.json so
+runs against different backends (local files, SIGNSENSE_STATE_BACKEND,
+Firestore) can be compared.
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from _common import summarize, timed_call, write_results
+
+
+# ---------------------------------------------------------
+# LIVE ROOMS (JSON FILES)
+# ---------------------------------------------------------
+def _use_rooms_dir(rooms_dir: str):
+    from live import live_sync
+
+    live_sync.ROOMS_DIR = Path(rooms_dir)
+    return live_sync
+
+
+def _room_player(rooms_dir: str, code: str, name: str, questions: int) -> Dict:
+    """One player: join, then answer every question (read-modify-write, like player_interface)."""
+    live_sync = _use_rooms_dir(rooms_dir)
+    samples: Dict[str, List[float]] = {"load_room": [], "save_room": []}
+
+    room = timed_call(samples["load_room"], live_sync.load_room, code)
+    if room is None:
+        return {"samples": samples, "expected": None}
+    room["players"].setdefault(name, {"answer": "", "score": 0})
+    timed_call(samples["save_room"], live_sync.save_room, code, room)
+
+    answer = ""
+    for q in range(questions):
+        answer = f"option-{q}"
+        room = timed_call(samples["load_room"], live_sync.load_room, code)
+        if room is None:
+            # torn read while another worker was writing
+            continue
+        room["players"].setdefault(name, {"answer": "", "score": 0})
+        room["players"][name]["answer"] = answer
+        timed_call(samples["save_room"], live_sync.save_room, code, room)
+
+    return {"samples": samples, "expected": answer}
+
+
+def bench_rooms(hosts: int, players: int, questions: int, pool, workers: int) -> Dict:
+    rooms_dir = tempfile.mkdtemp(prefix="signsense-rooms-")
+    live_sync = _use_rooms_dir(rooms_dir)
+
+    samples: Dict[str, List[float]] = {"create_room": [], "load_room": [], "save_room": []}
+    setup_start = time.perf_counter()
+    codes = [timed_call(samples["create_room"], live_sync.create_room)["code"] for _ in range(hosts)]
+    setup_elapsed = time.perf_counter() - setup_start
+
+    start = time.perf_counter()
+    with pool(max_workers=workers) as ex:
+        futures = {
+            ex.submit(_room_player, rooms_dir, code, f"player-{h}-{p}", questions): (code, f"player-{h}-{p}")
+            for h, code in enumerate(codes)
+            for p in range(players)
+        }
+        expected = {}
+        for fut, key in futures.items():
+            res = fut.result()
+            for op, vals in res["samples"].items():
+                samples[op].extend(vals)
+            expected[key] = res["expected"]
+    elapsed = time.perf_counter() - start
+
+    lost_players = 0
+    lost_answers = 0
+    for (code, name), answer in expected.items():
+        room = live_sync.load_room(code) or {"players": {}}
+        player = room["players"].get(name)
+        if player is None:
+            lost_players += 1
+        elif player.get("answer") != answer:
+            lost_answers += 1
+
+    return {
+        "ops": {
+            op: summarize(vals, setup_elapsed if op.startswith("create_") else elapsed)
+            for op, vals in samples.items()
+        },
+        "elapsed_s": round(elapsed, 3),
+        "code_collisions": hosts - len(set(codes)),
+        "lost_updates": {"players": lost_players, "answers": lost_answers},
+    }
+
+
+# ---------------------------------------------------------
+# CLASSROOMS (cloud_store)
+# ---------------------------------------------------------
+def _classroom_student(code: str, name: str, questions: int) -> Dict:
+    from backend import cloud_store
+
+    samples: Dict[str, List[float]] = {"join_classroom": [], "submit_classroom_answer": []}
+    joined = timed_call(samples["join_classroom"], cloud_store.join_classroom, code, name)
+    for q in range(questions):
+        timed_call(
+            samples["submit_classroom_answer"],
+            cloud_store.submit_classroom_answer, code, name, q, f"answer-{q}",
+        )
+    return {"samples": samples, "joined": joined}
+
+
+def bench_classrooms(hosts: int, players: int, questions: int, pool, workers: int) -> Dict:
+    from backend import cloud_store
+
+    samples: Dict[str, List[float]] = {
+        "create_classroom": [], "join_classroom": [], "submit_classroom_answer": [],
+    }
+    setup_start = time.perf_counter()
+    codes = [timed_call(samples["create_classroom"], cloud_store.create_classroom) for _ in range(hosts)]
+    setup_elapsed = time.perf_counter() - setup_start
+    for code in codes:
+        for q in range(questions):
+            cloud_store.add_classroom_question(code, f"Question {q}", answer=f"answer-{q}")
+
+    start = time.perf_counter()
+    with pool(max_workers=workers) as ex:
+        futures = {
+            ex.submit(_classroom_student, code, f"student-{h}-{p}", questions): (code, f"student-{h}-{p}")
+            for h, code in enumerate(codes)
+            for p in range(players)
+        }
+        for fut in futures:
+            res = fut.result()
+            for op, vals in res["samples"].items():
+                samples[op].extend(vals)
+    elapsed = time.perf_counter() - start
+
+    lost_students = 0
+    lost_answers = 0
+    for code in codes:
+        state = cloud_store.get_classroom_state(code)
+        names = [name for c, name in futures.values() if c == code]
+        students = state.get("students", {})
+        lost_students += sum(1 for name in names if name not in students)
+        for q in state.get("questions", []):
+            # every student answers every question once, correctly
+            lost_answers += len(names) - (q.get("correct") or 0)
+
+    return {
+        "ops": {
+            op: summarize(vals, setup_elapsed if op.startswith("create_") else elapsed)
+            for op, vals in samples.items()
+        },
+        "elapsed_s": round(elapsed, 3),
+        "code_collisions": hosts - len(set(codes)),
+        "lost_updates": {"students": lost_students, "answers": lost_answers},
+    }
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["rooms", "classrooms", "all"], default="all")
+    parser.add_argument("--hosts", type=int, default=5)
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    pool = ThreadPoolExecutor if args.pool == "thread" else ProcessPoolExecutor
+    config = vars(args)
+    results: Dict = {"config": config, "results": {}}
+
+    if args.target in ("rooms", "all"):
+        results["results"]["rooms"] = bench_rooms(
+            args.hosts, args.players, args.questions, pool, args.workers
+        )
+
+    from backend import cloud_store
+    from backend.state_backend import MemoryBackend, get_backend
+    state = get_backend()
+    backend = "firestore" if cloud_store.cloud_enabled() else f"local-{type(state).__name__}"
+
+    if args.target in ("classrooms", "all"):
+        if args.pool == "process" and not cloud_store.cloud_enabled() and isinstance(state, MemoryBackend):
+            # the memory backend is per-process, so process workers never share it
+            results["results"]["classrooms"] = {"skipped": "process pool needs a shared backend"}
+        else:
+            results["results"]["classrooms"] = bench_classrooms(
+                args.hosts, args.players, args.questions, pool, args.workers
+            )
+
+    path = write_results(f"rooms-{backend}", results)
+    for target, res in results["results"].items():
+        print(f"[{target}]")
+        for op, stats in res.get("ops", {}).items():
+            print(f"  {op:<26} p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms "
+                  f"{stats['throughput_ops']} ops/s")
+        if "lost_updates" in res:
+            print(f"  lost updates: {res['lost_updates']}  code collisions: {res['code_collisions']}")
+        if "skipped" in res:
+            print(f"  skipped: {res['skipped']}")
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Throughput and stability benchmark for the streaming sign recogniser.
+
+Replays landmark clips through sign.stream.StreamingRecognizer. No camera or
+GPU is involved. It compares per-frame matching (one query per frame, as the
+browser loop does) against micro-batched matching, and checks that smoothing
+turns noisy frames into exactly one committed sign per clip.
+
+    python benchmarks/bench_sign_stream.py                     # synthetic fixtures
+    python benchmarks/bench_sign_stream.py --fixtures recordings/ --vocab models/signs
+
+--fixtures takes a folder in the train_embeddings.py input format. Each
+recording is one answer clip, and its label is the expected commit.
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from _common import write_results
+
+from sign.recognizer import SignIndex, current_vocabulary_dir
+from sign.stream import StreamingRecognizer
+from sign.train_embeddings import iter_recordings, label_for, read_recording
+
+LETTERS = [chr(ord("A") + i) for i in range(26)]
+Clip = Tuple[str, List]
+
+
+# ---------------------------------------------------------
+# FIXTURES
+# ---------------------------------------------------------
+def synthetic_hands(rng: np.random.Generator) -> np.ndarray:
+    """One random pose per letter, (26, 21, 3): wrist at 0, middle knuckle ~1 away."""
+    hands = rng.normal(scale=0.5, size=(len(LETTERS), 21, 3))
+    hands[:, 0] = 0.0
+    hands[:, 9] = [0.0, 1.0, 0.0]
+    return hands
+
+
+def synthetic_vocabulary(hands: np.ndarray, per_sign: int, rng) -> SignIndex:
+    rows = hands[np.repeat(np.arange(len(hands)), per_sign)]
+    rows = rows + rng.normal(scale=0.03, size=rows.shape)
+    return SignIndex(rows.reshape(len(rows), -1), np.repeat(LETTERS, per_sign).tolist())
+
+
+def synthetic_clips(hands: np.ndarray, count: int, rng, glitch: float = 0.15) -> List[Clip]:
+    """No hand -> signed letter (with glitch frames of other letters) -> no hand."""
+    clips = []
+    for _ in range(count):
+        target = rng.integers(len(LETTERS))
+        frames: List = [None] * int(rng.integers(3, 8))
+        for _ in range(int(rng.integers(20, 40))):
+            pose = hands[rng.integers(len(LETTERS))] if rng.random() < glitch else hands[target]
+            # random placement and size in the camera frame
+            pose = pose * rng.uniform(40, 120) + rng.uniform(0, 400, size=3) * [1, 1, 0]
+            frames.append(pose + rng.normal(scale=0.5, size=pose.shape))
+        frames += [None] * int(rng.integers(3, 8))
+        clips.append((LETTERS[target], frames))
+    return clips
+
+
+def recorded_clips(root: Path) -> List[Clip]:
+    clips = []
+    for path in iter_recordings(root):
+        try:
+            label, frames = read_recording(path)
+        except Exception:
+            continue
+        clips.append((label_for(path, root, label), list(frames)))
+    return clips
+
+
+# ---------------------------------------------------------
+# BENCHMARKS
+# ---------------------------------------------------------
+def raw_flips(index: SignIndex, frames: List) -> int:
+    labels = [p[0] if p else None for p in index.predict(np.stack([f for f in frames if f is not None]))]
+    return sum(1 for a, b in zip(labels, labels[1:]) if a != b)
+
+
+def bench_per_frame(index: SignIndex, clips: List[Clip]) -> Dict:
+    frames = [f for _, clip in clips for f in clip if f is not None]
+    start = time.perf_counter()
+    for frame in frames:
+        index.predict(frame)
+    elapsed = time.perf_counter() - start
+    return {"frames": len(frames), "frames_per_s": round(len(frames) / elapsed, 1)}
+
+
+def bench_stream(index: SignIndex, clips: List[Clip], batch_size: int) -> Dict:
+    recognizer = StreamingRecognizer(index, batch_size=batch_size)
+    correct = single = total_frames = 0
+    start = time.perf_counter()
+    for label, frames in clips:
+        recognizer.reset()
+        commits = list(recognizer.run(frames))
+        total_frames += len(frames)
+        correct += bool(commits) and commits[0]["label"] == label
+        single += len(commits) == 1
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": total_frames,
+        "frames_per_s": round(total_frames / elapsed, 1),
+        "accuracy": round(correct / len(clips), 3),
+        "one_commit_per_clip": round(single / len(clips), 3),
+    }
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=300)
+    parser.add_argument("--per-sign", type=int, nargs="+", default=[1, 40, 400],
+                        help="synthetic vocabulary rows per letter")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--fixtures", type=Path)
+    parser.add_argument("--vocab", type=Path, help="models/signs-style folder")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.fixtures:
+        clips = recorded_clips(args.fixtures)
+        vocab_dir = current_vocabulary_dir(args.vocab) if args.vocab else current_vocabulary_dir()
+        labels = (vocab_dir / "labels.txt").read_text(encoding="utf-8").splitlines()
+        indexes = {"recorded": SignIndex.from_files(vocab_dir / "embeddings.npy", labels)}
+    else:
+        hands = synthetic_hands(rng)
+        clips = synthetic_clips(hands, args.clips, rng)
+        indexes = {f"{n * len(LETTERS)}_rows": synthetic_vocabulary(hands, n, rng) for n in args.per_sign}
+
+    results = {"config": {k: str(v) for k, v in vars(args).items()}, "clips": len(clips), "indexes": {}}
+    for name, index in indexes.items():
+        flips = np.mean([raw_flips(index, frames) for _, frames in clips[:100]])
+        entry = {"raw_label_flips_per_clip": round(float(flips), 2),
+                 "per_frame": bench_per_frame(index, clips)}
+        print(f"[{name}] per-frame".ljust(28), f"{entry['per_frame']['frames_per_s']} frames/s  "
+              f"raw flips/clip={entry['raw_label_flips_per_clip']}")
+        for batch in args.batch:
+            stats = bench_stream(index, clips, batch)
+            entry[f"stream_batch_{batch}"] = stats
+            print(f"[{name}] stream batch={batch}".ljust(28), f"{stats['frames_per_s']} frames/s  "
+                  f"accuracy={stats['accuracy']} one-commit={stats['one_commit_per_clip']}")
+        results["indexes"][name] = entry
+
+    print(f"Results written to {write_results('sign_stream', results)}")
+
+
+if __name__ == "__main__":
+    main()
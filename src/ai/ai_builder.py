@@ -1,5 +1,31 @@
 import streamlit as st
 import json
+import uuid
+
+from frontend.ui import job_owner, job_progress
+from monitoring.profiler import PROFILE_DIR, flush, get_sample_rate, set_sample_rate
+
+
+def generate_placeholder_quiz(topic: str, num: int) -> list:
+    """Runs as a background job, where real generation (an LLM call) will go."""
+    # ids are indexed (search, dedupe), so every generated set needs its own
+    batch = uuid.uuid4().hex[:8]
+    quiz = []
+    for i in range(num):
+        quiz.append(
+            {
+                "id": f"ai_{batch}_q{i+1}",
+                "question": f"Sample question {i+1} on {topic}",
+                "options": ["Option A", "Option B", "Option C", "Option D"],
+                "answer": "Option A",
+                "difficulty": "easy",
+                "hints": ["Example hint"],
+                "tts_text": f"Sample question {i+1} on {topic}",
+                "isl_gif": "",
+                "isl_video": "",
+            }
+        )
+    return quiz
 
 
 def ai_quiz_builder():
@@ -8,27 +34,76 @@ def ai_quiz_builder():
     topic = st.text_input("Topic for quiz:")
     num = st.number_input("Number of questions", min_value=1, max_value=20, value=5)
 
+    from backend.jobs import DONE, FAILED, FINISHED, PRIORITY_BULK, get_scheduler
+    scheduler = get_scheduler()
+
     if st.button("Generate placeholder quiz"):
-        quiz = []
-        for i in range(num):
-            quiz.append(
-                {
-                    "id": f"ai_q{i+1}",
-                    "question": f"Sample question {i+1} on {topic}",
-                    "options": ["Option A", "Option B", "Option C", "Option D"],
-                    "answer": "Option A",
-                    "difficulty": "easy",
-                    "hints": ["Example hint"],
-                    "tts_text": f"Sample question {i+1} on {topic}",
-                    "isl_gif": "",
-                    "isl_video": "",
-                }
-            )
+        job_id = scheduler.submit(
+            generate_placeholder_quiz, topic, int(num),
+            owner=job_owner(), kind="ai_quiz", priority=PRIORITY_BULK,
+        )
+        st.session_state.ai_quiz_job = (job_id, topic)
+        st.session_state.pop("ai_quiz", None)
+
+    pending = st.session_state.get("ai_quiz_job")
+    if pending is not None:
+        job_id, job_topic = pending
+        status = scheduler.status(job_id)
+        if status is None or status["state"] in FINISHED:
+            del st.session_state.ai_quiz_job
+            if status and status["state"] == DONE:
+                from backend.dedupe import ingest_questions
+                quiz = status["result"]
+                _, duplicates = ingest_questions(quiz, (job_topic or "general").strip().lower(),
+                                                 source="ai", mode="flag")
+                st.session_state.ai_quiz = (job_topic, quiz, len(duplicates))
+            elif status and status["state"] == FAILED:
+                st.error(f"Quiz generation failed: {status['error']}")
+        else:
+            job_progress(job_id, "Generating quiz")
+
+    generated = st.session_state.get("ai_quiz")
+    if generated:
+        quiz_topic, quiz, duplicates = generated
         st.success("Generated sample quiz:")
+        if duplicates:
+            st.warning(f"{duplicates} question(s) closely match the existing bank "
+                       "and were not added to it (marked with duplicate_of).")
         st.json(quiz)
 
         st.download_button(
             "Download quiz JSON",
             data=json.dumps(quiz, indent=2),
-            file_name=f"{topic}_quiz.json",
+            file_name=f"{quiz_topic}_quiz.json",
+        )
+
+    with st.expander("📊 Item analysis"):
+        st.caption("Checks each question's difficulty against real answers "
+                   "(solo quiz history and classroom submissions).")
+        min_attempts = st.number_input("Minimum attempts before recalibrating",
+                                       min_value=1, value=20)
+        if st.button("Run item analysis"):
+            from backend.item_analysis import run_item_analysis
+            result = run_item_analysis(int(min_attempts))
+            st.success(f"{result['attempts']} attempts by {result['learners']} learners "
+                       f"analysed in {result['seconds']}s; "
+                       f"{result['recalibrated']} difficulties updated.")
+            if result["items"]:
+                import pandas as pd
+                table = pd.DataFrame.from_dict(result["items"], orient="index")
+                st.dataframe(table.sort_values("attempts", ascending=False))
+
+    with st.expander("🔬 Performance profiling"):
+        rate = st.slider(
+            "Share of page reruns to profile",
+            min_value=0.0,
+            max_value=1.0,
+            value=get_sample_rate(),
+            step=0.05,
+            help="Applies to this server process. 0 turns profiling off.",
         )
+        if rate != get_sample_rate():
+            set_sample_rate(rate)
+        if st.button("Write profiles now"):
+            flush()
+            st.success(f"Collapsed stacks written to {PROFILE_DIR}")
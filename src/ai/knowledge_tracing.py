@@ -0,0 +1,311 @@
+"""
+Bayesian Knowledge Tracing (BKT) per skill.
+
+Each skill (the question's "skill" field, else its subject) has four parameters:
+
+    p_init   P(known before the first attempt)
+    p_learn  P(unknown -> known after an attempt)
+    p_guess  P(correct | unknown)
+    p_slip   P(wrong | known)
+
+Training is offline EM (Baum-Welch) over every logged attempt, grouped into
+one sequence per (learner, skill). Sequences are sorted longest first, so at
+step t the still-active sequences are a prefix of the batch. Forward/backward
+passes are then one vectorised operation per step over every skill at once.
+
+Live sessions never refit. observe() is the O(1) posterior update for one
+answer; it is stored per learner in the shared state backend. The fitted
+parameters are written to models/kt_params.json and read once per process.
+
+    python src/ai/knowledge_tracing.py --iterations 30
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from backend.state_backend import Namespace
+from monitoring.metrics import timed
+
+PARAMS_PATH = Path(os.getenv(
+    "SIGNSENSE_KT_PARAMS",
+    Path(__file__).resolve().parents[2] / "models" / "kt_params.json",
+))
+DEFAULT_PARAMS = {"p_init": 0.3, "p_learn": 0.1, "p_guess": 0.2, "p_slip": 0.1}
+# keep EM away from the degenerate "guess/slip explains everything" optima
+MAX_GUESS = 0.3
+MAX_SLIP = 0.3
+EPS = 1e-6
+
+MASTERY = Namespace("mastery")    # learner -> {skill: P(known)}
+DIFFICULTY_RANK = {"easy": 0, "medium": 1, "hard": 2}
+
+
+def skill_of(question: Dict, subject: str = None) -> str:
+    return str(question.get("skill") or subject or question.get("subject") or "general").lower()
+
+
+# ---------------------------------------------------------
+# ONLINE UPDATE
+# ---------------------------------------------------------
+def update_mastery(p_known: float, correct: bool, params: Dict) -> float:
+    """Posterior after one answer, then the learning transition."""
+    guess, slip = params["p_guess"], params["p_slip"]
+    if correct:
+        seen = p_known * (1 - slip) / (p_known * (1 - slip) + (1 - p_known) * guess)
+    else:
+        seen = p_known * slip / (p_known * slip + (1 - p_known) * (1 - guess))
+    return seen + (1 - seen) * params["p_learn"]
+
+
+def p_correct(p_known: float, params: Dict) -> float:
+    return p_known * (1 - params["p_slip"]) + (1 - p_known) * params["p_guess"]
+
+
+class KnowledgeTracer:
+    def __init__(self, skills: Dict[str, Dict] = None, default: Dict = None):
+        self.skills = skills or {}
+        self.default = dict(default or DEFAULT_PARAMS)
+
+    def params(self, skill: str) -> Dict:
+        return self.skills.get(skill, self.default)
+
+    @classmethod
+    def load(cls, path: Path = PARAMS_PATH) -> "KnowledgeTracer":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        return cls(payload.get("skills"), payload.get("default"))
+
+    def save(self, path: Path = PARAMS_PATH, **meta):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), **meta, "default": self.default,
+                       "skills": self.skills}, f, indent=2)
+        tmp.replace(path)
+
+    # -----------------------------------------------------
+    # LEARNER STATE
+    # -----------------------------------------------------
+    def mastery(self, learner: str) -> Dict[str, float]:
+        return dict(MASTERY.get(learner) or {})
+
+    def observe(self, learner: str, skill: str, correct: bool) -> float:
+        params = self.params(skill)
+
+        def apply(state):
+            state = state or {}
+            state[skill] = update_mastery(state.get(skill, params["p_init"]), correct, params)
+            return state
+
+        state = MASTERY.update(learner, apply) or {}
+        return state.get(skill, params["p_init"])
+
+    def replay(self, history, subject: str = None) -> Dict[str, float]:
+        """Mastery from a QuizEngine.history (e.g. when nothing was stored yet)."""
+        state: Dict[str, float] = {}
+        for rec in history:
+            skill = (rec.get("subject") or subject or "general").lower()
+            params = self.params(skill)
+            state[skill] = update_mastery(state.get(skill, params["p_init"]), rec.get("correct"), params)
+        return state
+
+
+def target_difficulty(p_known: float) -> str:
+    if p_known < 0.4:
+        return "easy"
+    if p_known < 0.75:
+        return "medium"
+    return "hard"
+
+
+def order_questions(questions: List[Dict], p_known: float) -> List[Dict]:
+    """Questions nearest the learner's level first; ties keep their (shuffled) order."""
+    target = DIFFICULTY_RANK[target_difficulty(p_known)]
+    return sorted(
+        questions,
+        key=lambda q: abs(DIFFICULTY_RANK.get(str(q.get("difficulty")).lower(), 1) - target),
+    )
+
+
+_tracer: Optional[KnowledgeTracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> KnowledgeTracer:
+    """Parameters are read from PARAMS_PATH once per process."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = KnowledgeTracer.load()
+    return _tracer
+
+
+# ---------------------------------------------------------
+# EM TRAINER
+# ---------------------------------------------------------
+def build_sequences(learner: np.ndarray, skill: np.ndarray, correct: np.ndarray):
+    """
+    Attempts (in time order) -> per-step arrays for sequences sorted longest
+    first: obs[t] and seq_skill are aligned so obs[t][:active[t]] is step t.
+    """
+    groups, group = np.unique(learner.astype(np.int64) * (int(skill.max()) + 1) + skill,
+                              return_inverse=True)
+    order = np.argsort(group, kind="stable")            # time order within each group
+    lengths = np.bincount(group, minlength=len(groups))
+    starts = np.cumsum(lengths) - lengths
+    by_length = np.argsort(-lengths, kind="stable")
+    lengths, starts = lengths[by_length], starts[by_length]
+    seq_skill = skill[order[starts]]
+    active = np.searchsorted(-lengths, -np.arange(1, lengths[0] + 1), side="right")
+    obs = [correct[order[starts[:n] + t]].astype(np.float64) for t, n in enumerate(active)]
+    return obs, seq_skill, active
+
+
+@timed("signsense_kt_fit_seconds")
+def fit(learner: np.ndarray, skill: np.ndarray, correct: np.ndarray, n_skills: int,
+        iterations: int = 30, tol: float = 1e-4) -> Dict:
+    """EM over all skills at once. Returns arrays of p_init/p_learn/p_guess/p_slip."""
+    obs, seq_skill, active = build_sequences(learner, skill, correct)
+    p = {k: np.full(n_skills, v) for k, v in DEFAULT_PARAMS.items()}
+    history = []
+
+    def per_skill(weights, n):
+        return np.bincount(seq_skill[:n], weights=weights, minlength=n_skills)
+
+    for _ in range(iterations):
+        L0, T = p["p_init"][seq_skill], p["p_learn"][seq_skill]
+        G, S = p["p_guess"][seq_skill], p["p_slip"][seq_skill]
+        e_known = [np.where(o > 0, 1 - S[:len(o)], S[:len(o)]) for o in obs]
+        e_unknown = [np.where(o > 0, G[:len(o)], 1 - G[:len(o)]) for o in obs]
+
+        # forward (scaled): alphas[t] = P(known at t | answers up to t)
+        alphas, scales = [], []
+        known = L0
+        for t, n in enumerate(active):
+            if t:
+                known = known[:n] + (1 - known[:n]) * T[:n]
+            num = known * e_known[t]
+            c = num + (1 - known) * e_unknown[t]
+            known = num / c
+            alphas.append(known)
+            scales.append(c)
+
+        # backward (scaled betas), accumulating expected counts per skill
+        acc = dict.fromkeys(("init", "learn", "unknown_before", "known", "slip", "unknown", "guess"), 0.0)
+        b_known = b_unknown = np.ones(0)
+        for t in range(len(active) - 1, -1, -1):
+            n, o, a = active[t], obs[t], alphas[t]
+            pad = np.ones(n - len(b_known))          # sequences whose last step is t
+            b_known, b_unknown = np.concatenate([b_known, pad]), np.concatenate([b_unknown, pad])
+
+            g_known = a * b_known
+            g_unknown = (1 - a) * b_unknown
+            total = g_known + g_unknown
+            g_known, g_unknown = g_known / total, g_unknown / total
+            acc["known"] = acc["known"] + per_skill(g_known, n)
+            acc["slip"] = acc["slip"] + per_skill(g_known * (o == 0), n)
+            acc["unknown"] = acc["unknown"] + per_skill(g_unknown, n)
+            acc["guess"] = acc["guess"] + per_skill(g_unknown * (o > 0), n)
+            if t + 1 < len(active):
+                m = active[t + 1]
+                acc["unknown_before"] = acc["unknown_before"] + per_skill(g_unknown[:m], m)
+            if t == 0:
+                acc["init"] = per_skill(g_known, n)
+                break
+
+            # transition t-1 -> t for the n sequences that reach step t
+            ek, eu = e_known[t] * b_known, e_unknown[t] * b_unknown
+            learned = (1 - alphas[t - 1][:n]) * T[:n] * ek / scales[t]
+            acc["learn"] = acc["learn"] + per_skill(learned, n)
+            b_known = ek / scales[t]
+            b_unknown = ((1 - T[:n]) * eu + T[:n] * ek) / scales[t]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            new = {
+                "p_init": acc["init"] / per_skill(None, active[0]),
+                "p_learn": acc["learn"] / acc["unknown_before"],
+                "p_guess": acc["guess"] / acc["unknown"],
+                "p_slip": acc["slip"] / acc["known"],
+            }
+        for key, value in new.items():
+            value = np.where(np.isfinite(value), value, p[key])
+            p[key] = value.clip(EPS, 1 - EPS)
+        p["p_guess"] = p["p_guess"].clip(max=MAX_GUESS)
+        p["p_slip"] = p["p_slip"].clip(max=MAX_SLIP)
+
+        history.append(float(sum(np.log(c).sum() for c in scales)))
+        if len(history) > 1 and abs(history[-1] - history[-2]) < tol * abs(history[-2]):
+            break
+
+    p["loglik"] = history
+    p["attempts"] = np.bincount(skill, minlength=n_skills)
+    return p
+
+
+def train(iterations: int = 30, profile_db: Path = None) -> KnowledgeTracer:
+    """Fit every skill from the same attempt sources as the item analysis (the full attempt log)."""
+    from backend.item_analysis import AttemptLog, add_classroom_attempts, add_profile_attempts
+    from backend.profile_store import DB_PATH
+    from backend.search import get_question_index
+
+    log = AttemptLog()
+    add_profile_attempts(log, profile_db or DB_PATH)
+    add_classroom_attempts(log)
+    if not len(log):
+        return KnowledgeTracer()
+
+    bank = get_question_index()
+    names: Dict[str, int] = {}
+    item_skill = np.array([
+        names.setdefault(skill_of(bank.docs[bank.by_key[key]], bank.subjects[bank.by_key[key]])
+                         if key in bank.by_key else "general", len(names))
+        for key in log.item_keys()
+    ], dtype=np.int32)
+    learner, item, correct, _ = log.arrays()
+    p = fit(learner, item_skill[item], correct, len(names), iterations=iterations)
+
+    skills = {
+        name: {**{k: round(float(p[k][i]), 4) for k in DEFAULT_PARAMS},
+               "attempts": int(p["attempts"][i])}
+        for name, i in names.items() if p["attempts"][i]
+    }
+    return KnowledgeTracer(skills)
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--profile-db", type=Path)
+    parser.add_argument("--out", type=Path, default=PARAMS_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tracer = train(args.iterations, args.profile_db)
+    elapsed = time.perf_counter() - start
+    tracer.save(args.out, train_seconds=round(elapsed, 3))
+    for name, params in sorted(tracer.skills.items()):
+        print(f"{name:<16}", "  ".join(f"{k}={v}" for k, v in params.items()))
+    print(f"{len(tracer.skills)} skills fitted in {elapsed:.2f}s, written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
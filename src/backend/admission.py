@@ -0,0 +1,259 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+from monitoring.metrics import inc, observe
+
+# -------------------------------
+# ADMISSION CONTROL
+# -------------------------------
+# Calls to rate-limited backends (OpenAI, Firestore) first acquire() a token
+# from every bucket that applies to them: the backend's own, the user's,
+# and the classroom's. Each bucket refills at `rate` per second up to
+# `burst`.
+#
+# Callers that cannot go at once wait in a per-backend fair queue. Waiters
+# are grouped by flow (the user, or the classroom when there is no user),
+# and flows take turns round-robin, so one busy student or class cannot
+# starve everyone else. A request is shed at once with Overloaded when its
+# estimated wait exceeds the backend's max_wait or the queue is full. That
+# bounds latency under a burst instead of piling up quota errors.
+#
+# OpenAI calls run on job workers, so they never wait (max_wait 0): a
+# parked worker would hold up PDF and quiz jobs behind a burst of chat.
+#
+# Buckets are kept in least-recently-used order. A bucket that has been idle
+# for IDLE_EVICT and is full again behaves like a new one, so it is dropped.
+# Memory then follows the number of active users, not every user ever seen.
+#
+# Buckets are per process; with several app processes, divide the rates.
+
+Limit = Tuple[float, float]   # (tokens per second, burst)
+
+
+def _limit(name: str, default: Limit) -> Limit:
+    """SIGNSENSE_RATE_<NAME>="rate:burst" overrides a default."""
+    value = os.getenv(f"SIGNSENSE_RATE_{name.upper()}")
+    if not value:
+        return default
+    rate, _, burst = value.partition(":")
+    return float(rate), float(burst or rate)
+
+
+LIMITS: Dict[str, Dict] = {
+    "openai": {
+        "backend": _limit("openai", (3.0, 10.0)),
+        "user": _limit("openai_user", (0.2, 3.0)),
+        "classroom": _limit("openai_classroom", (1.0, 10.0)),
+        "max_wait": 0.0,      # runs on a job worker: shed, never park the worker
+    },
+    "firestore": {
+        "backend": _limit("firestore", (50.0, 100.0)),
+        "user": _limit("firestore_user", (2.0, 5.0)),
+        "classroom": _limit("firestore_classroom", (20.0, 40.0)),
+        "max_wait": 3.0,      # the student is waiting on the submit button
+    },
+    "state_backend": {
+        "backend": _limit("state_backend", (200.0, 400.0)),
+        "user": _limit("state_backend_user", (5.0, 10.0)),
+        "classroom": _limit("state_backend_classroom", (100.0, 200.0)),
+        "max_wait": 3.0,
+    },
+}
+MAX_QUEUE = int(os.getenv("SIGNSENSE_ADMISSION_QUEUE", 200))
+POLL = 0.05   # upper bound on a waiter's sleep between refill checks
+IDLE_EVICT = 60.0   # seconds unused before a full bucket may be dropped (> any max_wait)
+
+
+class Overloaded(Exception):
+    def __init__(self, backend: str, retry_after: float):
+        super().__init__(f"{backend} is overloaded; retry in {retry_after:.1f}s")
+        self.backend = backend
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated", "used")
+
+    def __init__(self, rate: float, burst: float, now: float = None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic() if now is None else now
+        self.used = self.updated   # last acquire() that involved this bucket
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` are available (0 = now)."""
+        self._refill(now)
+        missing = tokens - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def take(self, now: float, tokens: float = 1.0):
+        self._refill(now)
+        self.tokens -= tokens
+
+    def drain(self, now: float, seconds: float):
+        """Go into debt so nothing is admitted for `seconds` (upstream said slow down)."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class _Ticket:
+    """One waiting request (compared by identity, never by value)."""
+    __slots__ = ("buckets",)
+
+    def __init__(self, buckets: List[TokenBucket]):
+        self.buckets = buckets
+
+
+class AdmissionController:
+    def __init__(self, limits: Dict[str, Dict] = None, max_queue: int = MAX_QUEUE):
+        self.limits = limits or LIMITS
+        self.max_queue = max_queue
+        # least recently used first, see _evict_idle
+        self._buckets: "OrderedDict[Tuple[str, str, str], TokenBucket]" = OrderedDict()
+        # backend -> flow -> waiting tickets; flow order is the round-robin order
+        self._queues: Dict[str, "OrderedDict[str, deque]"] = {}
+        self._cond = threading.Condition()
+
+    def _bucket(self, backend: str, scope: str, key: str, now: float = None) -> TokenBucket:
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get((backend, scope, key))
+        if bucket is None:
+            self._evict_idle(now)
+            rate, burst = self.limits[backend][scope]
+            bucket = self._buckets[(backend, scope, key)] = TokenBucket(rate, burst, now)
+        else:
+            self._buckets.move_to_end((backend, scope, key))
+        bucket.used = now
+        return bucket
+
+    def _evict_idle(self, now: float):
+        """
+        Drop least-recently-used buckets that are idle and full again. Stops at
+        the first one that is not, so each call does O(evicted) work. Waiting
+        tickets touched their buckets at most max_wait < IDLE_EVICT ago, so a
+        bucket still in use by the queue is never dropped.
+        """
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket.used < IDLE_EVICT or bucket.wait_time(now, bucket.burst) > 0:
+                return
+            del self._buckets[key]
+
+    def _buckets_for(self, backend: str, user: Optional[str], classroom: Optional[str],
+                     now: float) -> List[TokenBucket]:
+        buckets = [self._bucket(backend, "backend", "*", now)]
+        if user:
+            buckets.append(self._bucket(backend, "user", user, now))
+        if classroom:
+            buckets.append(self._bucket(backend, "classroom", classroom, now))
+        return buckets
+
+    # -----------------------------------------------------
+    # API
+    # -----------------------------------------------------
+    def acquire(self, backend: str, user: str = None, classroom: str = None,
+                max_wait: float = None) -> float:
+        """Block until admitted; returns seconds waited. Raises Overloaded when shed."""
+        max_wait = self.limits[backend]["max_wait"] if max_wait is None else max_wait
+        flow = user or classroom or "*"
+        start = time.monotonic()
+        deadline = start + max_wait
+
+        with self._cond:
+            queue = self._queues.setdefault(backend, OrderedDict())
+            buckets = self._buckets_for(backend, user, classroom, start)
+            queued = sum(len(q) for q in queue.values())
+            backend_bucket = buckets[0]
+            # round-robin: a ticket k-deep in its flow waits for up to k + 1
+            # tickets from every other flow, then goes at the backend's rate
+            depth = len(queue.get(flow, ()))
+            ahead = depth + sum(min(len(q), depth + 1) for f, q in queue.items() if f != flow)
+            estimate = max(max(b.wait_time(start) for b in buckets),
+                           backend_bucket.wait_time(start, ahead + 1))
+            if queued >= self.max_queue or estimate > max_wait:
+                self._shed(backend, estimate)
+
+            ticket = _Ticket(buckets)
+            queue.setdefault(flow, deque()).append(ticket)
+            while True:
+                now = time.monotonic()
+                if self._next_ticket(queue, now) is ticket:
+                    wait = backend_bucket.wait_time(now)
+                    if wait == 0.0:
+                        for bucket in buckets:
+                            bucket.take(now)
+                        self._dequeue(queue, flow, rotate=True)
+                        self._cond.notify_all()
+                        break
+                else:
+                    wait = POLL
+                if now + wait > deadline:
+                    self._dequeue(queue, flow, ticket=ticket)
+                    self._cond.notify_all()
+                    self._shed(backend, wait)
+                self._cond.wait(min(wait, POLL, deadline - now))
+
+        waited = time.monotonic() - start
+        inc("signsense_admission_total", backend=backend, outcome="admitted")
+        observe("signsense_admission_wait_seconds", waited, backend=backend)
+        return waited
+
+    def backoff(self, backend: str, seconds: float):
+        """Upstream returned a rate-limit error: pause this backend for `seconds`."""
+        with self._cond:
+            now = time.monotonic()
+            self._bucket(backend, "backend", "*", now).drain(now, seconds)
+        inc("signsense_admission_backoff_total", backend=backend)
+
+    def queued(self, backend: str) -> int:
+        with self._cond:
+            return sum(len(q) for q in self._queues.get(backend, {}).values())
+
+    # -----------------------------------------------------
+    # FAIR QUEUE (caller holds the lock)
+    # -----------------------------------------------------
+    @staticmethod
+    def _next_ticket(queue: "OrderedDict[str, deque]", now: float):
+        """Head of the first flow, in round-robin order, whose own buckets allow it."""
+        for tickets in queue.values():
+            head = tickets[0]
+            if all(b.wait_time(now) == 0.0 for b in head.buckets[1:]):
+                return head
+        return None
+
+    @staticmethod
+    def _dequeue(queue: "OrderedDict[str, deque]", flow: str, ticket=None, rotate: bool = False):
+        tickets = queue[flow]
+        if ticket is None:
+            tickets.popleft()
+        else:
+            tickets.remove(ticket)
+        if not tickets:
+            del queue[flow]
+        elif rotate:
+            queue.move_to_end(flow)    # this flow had its turn
+
+    def _shed(self, backend: str, retry_after: float):
+        inc("signsense_admission_total", backend=backend, outcome="shed")
+        raise Overloaded(backend, retry_after)
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController()
+    return _controller
@@ -1,33 +1,57 @@
 import os
-import random
+import threading
 from typing import List, Dict
 
+from backend.codes import CLASSROOM_CODES
+from backend.leaderboard import record_score
+from backend.lifecycle import touch
+from backend.state_backend import Namespace
+from monitoring.metrics import timed
+
 # -------------------------------
 # EXISTING SCORE STORAGE
 # -------------------------------
-LOCAL_SCORES: Dict[str, List[Dict]] = {}
-
-CLOUD_ENABLED = False
-db = None
-
-try:
-    import firebase_admin  # type: ignore
-    from firebase_admin import credentials, firestore  # type: ignore
-
-    cred_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    if cred_path:
-        if not firebase_admin._apps:
-            cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred)
-        db = firestore.client()
-        CLOUD_ENABLED = True
-    else:
-        CLOUD_ENABLED = False
-except Exception:
-    CLOUD_ENABLED = False
-    db = None
-
-
+# Fallback when Firestore is off; lives in the shared state backend
+# (SIGNSENSE_STATE_BACKEND) so several app processes see the same data.
+LOCAL_SCORES = Namespace("scores")
+
+# Firestore is set up on first use rather than at import, so pages that never
+# touch the cloud (and cold starts without credentials) skip firebase_admin.
+firestore = None
+_db_client = None
+_db_ready = False
+_db_lock = threading.Lock()
+
+
+def _db():
+    """Firestore client, or None when the cloud is off or unavailable."""
+    global firestore, _db_client, _db_ready
+    if _db_ready:
+        return _db_client
+    with _db_lock:
+        if not _db_ready:
+            cred_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+            if cred_path:
+                try:
+                    import firebase_admin  # type: ignore
+                    from firebase_admin import credentials  # type: ignore
+                    from firebase_admin import firestore as _firestore  # type: ignore
+
+                    if not firebase_admin._apps:
+                        firebase_admin.initialize_app(credentials.Certificate(cred_path))
+                    _db_client = _firestore.client()
+                    firestore = _firestore
+                except Exception:
+                    _db_client = None
+            _db_ready = True
+    return _db_client
+
+
+def cloud_enabled() -> bool:
+    return _db() is not None
+
+
+@timed("signsense_backend_seconds", backend="cloud_store")
 def add_score(session_code: str, name: str, score: int, mode: str, subject: str) -> bool:
     record = {
         "name": name or "Anonymous",
@@ -35,8 +59,12 @@ def add_score(session_code: str, name: str, score: int, mode: str, subject: str)
         "mode": mode,
         "subject": subject,
     }
+    # global day / week / all-time boards, independent of the session store
+    record_score(record["name"], record["score"], mode, subject)
+
+    db = _db()
 
-    if CLOUD_ENABLED and db is not None:
+    if db is not None:
         try:
             scores_ref = (
                 db.collection("sessions")
@@ -48,14 +76,22 @@ def add_score(session_code: str, name: str, score: int, mode: str, subject: str)
         except Exception:
             pass
 
-    LOCAL_SCORES.setdefault(session_code, []).append(record)
+    def append(records):
+        records = records or []
+        records.append(record)
+        return records
+
+    LOCAL_SCORES.update(session_code, append)
     return False
 
 
+@timed("signsense_backend_seconds", backend="cloud_store")
 def get_leaderboard(session_code: str) -> List[Dict]:
     records: List[Dict] = []
 
-    if CLOUD_ENABLED and db is not None:
+    db = _db()
+
+    if db is not None:
         try:
             scores_ref = (
                 db.collection("sessions")
@@ -82,98 +118,285 @@ def get_leaderboard(session_code: str) -> List[Dict]:
 # NEW: CLASSROOM STORAGE
 # ===============================
 
-LOCAL_CLASSROOMS: Dict[str, Dict] = {}
+LOCAL_CLASSROOMS = Namespace("classroom")
+
+
+# Classroom document:
+# {
+#   "questions": [{"question": str, "options": [str], "answer": str | None}],
+#   "students": {name: {"status", "answers": {q_index: answer}, "score"}},
+#   "tallies": {q_index: {"responses": n, "correct": n, "options": {option_index: n}}},
+# }
+# Tallies and scores are updated on every submit, so reading the state never
+# has to walk all students' answers.
+
+
+def normalize_question(question) -> Dict:
+    """Older classrooms stored bare question strings without an answer key."""
+    if isinstance(question, dict):
+        return {
+            "question": question.get("question", ""),
+            "options": list(question.get("options") or []),
+            "answer": question.get("answer"),
+        }
+    return {"question": str(question), "options": [], "answer": None}
 
 
+def grade_answer(question: Dict, answer: str):
+    """True/False against the answer key, None when the question has no key."""
+    key = question.get("answer")
+    if key is None:
+        return None
+    return answer.strip().lower() == str(key).strip().lower()
+
+
+def _tally_changes(question: Dict, previous, answer: str) -> Dict[str, int]:
+    """Counter deltas (relative field paths) for replacing `previous` with `answer`."""
+    options = question["options"]
+    changes: Dict[str, int] = {}
+
+    def bump(path: str, delta: int):
+        if delta:
+            changes[path] = changes.get(path, 0) + delta
+
+    if previous is None:
+        bump("responses", 1)
+    else:
+        if previous in options:
+            bump(f"options.{options.index(previous)}", -1)
+        if grade_answer(question, previous):
+            bump("correct", -1)
+            bump("score", -1)
+
+    if answer in options:
+        bump(f"options.{options.index(answer)}", 1)
+    if grade_answer(question, answer):
+        bump("correct", 1)
+        bump("score", 1)
+
+    # a resubmitted answer cancels out; don't send Increment(0) writes
+    return {path: delta for path, delta in changes.items() if delta}
+
+
+@timed("signsense_backend_seconds", backend="cloud_store")
 def create_classroom() -> str:
-    code = f"CLS-{random.randint(100,999)}"
+    def taken(code: str) -> bool:
+        if code in LOCAL_CLASSROOMS:
+            return True
+        db = _db()
+        if db is not None:
+            try:
+                return db.collection("classrooms").document(code).get().exists
+            except Exception:
+                return False
+        return False
+
+    code = CLASSROOM_CODES.allocate(is_taken=taken)
 
     classroom = {
         "questions": [],
-        "students": {},   # name -> {status, answers}
+        "students": {},   # name -> {status, answers, score}
+        "tallies": {},    # q_index -> {responses, correct, options}
     }
 
-    if CLOUD_ENABLED and db is not None:
+    db = _db()
+
+    if db is not None:
         try:
             db.collection("classrooms").document(code).set(classroom)
         except Exception:
-            LOCAL_CLASSROOMS[code] = classroom
+            LOCAL_CLASSROOMS.set(code, classroom)
+            touch("classroom", code)
     else:
-        LOCAL_CLASSROOMS[code] = classroom
+        LOCAL_CLASSROOMS.set(code, classroom)
+        touch("classroom", code)
 
     return code
 
 
+@timed("signsense_backend_seconds", backend="cloud_store")
 def join_classroom(code: str, student_name: str) -> bool:
     if not student_name:
         return False
 
-    if CLOUD_ENABLED and db is not None:
+    db = _db()
+
+    if db is not None:
         try:
             ref = db.collection("classrooms").document(code)
-            if not ref.get().exists:
+            doc = ref.get()
+            if not doc.exists:
                 return False
-            ref.update({
-                f"students.{student_name}": {
-                    "status": "Joined",
-                    "answers": {}
-                }
-            })
+            if student_name not in (doc.to_dict() or {}).get("students", {}):
+                ref.update({
+                    f"students.{student_name}": {
+                        "status": "Joined",
+                        "answers": {},
+                        "score": 0,
+                    }
+                })
             return True
         except Exception:
             return False
 
-    classroom = LOCAL_CLASSROOMS.get(code)
-    if not classroom:
+    def join(classroom):
+        if not classroom:
+            return None
+        # re-joining keeps earlier answers so the tallies stay consistent
+        classroom["students"].setdefault(student_name, {
+            "status": "Joined",
+            "answers": {},
+            "score": 0,
+        })
+        return classroom
+
+    if LOCAL_CLASSROOMS.update(code, join) is None:
         return False
-
-    classroom["students"][student_name] = {
-        "status": "Joined",
-        "answers": {}
-    }
+    touch("classroom", code)
     return True
 
 
-def add_classroom_question(code: str, question: str):
-    if CLOUD_ENABLED and db is not None:
+def add_classroom_question(code: str, question: str, options: List[str] = None, answer: str = None):
+    add_classroom_questions(code, [{"question": question, "options": options, "answer": answer}])
+
+
+@timed("signsense_backend_seconds", backend="cloud_store")
+def add_classroom_questions(code: str, questions: List[Dict]) -> int:
+    """Append several questions (e.g. picked from bank search) in one write."""
+    items = [normalize_question(q) for q in questions if q.get("question")]
+    if not items:
+        return 0
+
+    db = _db()
+    if db is not None:
         try:
             ref = db.collection("classrooms").document(code)
             ref.update({
-                "questions": firestore.ArrayUnion([question])
+                "questions": firestore.ArrayUnion(items)
             })
-            return
+            return len(items)
         except Exception:
             pass
 
-    if code in LOCAL_CLASSROOMS:
-        LOCAL_CLASSROOMS[code]["questions"].append(question)
+    def append(classroom):
+        if not classroom:
+            return None
+        classroom["questions"].extend(items)
+        return classroom
 
+    if LOCAL_CLASSROOMS.update(code, append) is None:
+        return 0
+    touch("classroom", code)
+    return len(items)
 
+
+@timed("signsense_backend_seconds", backend="cloud_store")
 def submit_classroom_answer(code: str, student_name: str, q_index: int, answer: str):
-    if CLOUD_ENABLED and db is not None:
+    """Store the answer and grade it in the same step (tallies + student score)."""
+    db = _db()
+    if db is not None:
         try:
             ref = db.collection("classrooms").document(code)
-            ref.update({
-                f"students.{student_name}.answers.{q_index}": answer,
-                f"students.{student_name}.status": "Answered"
-            })
+            student_path = f"students.{student_name}"
+
+            def submit(transaction):
+                # project the read down to this student's answer: other
+                # students' answers are never fetched. The transaction makes
+                # racing resubmits retry, so each delta is applied against
+                # the answer it replaces exactly once.
+                snap = ref.get(
+                    field_paths=["questions", f"{student_path}.status",
+                                 f"{student_path}.answers.{q_index}"],
+                    transaction=transaction,
+                )
+                data = snap.to_dict() or {}
+                questions = data.get("questions", [])
+                student = data.get("students", {}).get(student_name)
+                if student is None or not 0 <= q_index < len(questions):
+                    return
+                question = normalize_question(questions[q_index])
+                previous = student.get("answers", {}).get(str(q_index))
+
+                update = {
+                    f"{student_path}.answers.{q_index}": answer,
+                    f"{student_path}.status": "Answered",
+                }
+                for path, delta in _tally_changes(question, previous, answer).items():
+                    if path == "score":
+                        update[f"{student_path}.score"] = firestore.Increment(delta)
+                    else:
+                        update[f"tallies.{q_index}.{path}"] = firestore.Increment(delta)
+                transaction.update(ref, update)
+
+            firestore.transactional(submit)(db.transaction())
             return
         except Exception:
             pass
 
-    classroom = LOCAL_CLASSROOMS.get(code)
-    if classroom and student_name in classroom["students"]:
-        classroom["students"][student_name]["answers"][q_index] = answer
-        classroom["students"][student_name]["status"] = "Answered"
+    def grade(classroom):
+        if not classroom or student_name not in classroom["students"]:
+            return None
+        if not 0 <= q_index < len(classroom["questions"]):
+            return None
+
+        student = classroom["students"][student_name]
+        question = normalize_question(classroom["questions"][q_index])
+        # string keys, same as Firestore and any JSON-backed state backend
+        previous = student["answers"].get(str(q_index))
+
+        tally = classroom.setdefault("tallies", {}).setdefault(
+            str(q_index), {"responses": 0, "correct": 0, "options": {}}
+        )
+        for path, delta in _tally_changes(question, previous, answer).items():
+            if path == "score":
+                student["score"] = student.get("score", 0) + delta
+            elif path.startswith("options."):
+                idx = path.split(".", 1)[1]
+                tally["options"][idx] = tally["options"].get(idx, 0) + delta
+            else:
+                tally[path] += delta
+
+        student["answers"][str(q_index)] = answer
+        student["status"] = "Answered"
+        return classroom
+
+    if LOCAL_CLASSROOMS.update(code, grade) is not None:
+        touch("classroom", code)
+
+
+def summarize_classroom(data: Dict) -> Dict:
+    """Scores and per-question distributions, built from the stored counters."""
+    questions = [normalize_question(q) for q in data.get("questions", [])]
+    tallies = data.get("tallies", {})
+
+    summary_questions = []
+    for i, q in enumerate(questions):
+        tally = tallies.get(str(i), {})
+        counts = tally.get("options", {})
+        summary_questions.append({
+            **q,
+            "responses": tally.get("responses", 0),
+            "correct": tally.get("correct", 0) if q["answer"] is not None else None,
+            "distribution": {opt: counts.get(str(k), 0) for k, opt in enumerate(q["options"])},
+        })
+
+    students = {
+        name: {"status": info.get("status", "Joined"), "score": info.get("score", 0)}
+        for name, info in data.get("students", {}).items()
+    }
+    return {"questions": summary_questions, "students": students}
 
 
+@timed("signsense_backend_seconds", backend="cloud_store")
 def get_classroom_state(code: str) -> Dict:
-    if CLOUD_ENABLED and db is not None:
+    db = _db()
+    if db is not None:
         try:
             doc = db.collection("classrooms").document(code).get()
             if doc.exists:
-                return doc.to_dict() or {}
+                return summarize_classroom(doc.to_dict() or {})
         except Exception:
             pass
 
-    return LOCAL_CLASSROOMS.get(code, {})
+    classroom = LOCAL_CLASSROOMS.get(code)
+    return summarize_classroom(classroom) if classroom else {}
@@ -0,0 +1,83 @@
+import math
+from typing import Callable, Optional
+
+from backend.state_backend import StateBackend, get_backend
+
+# -------------------------------
+# ROOM / CLASSROOM CODE ALLOCATION
+# -------------------------------
+# Codes come from a shared counter pushed through a fixed permutation of the
+# code space, so every allocation is O(1) and two allocations can never get
+# the same code until the space is used up. Released codes (expired rooms)
+# go to a FIFO free list and are handed out again before new ones.
+#
+# Uniqueness holds across processes when SIGNSENSE_STATE_BACKEND is shared
+# (sqlite/redis); with the default memory backend it holds per process, and
+# the optional `is_taken` check catches codes issued before the allocator.
+
+# No 0/O, 1/I/L: easy to read aloud and type from a projector.
+FRIENDLY_ALPHABET = "23456789ABCDEFGHJKMNPQRSTUVWXYZ"
+
+
+class CodeSpaceExhausted(RuntimeError):
+    pass
+
+
+class CodeAllocator:
+    def __init__(self, kind: str, alphabet: str, length: int, prefix: str = "",
+                 offset: int = 0, size: int = None, backend: StateBackend = None):
+        self.kind = kind
+        self.alphabet = alphabet
+        self.length = length
+        self.prefix = prefix
+        self.offset = offset
+        self.size = size or len(alphabet) ** length
+        self._backend = backend
+
+        # multiplier coprime with the size -> (a*i + b) mod size is a bijection
+        a = int(self.size * 0.6180339887) | 1
+        while math.gcd(a, self.size) != 1:
+            a += 2
+        self._mult = a
+        self._shift = int(self.size * 0.4142135623)
+
+    @property
+    def backend(self) -> StateBackend:
+        return self._backend or get_backend()
+
+    def _counter_key(self) -> str:
+        return f"codes:{self.kind}:next"
+
+    def _free_key(self) -> str:
+        return f"codes:{self.kind}:free"
+
+    def encode(self, n: int) -> str:
+        n = (self._mult * n + self._shift) % self.size + self.offset
+        base = len(self.alphabet)
+        chars = []
+        for _ in range(self.length):
+            n, r = divmod(n, base)
+            chars.append(self.alphabet[r])
+        return self.prefix + "".join(reversed(chars))
+
+    def allocate(self, is_taken: Optional[Callable[[str], bool]] = None) -> str:
+        while True:
+            code = self.backend.pop(self._free_key())
+            if code is None:
+                n = self.backend.incr(self._counter_key()) - 1
+                if n >= self.size:
+                    raise CodeSpaceExhausted(f"No free {self.kind} codes left")
+                code = self.encode(n)
+            if is_taken is None or not is_taken(code):
+                return code
+
+    def release(self, code: str):
+        """Make an expired code available again."""
+        self.backend.push(self._free_key(), code)
+
+
+# 5-digit numeric room codes, same shape as before (10000-99999).
+ROOM_CODES = CodeAllocator("rooms", "0123456789", 5, offset=10000, size=90000)
+
+# CLS-XXXX classroom codes (~920k combinations).
+CLASSROOM_CODES = CodeAllocator("classrooms", FRIENDLY_ALPHABET, 4, prefix="CLS-")
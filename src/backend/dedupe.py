@@ -0,0 +1,182 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.search import get_question_index, index_questions, question_key
+from monitoring.metrics import inc, timed
+
+# -------------------------------
+# NEAR-DUPLICATE QUESTIONS (MINHASH + LSH)
+# -------------------------------
+# Each question becomes a set of 5-byte shingles of its normalised text and
+# options. A 64-value MinHash signature estimates Jaccard similarity between
+# two sets, and banding the signature (16 bands x 4 rows) gives LSH
+# buckets. A new question is compared only with the few bank items sharing a
+# bucket, not with every item. Candidates are confirmed when the estimated
+# similarity reaches THRESHOLD.
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+THRESHOLD = 0.8
+_PRIME = np.uint64((1 << 31) - 1)
+
+_rng = np.random.default_rng(0x5161)
+_A = _rng.integers(1, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_PACK = np.uint64(256) ** np.arange(SHINGLE, dtype=np.uint64)
+
+_NORMALIZE_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_text(question: Dict) -> str:
+    parts = [question.get("question", "")] + [str(o) for o in question.get("options") or []]
+    return _NORMALIZE_RE.sub(" ", " ".join(parts).lower()).strip()
+
+
+def shingles(text: str) -> np.ndarray:
+    """Distinct SHINGLE-byte windows of the UTF-8 text, packed into integers (< _PRIME)."""
+    data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    if len(data) < SHINGLE:
+        data = np.pad(data, (0, SHINGLE - len(data)))
+    windows = np.lib.stride_tricks.sliding_window_view(data, SHINGLE)
+    packed = windows @ _PACK
+    return np.unique(packed % _PRIME)
+
+
+def signature(question: Dict) -> np.ndarray:
+    """NUM_PERM min-hashes, vectorised over shingles x permutations."""
+    x = shingles(normalize_text(question))
+    return ((x[:, None] * _A[None, :] + _B[None, :]) % _PRIME).min(axis=0)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+class DedupeIndex:
+    def __init__(self, threshold: float = THRESHOLD):
+        self.threshold = threshold
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.questions: Dict[str, Dict] = {}
+        self.buckets: List[Dict[bytes, List[str]]] = [dict() for _ in range(BANDS)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    @staticmethod
+    def _bands(sig: np.ndarray) -> List[bytes]:
+        return [sig[b * ROWS:(b + 1) * ROWS].tobytes() for b in range(BANDS)]
+
+    def add(self, question: Dict, sig: np.ndarray = None) -> str:
+        """Add (or replace, same key) a bank item."""
+        key = question_key(question)
+        sig = signature(question) if sig is None else sig
+        with self._lock:
+            old = self.signatures.get(key)
+            if old is not None:
+                for band, bucket in zip(self._bands(old), self.buckets):
+                    bucket[band].remove(key)
+            self.signatures[key] = sig
+            self.questions[key] = question
+            for band, bucket in zip(self._bands(sig), self.buckets):
+                bucket.setdefault(band, []).append(key)
+        return key
+
+    def matches(self, question: Dict, sig: np.ndarray = None) -> List[Tuple[str, float]]:
+        """Bank items at or above the threshold, most similar first."""
+        sig = signature(question) if sig is None else sig
+        candidates = set()
+        with self._lock:
+            for band, bucket in zip(self._bands(sig), self.buckets):
+                candidates.update(bucket.get(band, ()))
+        scored = [(key, similarity(sig, self.signatures[key])) for key in candidates]
+        return sorted((m for m in scored if m[1] >= self.threshold), key=lambda m: -m[1])
+
+
+# -------------------------------
+# INGESTION
+# -------------------------------
+def _merge_into(existing: Dict, duplicate: Dict):
+    """Keep the bank item; borrow hints/explanation it doesn't have yet."""
+    hints = list(existing.get("hints") or [])
+    for hint in duplicate.get("hints") or []:
+        if hint not in hints:
+            hints.append(hint)
+    if hints:
+        existing["hints"] = hints
+    if not existing.get("explanation") and duplicate.get("explanation"):
+        existing["explanation"] = duplicate["explanation"]
+
+
+@timed("signsense_dedupe_seconds")
+def dedupe_questions(questions: Iterable[Dict], index: "DedupeIndex" = None,
+                     mode: str = "merge") -> Tuple[List[Dict], List[Dict]]:
+    """
+    Check an incoming set against the bank and against itself.
+
+    mode="merge": a duplicate's hints/explanation are folded into the bank item
+    mode="flag":  the duplicate is only marked with "duplicate_of"
+
+    Returns (new questions, [{"question", "duplicate_of", "similarity", "in_batch"}]).
+    New questions are added to the dedupe index as they are accepted.
+    """
+    index = index or get_dedupe_index()
+    fresh, report = [], []
+    batch_keys = set()
+    for q in questions:
+        if not q.get("question"):
+            continue
+        sig = signature(q)
+        found = index.matches(q, sig)
+        if not found:
+            batch_keys.add(index.add(q, sig))
+            fresh.append(q)
+            continue
+        key, score = found[0]
+        report.append({"question": q, "duplicate_of": key, "similarity": round(score, 3),
+                       "in_batch": key in batch_keys})
+        inc("signsense_duplicates_total", mode=mode)
+        if mode == "merge":
+            _merge_into(index.questions[key], q)
+        else:
+            q["duplicate_of"] = key
+    return fresh, report
+
+
+def ingest_questions(questions: List[Dict], subject: str, source: str,
+                     mode: str = "merge") -> Tuple[List[Dict], List[Dict]]:
+    """
+    The import path for PDF / AI sets: only new questions reach the search
+    index. Returns (questions for the quiz, duplicate report); the quiz keeps
+    items that repeat the bank (they are the user's material) but drops
+    repeats within the upload itself. Placeholder items (e.g. the PDF
+    "no MCQs detected" stand-in) go to the quiz but are never indexed.
+    """
+    fresh, report = dedupe_questions((q for q in questions if not q.get("placeholder")), mode=mode)
+    index_questions(fresh, subject, source)
+    repeats = {id(r["question"]) for r in report if r["in_batch"]}
+    return [q for q in questions if id(q) not in repeats], report
+
+
+_index: Optional[DedupeIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_dedupe_index() -> DedupeIndex:
+    """Seeded from the search index, so it covers every bank loaded so far."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = DedupeIndex()
+                bank = get_question_index()
+                for doc, q in enumerate(bank.docs):
+                    if doc not in bank.deleted:
+                        index.add(q)
+                _index = index
+    return _index
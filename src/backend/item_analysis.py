@@ -0,0 +1,332 @@
+"""
+Item analysis over every logged attempt.
+
+Attempts come from two places:
+
+    data/profiles.sqlite3   the append-only attempts table written by profile_store
+    classrooms              graded student answers (local state backend + Firestore)
+
+They are collected into flat arrays (learner, item, correct, seconds) and
+turned into a sparse learner x question matrix of per-learner success rates.
+All statistics are grouped reductions over those arrays, so the job scales
+with the number of attempts and has no per-item Python loop:
+
+    p_value          share of attempts answered correctly
+    discrimination   point-biserial correlation between the item and the
+                     learner's score on their *other* items
+    time_p25..p90    time-to-answer quantiles (solo quizzes only)
+
+Items with at least --min-attempts attempts get a calibrated difficulty
+(easy / medium / hard, from the p-value). The result is applied to the shared
+search index and written to data/item_calibration.json, which the index reloads
+on startup. Low-discrimination items are marked "review".
+
+Run from the repo root:
+
+    python src/backend/item_analysis.py --min-attempts 20
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from backend.logic import HISTORY_FIELDS
+from backend.profile_store import DB_PATH
+from backend.search import CALIBRATION_PATH, get_question_index, question_key
+from monitoring.metrics import timed
+
+EASY_P = 0.75            # p-value at or above -> easy
+HARD_P = 0.45            # p-value below -> hard
+MIN_ATTEMPTS = 20
+LOW_DISCRIMINATION = 0.15
+TIME_QUANTILES = (25, 50, 75, 90)
+
+
+# ---------------------------------------------------------
+# ATTEMPT LOG
+# ---------------------------------------------------------
+class AttemptLog:
+    """Append-only columns; learners and items are interned to dense ids."""
+
+    def __init__(self):
+        self.learners: Dict[str, int] = {}
+        self.items: Dict[str, int] = {}
+        self.learner = array("i")
+        self.item = array("i")
+        self.correct = array("b")
+        self.seconds = array("f")
+
+    def __len__(self) -> int:
+        return len(self.item)
+
+    def add(self, learner: str, item: str, correct: bool, seconds=None):
+        self.learner.append(self.learners.setdefault(learner, len(self.learners)))
+        self.item.append(self.items.setdefault(item, len(self.items)))
+        self.correct.append(1 if correct else 0)
+        self.seconds.append(float(seconds) if seconds is not None else float("nan"))
+
+    def add_history(self, learner: str, history: Iterable):
+        """QuizEngine.history records (or their dict form)."""
+        for rec in history:
+            self.add(learner, str(rec.get("id") or rec.get("question")),
+                     bool(rec.get("correct")), rec.get("time_taken"))
+
+    def arrays(self):
+        return (
+            np.frombuffer(self.learner, dtype=np.int32),
+            np.frombuffer(self.item, dtype=np.int32),
+            np.frombuffer(self.correct, dtype=np.int8),
+            np.frombuffer(self.seconds, dtype=np.float32),
+        )
+
+    def item_keys(self) -> List[str]:
+        keys = [""] * len(self.items)
+        for key, i in self.items.items():
+            keys[i] = key
+        return keys
+
+
+# ---------------------------------------------------------
+# SOURCES
+# ---------------------------------------------------------
+def add_profile_attempts(log: AttemptLog, path: Path = DB_PATH) -> int:
+    """Every attempt the profile store has logged, per learner in answer order (read-only)."""
+    path = Path(path)
+    if not path.exists():
+        return 0
+    before = len(log)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        has_log = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'attempts'"
+        ).fetchone()
+        # history only holds each learner's latest quiz; it is the fallback for
+        # databases the app has not opened since the attempt log was added
+        query = ("SELECT learner, record FROM attempts ORDER BY learner, id" if has_log
+                 else "SELECT learner, record FROM history ORDER BY learner, seq")
+        for learner, record in conn.execute(query):
+            rec = dict(zip(HISTORY_FIELDS, json.loads(record)))
+            log.add(learner, str(rec["id"] or rec["question"]), bool(rec["correct"]), rec["time_taken"])
+    finally:
+        conn.close()
+    return len(log) - before
+
+
+def _bank_keys() -> Dict[str, str]:
+    """Classroom questions are stored without ids; map their text back to the bank key."""
+    bank = get_question_index()
+    return {q.get("question", ""): question_key(q) for q in bank.docs}
+
+
+def add_classroom_attempts(log: AttemptLog) -> int:
+    """Graded answers from every classroom. Learners are scoped as "<code>/<name>"."""
+    from backend.cloud_store import LOCAL_CLASSROOMS, _db, grade_answer, normalize_question
+
+    keys = _bank_keys()
+    before = len(log)
+
+    def add(code: str, data: Dict):
+        questions = [normalize_question(q) for q in data.get("questions", [])]
+        for name, student in (data.get("students") or {}).items():
+            for idx, answer in (student.get("answers") or {}).items():
+                i = int(idx)
+                if not 0 <= i < len(questions):
+                    continue
+                graded = grade_answer(questions[i], answer)
+                if graded is None:
+                    continue
+                text = questions[i]["question"]
+                log.add(f"{code}/{name}", keys.get(text, text), graded)
+
+    seen = set()
+    db = _db()
+    if db is not None:
+        try:
+            for doc in db.collection("classrooms").stream():
+                seen.add(doc.id)
+                add(doc.id, doc.to_dict() or {})
+        except Exception:
+            pass
+    for code in LOCAL_CLASSROOMS.codes():
+        if code not in seen:
+            add(code, LOCAL_CLASSROOMS.get(code) or {})
+    return len(log) - before
+
+
+# ---------------------------------------------------------
+# ANALYSIS
+# ---------------------------------------------------------
+def calibrate(p_value: np.ndarray) -> np.ndarray:
+    return np.where(p_value >= EASY_P, "easy", np.where(p_value < HARD_P, "hard", "medium"))
+
+
+def _time_quantiles(item: np.ndarray, seconds: np.ndarray, n_items: int) -> Dict[int, np.ndarray]:
+    """
+    Per-item quantiles from one sort. Non-negative float32 bit patterns sort
+    like the floats, so (item << 32 | bits) orders by item, then time.
+    """
+    ok = np.isfinite(seconds)
+    item = item[ok]
+    bits = seconds[ok].astype(np.float32).clip(0).view(np.uint32)
+    ordered = np.sort((item.astype(np.uint64) << np.uint64(32)) | bits)
+    ordered = (ordered & np.uint64(0xFFFFFFFF)).astype(np.uint32).view(np.float32)
+    counts = np.bincount(item, minlength=n_items)
+    starts = np.cumsum(counts) - counts
+    out = {}
+    for q in TIME_QUANTILES:
+        pos = starts + np.floor((counts - 1).clip(0) * q / 100).astype(np.int64)
+        values = np.full(n_items, np.nan)
+        has = counts > 0
+        values[has] = ordered[pos[has]]
+        out[q] = values
+    return out
+
+
+@timed("signsense_item_analysis_seconds")
+def analyze(learner: np.ndarray, item: np.ndarray, correct: np.ndarray, seconds: np.ndarray,
+            item_keys: List[str], min_attempts: int = MIN_ATTEMPTS) -> Dict[str, Dict]:
+    """Per-item statistics keyed by question key (see the module docstring)."""
+    n_items = len(item_keys)
+    if not len(item):
+        return {}
+    n_learners = int(learner.max()) + 1
+    item = item.astype(np.int64)
+    correct = correct.astype(np.float64)
+
+    # repeated attempts by one learner collapse into a success rate per cell
+    cells, inverse = np.unique(learner.astype(np.int64) * n_items + item, return_inverse=True)
+    rate = np.bincount(inverse, weights=correct) / np.bincount(inverse)
+    rows, cols = cells // n_items, cells % n_items
+    matrix = sparse.csr_matrix((rate, (rows, cols)), shape=(n_learners, n_items))
+    seen = sparse.csr_matrix((np.ones_like(rate), (rows, cols)), shape=(n_learners, n_items))
+
+    ones = np.ones(n_items)
+    row_sum, row_n = matrix @ ones, seen @ ones
+
+    # point-biserial against the rest score, for learners with other items
+    others = row_n[rows] - 1
+    valid = others > 0
+    x = rate[valid]
+    rest = (row_sum[rows][valid] - x) / others[valid]
+    col = cols[valid]
+
+    def by_item(weights):
+        return np.bincount(col, weights=weights, minlength=n_items)
+
+    n = by_item(None)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x, mean_s = by_item(x) / n, by_item(rest) / n
+        cov = by_item(x * rest) / n - mean_x * mean_s
+        var_x = by_item(x * x) / n - mean_x ** 2
+        var_s = by_item(rest * rest) / n - mean_s ** 2
+        discrimination = cov / np.sqrt(var_x * var_s)
+        attempts = np.bincount(item, minlength=n_items)
+        p_value = np.bincount(item, weights=correct, minlength=n_items) / attempts
+    discrimination[~np.isfinite(discrimination)] = np.nan
+
+    learners = np.asarray(seen.sum(axis=0)).ravel()
+    times = _time_quantiles(item, seconds, n_items)
+    difficulty = calibrate(np.nan_to_num(p_value))
+
+    def num(v, digits=3):
+        return None if not np.isfinite(v) else round(float(v), digits)
+
+    report = {}
+    for i, key in enumerate(item_keys):
+        enough = attempts[i] >= min_attempts
+        entry = {
+            "attempts": int(attempts[i]),
+            "learners": int(learners[i]),
+            "p_value": num(p_value[i]),
+            "discrimination": num(discrimination[i]),
+            "difficulty": str(difficulty[i]) if enough else None,
+            "review": bool(enough and discrimination[i] < LOW_DISCRIMINATION),
+        }
+        for q in TIME_QUANTILES:
+            entry[f"time_p{q}"] = num(times[q][i], 2)
+        report[key] = entry
+    return report
+
+
+# ---------------------------------------------------------
+# WRITE-BACK
+# ---------------------------------------------------------
+def apply_calibration(report: Dict[str, Dict], index=None) -> int:
+    """Move calibrated items to their new difficulty bucket in the search index."""
+    index = index or get_question_index()
+    changed = 0
+    for key, entry in report.items():
+        difficulty = entry["difficulty"]
+        doc = index.by_key.get(key)
+        if difficulty and doc is not None and index.difficulty[doc] != difficulty:
+            changed += index.set_difficulty(key, difficulty)
+    return changed
+
+
+def save_calibration(report: Dict[str, Dict], path: Path = CALIBRATION_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"created": time.time(), "items": report}
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=1)
+    tmp.replace(path)
+
+
+def run_item_analysis(min_attempts: int = MIN_ATTEMPTS, profile_db: Path = DB_PATH,
+                      out: Optional[Path] = CALIBRATION_PATH) -> Dict:
+    """Collect, analyse, apply to the shared index and (optionally) persist."""
+    log = AttemptLog()
+    sources = {
+        "profiles": add_profile_attempts(log, profile_db),
+        "classrooms": add_classroom_attempts(log),
+    }
+    start = time.perf_counter()
+    report = analyze(*log.arrays(), log.item_keys(), min_attempts=min_attempts)
+    elapsed = time.perf_counter() - start
+    changed = apply_calibration(report)
+    if out is not None:
+        save_calibration(report, out)
+    return {
+        "attempts": len(log),
+        "learners": len(log.learners),
+        "sources": sources,
+        "seconds": round(elapsed, 3),
+        "recalibrated": changed,
+        "items": report,
+    }
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-attempts", type=int, default=MIN_ATTEMPTS)
+    parser.add_argument("--profile-db", type=Path, default=DB_PATH)
+    parser.add_argument("--out", type=Path, default=CALIBRATION_PATH)
+    args = parser.parse_args()
+
+    result = run_item_analysis(args.min_attempts, args.profile_db, args.out)
+    review = sorted(k for k, v in result["items"].items() if v["review"])
+    print(f"{result['attempts']} attempts by {result['learners']} learners "
+          f"over {len(result['items'])} questions, analysed in {result['seconds']}s")
+    print(f"{result['recalibrated']} difficulties changed; {len(review)} marked for review")
+    for key in review[:20]:
+        print(f"  review: {key}")
+    print(f"Written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
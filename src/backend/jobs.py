@@ -0,0 +1,261 @@
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from monitoring.metrics import inc, observe
+
+# -------------------------------
+# BACKGROUND JOBS
+# -------------------------------
+# Heavy work (PDF parsing, LLM calls, quiz generation) is submitted here and
+# not run in the Streamlit script thread. The page keeps a job id and polls
+# status() from a fragment.
+#
+# Pending jobs sit in one heap ordered by (priority, submission). A worker
+# takes the first job whose owner is under PER_USER running jobs, so one user
+# queueing many jobs cannot starve the others. CPU-bound jobs (process=True)
+# are handed to a spawn-based process pool; their worker thread just waits.
+# Finished jobs are kept in a bounded LRU store until polled or evicted.
+#
+# Cancelling a queued job removes it. A running job cannot be interrupted;
+# it is marked cancelled and its result is dropped. Functions may check
+# current_job().cancel_requested to stop early.
+
+PRIORITY_INTERACTIVE = 0    # someone is waiting on screen (chat reply)
+PRIORITY_NORMAL = 5         # uploads, imports
+PRIORITY_BULK = 9           # generation / batch work
+
+WORKERS = int(os.getenv("SIGNSENSE_JOB_WORKERS", 4))
+PROCESS_WORKERS = int(os.getenv("SIGNSENSE_JOB_PROCESSES", 2))
+PER_USER = int(os.getenv("SIGNSENSE_JOB_PER_USER", 2))
+RESULT_CAPACITY = int(os.getenv("SIGNSENSE_JOB_RESULTS", 500))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_current = threading.local()
+
+
+class Job:
+    __slots__ = ("id", "kind", "owner", "priority", "fn", "args", "kwargs", "process", "state",
+                 "result", "error", "submitted", "started", "finished", "cancel_requested")
+
+    def __init__(self, fn: Callable, args, kwargs, owner: str, kind: str, priority: int, process: bool):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.priority = priority
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.process = process
+        self.state = QUEUED
+        self.result = None
+        self.error: Optional[str] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.cancel_requested = threading.Event()
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "owner": self.owner,
+            "state": self.state,
+            "result": self.result if self.state == DONE else None,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+def current_job() -> Optional[Job]:
+    """The job running on this worker thread, if any."""
+    return getattr(_current, "job", None)
+
+
+class JobScheduler:
+    def __init__(self, workers: int = WORKERS, processes: int = PROCESS_WORKERS,
+                 per_user: int = PER_USER, capacity: int = RESULT_CAPACITY):
+        self.workers = workers
+        self.processes = processes
+        self.per_user = per_user
+        self.capacity = capacity
+        self._heap: List = []                       # (priority, seq, job)
+        self._seq = itertools.count()
+        self._active: Dict[str, Job] = {}           # queued + running
+        self._results: "OrderedDict[str, Job]" = OrderedDict()
+        self._running: Dict[str, int] = {}          # owner -> running jobs
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._closed = False
+
+    # -----------------------------------------------------
+    # API
+    # -----------------------------------------------------
+    def submit(self, fn: Callable, *args, owner: str = "anonymous", kind: str = None,
+               priority: int = PRIORITY_NORMAL, process: bool = False, **kwargs) -> str:
+        """Queue fn(*args, **kwargs); process=True needs a picklable module-level fn."""
+        job = Job(fn, args, kwargs, owner, kind or getattr(fn, "__name__", "job"), priority, process)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is shut down")
+            self._start_workers()
+            self._active[job.id] = job
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._cond.notify()
+        inc("signsense_jobs_total", kind=job.kind, state=QUEUED)
+        return job.id
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """State snapshot (with the result once done), or None if unknown / evicted."""
+        with self._cond:
+            job = self._active.get(job_id) or self._results.get(job_id)
+            if job is None:
+                return None
+            if job.id in self._results:
+                self._results.move_to_end(job.id)
+            return job.to_dict()
+
+    def wait(self, job_id: str, timeout: float = None) -> Optional[Dict]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while job_id in self._active:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.status(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        with self._cond:
+            job = self._active.get(job_id)
+            if job is None:
+                return False
+            job.cancel_requested.set()
+            if job.state == QUEUED:
+                # the heap entry is skipped lazily when it reaches the top
+                self._finish(job, CANCELLED)
+            return True
+
+    def jobs_for(self, owner: str) -> List[Dict]:
+        with self._cond:
+            return [j.to_dict() for j in self._active.values() if j.owner == owner]
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            queued = sum(1 for j in self._active.values() if j.state == QUEUED)
+            return {"queued": queued, "running": len(self._active) - queued,
+                    "stored_results": len(self._results)}
+
+    def shutdown(self, wait: bool = True):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    # -----------------------------------------------------
+    # WORKERS
+    # -----------------------------------------------------
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"signsense-job-{len(self._threads)}",
+                                      daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _take(self) -> Optional[Job]:
+        """Pop the best runnable job; jobs of owners at their cap stay queued."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                skipped, job = [], None
+                while self._heap:
+                    entry = heapq.heappop(self._heap)
+                    candidate = entry[2]
+                    if candidate.state != QUEUED:
+                        continue                      # cancelled while queued
+                    if self._running.get(candidate.owner, 0) >= self.per_user:
+                        skipped.append(entry)
+                        continue
+                    job = candidate
+                    break
+                for entry in skipped:
+                    heapq.heappush(self._heap, entry)
+                if job is not None:
+                    job.state, job.started = RUNNING, time.time()
+                    self._running[job.owner] = self._running.get(job.owner, 0) + 1
+                    return job
+                self._cond.wait()
+
+    def _work(self):
+        while True:
+            job = self._take()
+            if job is None:
+                return
+            observe("signsense_job_wait_seconds", job.started - job.submitted, kind=job.kind)
+            _current.job = job
+            try:
+                if job.process:
+                    result = self._process_pool().submit(job.fn, *job.args, **job.kwargs).result()
+                else:
+                    result = job.fn(*job.args, **job.kwargs)
+                state, error = DONE, None
+            except Exception as exc:
+                result, state, error = None, FAILED, f"{type(exc).__name__}: {exc}"
+            finally:
+                _current.job = None
+            with self._cond:
+                self._running[job.owner] -= 1
+                if not self._running[job.owner]:
+                    del self._running[job.owner]
+                if job.cancel_requested.is_set():
+                    result, state = None, CANCELLED
+                job.result, job.error = result, error
+                self._finish(job, state)
+            observe("signsense_job_run_seconds", job.finished - job.started, kind=job.kind)
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._cond:
+            if self._pool is None:
+                # spawn: forking a threaded server process is not safe
+                self._pool = ProcessPoolExecutor(self.processes,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _finish(self, job: Job, state: str):
+        """Move a job to the result store (caller holds the lock)."""
+        job.state, job.finished = state, time.time()
+        job.fn = job.args = job.kwargs = None
+        self._active.pop(job.id, None)
+        self._results[job.id] = job
+        while len(self._results) > self.capacity:
+            self._results.popitem(last=False)
+        self._cond.notify_all()
+        inc("signsense_jobs_total", kind=job.kind, state=state)
+
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = JobScheduler()
+    return _scheduler
@@ -0,0 +1,152 @@
+import heapq
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from backend.state_backend import Namespace
+from monitoring.metrics import inc, timed
+
+# -------------------------------
+# GLOBAL LEADERBOARDS (PRE-AGGREGATED)
+# -------------------------------
+# Every add_score event is folded into a small number of buckets: the UTC
+# day, the ISO week, and all-time. Each granularity is kept per subject and
+# mode, with "*" meaning any. A bucket is a top-k sketch: each player's best
+# score in it, capped at CAPACITY players (the lowest are evicted). Reading
+# a window is one bucket get. A custom range of days merges at most that
+# many buckets, so the cost never depends on how many scores were ever
+# recorded.
+#
+# Merging is exact for k <= CAPACITY. Eviction follows the ranking order,
+# ties included, so a player missing from a bucket had CAPACITY distinct
+# players ranked above them there. Those players are still above them after
+# the merge, so they cannot reach the merged top k.
+#
+# Day buckets are kept for DAY_RETENTION days, the longest top_days window.
+# Week buckets are kept for the current and the previous week. The first
+# score of each new day prunes anything older, so storage stays bounded.
+
+CAPACITY = int(os.getenv("SIGNSENSE_LEADERBOARD_CAPACITY", 200))
+DAY_RETENTION = int(os.getenv("SIGNSENSE_LEADERBOARD_DAYS", 31))
+WEEK_RETENTION = 2
+DAY = 86400
+ANY = "*"
+WINDOWS = ("day", "week", "all")
+
+BUCKETS = Namespace("leaderboard")
+
+
+def bucket_id(window: str, now: float) -> str:
+    if window == "day":
+        return time.strftime("%Y-%m-%d", time.gmtime(now))
+    if window == "week":
+        return time.strftime("%G-W%V", time.gmtime(now))
+    return "all"
+
+
+def _top(scores: Dict[str, int], k: int) -> List[Dict]:
+    best = heapq.nsmallest(k, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [{"rank": i, "name": name, "score": score} for i, (name, score) in enumerate(best, 1)]
+
+
+class Leaderboards:
+    def __init__(self, namespace: Namespace = BUCKETS, capacity: int = CAPACITY,
+                 day_retention: int = DAY_RETENTION):
+        self.buckets = namespace
+        self.capacity = capacity
+        self.day_retention = day_retention
+        self._pruned_for: Optional[str] = None   # day of the last prune in this process
+
+    @staticmethod
+    def _key(window: str, bucket: str, subject: str, mode: str) -> str:
+        return f"{window}:{bucket}:{subject}:{mode}"
+
+    def record(self, name: str, score: int, mode: str, subject: str, now: float = None):
+        """Fold one score into day/week/all-time buckets for every subject/mode slice."""
+        now = time.time() if now is None else now
+        name, score = name or "Anonymous", int(score)
+        subject, mode = (subject or ANY).lower(), (mode or ANY).lower()
+        capacity = self.capacity
+
+        def merge(bucket):
+            bucket = bucket or {}
+            if score <= bucket.get(name, -1):
+                return None          # nothing to write
+            bucket = dict(bucket)    # readers may hold the old dict (memory backend)
+            if name not in bucket and len(bucket) >= capacity:
+                # the player ranked last by _top (ties go to the earlier name)
+                floor_name = max(bucket, key=lambda n: (-bucket[n], n))
+                if (-score, name) > (-bucket[floor_name], floor_name):
+                    return None
+                del bucket[floor_name]
+            bucket[name] = score
+            return bucket
+
+        for window in WINDOWS:
+            bucket = bucket_id(window, now)
+            for s in {subject, ANY}:
+                for m in {mode, ANY}:
+                    self.buckets.update(self._key(window, bucket, s, m), merge)
+        inc("signsense_leaderboard_events_total")
+
+        today = bucket_id("day", now)
+        if today != self._pruned_for:
+            self._pruned_for = today
+            self.prune(now)
+
+    def prune(self, now: float = None) -> int:
+        """Delete day/week buckets older than their retention; returns how many."""
+        now = time.time() if now is None else now
+        # ids sort chronologically ("2024-05-01", "2024-W18")
+        cutoff = {
+            "day": bucket_id("day", now - (self.day_retention - 1) * DAY),
+            "week": bucket_id("week", now - (WEEK_RETENTION - 1) * 7 * DAY),
+        }
+        removed = 0
+        for key in self.buckets.codes():
+            window, bucket = key.split(":", 2)[:2]
+            if window in cutoff and bucket < cutoff[window]:
+                removed += bool(self.buckets.delete(key))
+        if removed:
+            inc("signsense_leaderboard_pruned_total", removed)
+        return removed
+
+    @timed("signsense_leaderboard_seconds")
+    def top(self, window: str = "all", subject: str = None, mode: str = None, k: int = 10,
+            now: float = None) -> List[Dict]:
+        """Top k for the current day, week or all-time."""
+        now = time.time() if now is None else now
+        key = self._key(window, bucket_id(window, now), (subject or ANY).lower(), (mode or ANY).lower())
+        return _top(self.buckets.get(key) or {}, k)
+
+    @timed("signsense_leaderboard_seconds")
+    def top_days(self, days: int, subject: str = None, mode: str = None, k: int = 10,
+                 now: float = None) -> List[Dict]:
+        """Top k over the last `days` UTC days (merges one bucket per day, at most day_retention)."""
+        now = time.time() if now is None else now
+        days = min(days, self.day_retention)
+        return _top(self.merge(
+            self.buckets.get(self._key("day", bucket_id("day", now - d * 86400),
+                                       (subject or ANY).lower(), (mode or ANY).lower()))
+            for d in range(days)
+        ), k)
+
+    @staticmethod
+    def merge(buckets: Iterable[Optional[Dict[str, int]]]) -> Dict[str, int]:
+        merged: Dict[str, int] = {}
+        for bucket in buckets:
+            for name, score in (bucket or {}).items():
+                if score > merged.get(name, -1):
+                    merged[name] = score
+        return merged
+
+
+LEADERBOARDS = Leaderboards()
+
+
+def record_score(name: str, score: int, mode: str, subject: str, now: float = None):
+    LEADERBOARDS.record(name, score, mode, subject, now)
+
+
+def top_scores(window: str = "all", subject: str = None, mode: str = None, k: int = 10) -> List[Dict]:
+    return LEADERBOARDS.top(window, subject, mode, k)
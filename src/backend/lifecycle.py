@@ -0,0 +1,276 @@
+import gzip
+import heapq
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.state_backend import Namespace
+from monitoring.metrics import inc
+
+# -------------------------------
+# ROOM / CLASSROOM LIFECYCLE
+# -------------------------------
+# touch() records activity in O(1). A per-process heap holds one deadline per
+# known room; the sweeper pops at most MAX_PER_TICK due entries per tick and
+# re-pushes any that saw activity since (lazy deadlines). Expired rooms and
+# classrooms are archived as gzip'd columnar JSON and their codes recycled.
+#
+# Last activity is also written (throttled) to the shared state backend, so a
+# process never expires a room another process is still using.
+
+ROOM_TTL = float(os.getenv("SIGNSENSE_ROOM_TTL", 6 * 60 * 60))
+FINISHED_TTL = float(os.getenv("SIGNSENSE_FINISHED_TTL", 15 * 60))
+SWEEP_INTERVAL = float(os.getenv("SIGNSENSE_SWEEP_INTERVAL", 30))
+MAX_PER_TICK = int(os.getenv("SIGNSENSE_SWEEP_BATCH", 100))
+SHARED_WRITE_EVERY = 60.0  # seconds between shared last-activity writes per room
+
+ARCHIVE_DIR = Path(os.getenv(
+    "SIGNSENSE_ARCHIVE_DIR",
+    Path(__file__).resolve().parents[2] / "data" / "archive",
+))
+
+ACTIVITY = Namespace("activity")
+
+Entry = Tuple[float, str, str]  # (deadline, kind, code)
+
+
+class LifecycleManager:
+    def __init__(self, ttl: float = ROOM_TTL, finished_ttl: float = FINISHED_TTL,
+                 max_per_tick: int = MAX_PER_TICK, archive_dir: Path = ARCHIVE_DIR):
+        self.ttl = ttl
+        self.finished_ttl = finished_ttl
+        self.max_per_tick = max_per_tick
+        self.archive_dir = Path(archive_dir)
+        self.last_seen: Dict[Tuple[str, str], float] = {}
+        self.finished: Dict[Tuple[str, str], bool] = {}
+        self._shared_written: Dict[Tuple[str, str], float] = {}
+        self._scheduled: Dict[Tuple[str, str], float] = {}  # deadline of the live heap entry
+        self._heap: List[Entry] = []
+        self._lock = threading.Lock()
+        self._seed: Optional[Iterator[Tuple[str, str, float]]] = None
+
+    # -----------------------------------------------------
+    # ACTIVITY
+    # -----------------------------------------------------
+    def touch(self, kind: str, code: str, finished: bool = False, now: float = None,
+              share: bool = True):
+        now = time.time() if now is None else now
+        key = (kind, code)
+        with self._lock:
+            self.last_seen[key] = now
+            self.finished[key] = finished
+            # only (re)schedule when the deadline moves earlier; later ones are
+            # picked up when the existing entry is popped
+            deadline = now + self._ttl_for(key)
+            if deadline < self._scheduled.get(key, float("inf")):
+                self._schedule(key, deadline)
+            write_shared = share and now - self._shared_written.get(key, 0) >= SHARED_WRITE_EVERY
+            if write_shared:
+                self._shared_written[key] = now
+        if write_shared:
+            try:
+                ACTIVITY.set(f"{kind}:{code}", now)
+            except Exception:
+                pass
+
+    def forget(self, kind: str, code: str):
+        key = (kind, code)
+        with self._lock:
+            self.last_seen.pop(key, None)
+            self.finished.pop(key, None)
+            self._shared_written.pop(key, None)
+            self._scheduled.pop(key, None)
+
+    def _schedule(self, key, deadline: float):
+        self._scheduled[key] = deadline
+        heapq.heappush(self._heap, (deadline, key[0], key[1]))
+
+    def _ttl_for(self, key) -> float:
+        return self.finished_ttl if self.finished.get(key) else self.ttl
+
+    # -----------------------------------------------------
+    # SEEDING (rooms/classrooms created before this process started)
+    # -----------------------------------------------------
+    def _existing(self) -> Iterator[Tuple[str, str, float]]:
+        from live.live_sync import ROOMS_DIR
+        from backend.cloud_store import LOCAL_CLASSROOMS
+
+        with os.scandir(ROOMS_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    yield "room", entry.name[:-5], entry.stat().st_mtime
+        for code in LOCAL_CLASSROOMS.codes():
+            yield "classroom", code, time.time()
+
+    def _seed_some(self, budget: int) -> int:
+        if self._seed is None:
+            self._seed = self._existing()
+        used = 0
+        for kind, code, seen in self._seed:
+            if (kind, code) not in self.last_seen:
+                # don't overwrite newer shared activity with a file mtime
+                self.touch(kind, code, now=seen, share=False)
+            used += 1
+            if used >= budget:
+                return used
+        self._seed = iter(())
+        return used
+
+    # -----------------------------------------------------
+    # SWEEP
+    # -----------------------------------------------------
+    def sweep(self, now: float = None) -> List[Tuple[str, str]]:
+        """One bounded tick: at most max_per_tick seed reads plus max_per_tick expiries."""
+        now = time.time() if now is None else now
+        try:
+            self._seed_some(self.max_per_tick)
+        except Exception:
+            self._seed = iter(())
+
+        expired = []
+        for _ in range(self.max_per_tick):
+            with self._lock:
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                popped, kind, code = heapq.heappop(self._heap)
+                key = (kind, code)
+                seen = self.last_seen.get(key)
+                if seen is None or self._scheduled.get(key) != popped:
+                    continue  # forgotten, or superseded by an earlier entry
+                deadline = seen + self._ttl_for(key)
+                if deadline > now:
+                    self._schedule(key, deadline)
+                    continue
+
+            shared = ACTIVITY.get(f"{kind}:{code}")
+            if shared is not None and shared + self._ttl_for(key) > now:
+                # still active in another process
+                with self._lock:
+                    self.last_seen[key] = max(self.last_seen.get(key, 0), shared)
+                    self._schedule(key, self.last_seen[key] + self._ttl_for(key))
+                continue
+
+            try:
+                self.expire(kind, code, now)
+                expired.append(key)
+            except Exception:
+                # try again next time round instead of leaking the room
+                with self._lock:
+                    self._schedule(key, now + SWEEP_INTERVAL)
+        return expired
+
+    def expire(self, kind: str, code: str, now: float):
+        if kind == "room":
+            from live import live_sync
+            room = live_sync.load_room(code)
+            if room:
+                archive(self.archive_dir, "room", code, room_columns(room), now,
+                        meta={"state": room.get("state"), "question_index": room.get("question_index")})
+            # only the caller that actually removed the room frees its code;
+            # a code released twice would be handed to two live rooms
+            try:
+                live_sync.room_path(code).unlink()
+                removed = True
+            except FileNotFoundError:
+                removed = False
+            if removed:
+                from backend.codes import ROOM_CODES
+                ROOM_CODES.release(code)
+        else:
+            from backend.cloud_store import LOCAL_CLASSROOMS
+            classroom = LOCAL_CLASSROOMS.get(code)
+            if classroom:
+                archive(self.archive_dir, "classroom", code, classroom_columns(classroom), now,
+                        meta={"questions": classroom.get("questions", [])})
+            if LOCAL_CLASSROOMS.delete(code):
+                from backend.codes import CLASSROOM_CODES
+                CLASSROOM_CODES.release(code)
+
+        ACTIVITY.delete(f"{kind}:{code}")
+        self.forget(kind, code)
+        inc("signsense_expired_total", kind=kind)
+
+
+# -------------------------------
+# ARCHIVE (COLUMNAR, GZIP)
+# -------------------------------
+def room_columns(room: Dict) -> Dict[str, list]:
+    cols = {"player": [], "q_index": [], "answer": [], "score": []}
+    for name, info in room.get("players", {}).items():
+        answers = info.get("answers") or {}
+        if not answers and info.get("answer"):
+            answers = {str(room.get("question_index", 0)): info["answer"]}
+        for q_index, answer in answers.items():
+            cols["player"].append(name)
+            cols["q_index"].append(int(q_index))
+            cols["answer"].append(answer)
+            cols["score"].append(info.get("score", 0))
+    return cols
+
+
+def classroom_columns(classroom: Dict) -> Dict[str, list]:
+    cols = {"student": [], "q_index": [], "answer": [], "score": []}
+    for name, info in classroom.get("students", {}).items():
+        for q_index, answer in (info.get("answers") or {}).items():
+            cols["student"].append(name)
+            cols["q_index"].append(int(q_index))
+            cols["answer"].append(answer)
+            cols["score"].append(info.get("score", 0))
+    return cols
+
+
+def archive(archive_dir: Path, kind: str, code: str, columns: Dict[str, list],
+            now: float, meta: Dict = None) -> Path:
+    day = time.strftime("%Y-%m-%d", time.gmtime(now))
+    out_dir = Path(archive_dir) / kind / day
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{code}-{int(now)}.json.gz"
+    payload = {
+        "kind": kind,
+        "code": code,
+        "archived_at": now,
+        "rows": len(next(iter(columns.values()), [])),
+        "meta": meta or {},
+        "columns": columns,
+    }
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    return path
+
+
+# -------------------------------
+# PROCESS-WIDE MANAGER + SWEEPER
+# -------------------------------
+MANAGER = LifecycleManager()
+
+_sweeper_lock = threading.Lock()
+_sweeper_started = False
+
+
+def touch(kind: str, code: str, finished: bool = False):
+    if code:
+        MANAGER.touch(kind, code, finished=finished)
+
+
+def _sweep_forever(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            MANAGER.sweep()
+        except Exception:
+            pass
+
+
+def start_sweeper(interval: float = SWEEP_INTERVAL):
+    global _sweeper_started
+    if _sweeper_started:
+        return
+    with _sweeper_lock:
+        if _sweeper_started:
+            return
+        _sweeper_started = True
+        threading.Thread(target=_sweep_forever, args=(interval,), name="lifecycle-sweeper",
+                         daemon=True).start()
@@ -1,8 +1,80 @@
 import json
+import sys
 import time
 import random
+from collections.abc import Mapping
 from pathlib import Path
 
+# Field order used when history records are serialized as compact rows.
+HISTORY_FIELDS = (
+    "id", "question", "subject", "mode", "selected", "correct",
+    "correct_answer", "difficulty", "time_taken", "points",
+)
+
+
+class HistoryRecord(Mapping):
+    """
+    One answered question. Question text, id, answer key and difficulty are
+    read through a reference to the question dict instead of being copied;
+    subject/mode are interned and `selected` reuses the option string when it
+    is one. Reads like the old per-answer dict (rec["question"], rec.get(...)).
+    """
+
+    __slots__ = ("q", "subject", "mode", "selected", "correct", "time_taken", "points")
+
+    def __init__(self, q: dict, subject: str, mode: str, selected, correct: bool, time_taken, points: int):
+        self.q = q
+        self.subject = sys.intern(subject) if isinstance(subject, str) else subject
+        self.mode = sys.intern(mode) if isinstance(mode, str) else mode
+        for option in q.get("options", ()):
+            if option == selected:
+                selected = option
+                break
+        self.selected = selected
+        self.correct = correct
+        self.time_taken = time_taken
+        self.points = points
+
+    def __getitem__(self, key):
+        if key == "id":
+            return self.q.get("id")
+        if key == "question":
+            return self.q["question"]
+        if key == "correct_answer":
+            return self.q["answer"]
+        if key == "difficulty":
+            return self.q.get("difficulty", "unknown")
+        if key in HISTORY_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(HISTORY_FIELDS)
+
+    def __len__(self):
+        return len(HISTORY_FIELDS)
+
+    def __repr__(self):
+        return f"HistoryRecord({dict(self)!r})"
+
+    def to_dict(self) -> dict:
+        return dict(self)
+
+    @classmethod
+    def from_row(cls, row: list, questions_by_id: dict):
+        """Inverse of QuizEngine.history_row; re-links to the bank question when it is there."""
+        rec = dict(zip(HISTORY_FIELDS, row))
+        q = questions_by_id.get(rec["id"]) or questions_by_id.get(rec["question"])
+        if q is None:
+            q = {
+                "id": rec["id"],
+                "question": rec["question"],
+                "answer": rec["correct_answer"],
+                "difficulty": rec["difficulty"],
+            }
+        return cls(q, rec["subject"], rec["mode"], rec["selected"], rec["correct"],
+                   rec["time_taken"], rec["points"])
+
 
 class QuizEngine:
     def __init__(self, mode: str, subject: str):
@@ -76,18 +148,7 @@ class QuizEngine:
 
         self.best_streak = max(self.best_streak, self.streak)
 
-        record = {
-            "id": q.get("id"),
-            "question": q["question"],
-            "subject": self.subject,
-            "mode": self.mode,
-            "selected": user_answer,
-            "correct": correct,
-            "correct_answer": q["answer"],
-            "difficulty": q.get("difficulty", "unknown"),
-            "time_taken": time_taken,
-            "points": points,
-        }
+        record = HistoryRecord(q, self.subject, self.mode, user_answer, correct, time_taken, points)
         self.history.append(record)
 
         return {
@@ -99,3 +160,46 @@ class QuizEngine:
 
     def next_question(self):
         self.current_index += 1
+
+    # -----------------------------
+    # CHECKPOINT / RESTORE
+    # -----------------------------
+    def to_state(self) -> dict:
+        """Scalar progress only; questions and history are persisted separately."""
+        return {
+            "mode": self.mode,
+            "subject": self.subject,
+            "current_index": self.current_index,
+            "score": self.score,
+            "streak": self.streak,
+            "best_streak": self.best_streak,
+        }
+
+    @staticmethod
+    def history_row(record: dict) -> list:
+        return [record.get(field) for field in HISTORY_FIELDS]
+
+    @classmethod
+    def from_state(cls, state: dict, questions: list, history_rows: list):
+        """Rebuild an engine without reloading or reshuffling the question bank."""
+        engine = cls.__new__(cls)
+        engine.mode = state["mode"]
+        engine.subject = state["subject"]
+        engine.current_index = state["current_index"]
+        engine.score = state["score"]
+        engine.streak = state["streak"]
+        engine.best_streak = state["best_streak"]
+        by_id = {}
+        for q in questions:
+            by_id.setdefault(q.get("id") or q.get("question"), q)
+        engine.history = [HistoryRecord.from_row(row, by_id) for row in history_rows]
+        engine.start_time = None
+        engine.questions = questions
+        return engine
+
+    @classmethod
+    def for_questions(cls, mode: str, subject: str, questions: list):
+        """A fresh engine over exactly `questions` (in order), skipping the bank load."""
+        state = {"mode": mode, "subject": subject, "current_index": 0,
+                 "score": 0, "streak": 0, "best_streak": 0}
+        return cls.from_state(state, questions, [])
@@ -0,0 +1,83 @@
+import io
+import re
+
+# ---------------------------------------------------------
+# PDF HELPERS
+# ---------------------------------------------------------
+# Module-level (not in streamlit_app.py) so the job scheduler can run them in
+# a worker process.
+
+
+def extract_text_from_pdf(pdf_file):
+    try:
+        import PyPDF2
+        reader = PyPDF2.PdfReader(pdf_file)
+        text = ""
+        for page in reader.pages:
+            text += page.extract_text() or ""
+        return text
+    except Exception:
+        return ""
+
+
+def generate_questions_from_pdf(text):
+    """
+    Generic MCQ parser for independent dataset PDFs.
+    Supports standard formats like:
+    1. Question
+    a) Option
+    b) Option
+    c) Option
+    d) Option
+    """
+
+    questions = []
+    lines = [l.strip() for l in text.split("\n") if l.strip()]
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+
+        # Detect question (starts with number + dot)
+        if re.match(r"^\d+\.", line):
+            question_text = re.sub(r"^\d+\.\s*", "", line)
+            options = []
+
+            j = i + 1
+            while j < len(lines) and len(options) < 4:
+                if re.match(r"^[a-dA-D][\)\.]", lines[j]):
+                    option = re.sub(r"^[a-dA-D][\)\.]\s*", "", lines[j])
+                    options.append(option)
+                j += 1
+
+            if len(options) >= 2:
+                questions.append({
+                    "question": question_text,
+                    "options": options,
+                    "answer": options[0],  # placeholder
+                })
+
+            i = j
+        else:
+            i += 1
+
+    # Fallback (never crash)
+    if not questions:
+        questions = [{
+            "question": "Dataset loaded successfully, but no MCQs detected.",
+            "options": [
+                "Check PDF format",
+                "Ensure MCQ structure",
+                "Try another dataset"
+            ],
+            "answer": "Check PDF format",
+            "placeholder": True,   # not real content: never indexed
+        }]
+
+    return questions
+
+
+def questions_from_pdf_bytes(data: bytes):
+    """Upload bytes -> parsed MCQs ([] when no text); the unit of work for a background job."""
+    text = extract_text_from_pdf(io.BytesIO(data))
+    return generate_questions_from_pdf(text) if text.strip() else []
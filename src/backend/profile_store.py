@@ -0,0 +1,170 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from backend.logic import QuizEngine
+from monitoring.metrics import timed
+
+# -------------------------------
+# LEARNER PROFILE STORE (SQLITE)
+# -------------------------------
+# One row per learner with the engine's scalar progress plus the shuffled
+# question list (zlib-compressed JSON, written once per quiz), and one row per
+# answered question (compact JSON array). Checkpoints after an answer touch a
+# single session row and append one history row; restore is a single query.
+# The next history offset is read inside the write transaction, so several
+# sessions or processes checkpointing one learner never skip or repeat rows.
+#
+# `history` is the current quiz only (a restart clears it). Every new row is
+# also appended to `attempts`, which is never cleared. Item analysis and
+# knowledge-tracing training read that table.
+
+DB_PATH = Path(os.getenv(
+    "SIGNSENSE_PROFILE_DB",
+    Path(__file__).resolve().parents[2] / "data" / "profiles.sqlite3",
+))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    learner TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    questions BLOB NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    learner TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (learner, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    learner TEXT NOT NULL,
+    created REAL NOT NULL,
+    record TEXT NOT NULL
+);
+"""
+
+
+def _pack(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+class ProfileStore:
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        fresh = not self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'attempts'"
+        ).fetchone()
+        self._conn.executescript(SCHEMA)
+        if fresh:
+            # databases from before the attempt log: keep what history still has
+            self._conn.execute(
+                "INSERT INTO attempts (learner, created, record) "
+                "SELECT learner, ?, record FROM history ORDER BY learner, seq",
+                (time.time(),),
+            )
+        self._lock = threading.Lock()
+
+    @timed("signsense_backend_seconds", backend="profile_store")
+    def start_session(self, learner: str, engine: QuizEngine):
+        questions = zlib.compress(_pack(engine.questions).encode("utf-8"))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM history WHERE learner = ?", (learner,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (learner, state, questions, updated) VALUES (?, ?, ?, ?)",
+                    (learner, _pack(engine.to_state()), questions, time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                # never leave the shared connection inside a transaction
+                self._conn.execute("ROLLBACK")
+                raise
+        self.checkpoint(learner, engine)
+
+    @timed("signsense_backend_seconds", backend="profile_store")
+    def checkpoint(self, learner: str, engine: QuizEngine):
+        """Write the engine's scalars and any history rows not stored yet."""
+        with self._lock:
+            # IMMEDIATE takes the write lock before the offset is read
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                done = self._conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM history WHERE learner = ?", (learner,)
+                ).fetchone()[0]
+                rows = [
+                    (learner, seq, _pack(QuizEngine.history_row(rec)))
+                    for seq, rec in enumerate(engine.history[done:], start=done)
+                ]
+                self._conn.execute(
+                    "UPDATE sessions SET state = ?, updated = ? WHERE learner = ?",
+                    (_pack(engine.to_state()), time.time(), learner),
+                )
+                if rows:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO history (learner, seq, record) VALUES (?, ?, ?)", rows
+                    )
+                    now = time.time()
+                    self._conn.executemany(
+                        "INSERT INTO attempts (learner, created, record) VALUES (?, ?, ?)",
+                        [(learner, now, record) for learner, _, record in rows],
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @timed("signsense_backend_seconds", backend="profile_store")
+    def restore(self, learner: str) -> Optional[QuizEngine]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT -1 AS seq, state, questions FROM sessions WHERE learner = :learner
+                UNION ALL
+                SELECT seq, record, NULL FROM history WHERE learner = :learner
+                ORDER BY seq
+                """,
+                {"learner": learner},
+            ).fetchall()
+        if not rows or rows[0][0] != -1:
+            return None
+
+        state = json.loads(rows[0][1])
+        questions = json.loads(zlib.decompress(rows[0][2]).decode("utf-8"))
+        history = [json.loads(r[1]) for r in rows[1:]]
+        return QuizEngine.from_state(state, questions, history)
+
+    def clear(self, learner: str):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM history WHERE learner = ?", (learner,))
+                self._conn.execute("DELETE FROM sessions WHERE learner = ?", (learner,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore()
+    return _store
@@ -0,0 +1,255 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from monitoring.metrics import timed
+
+# -------------------------------
+# QUESTION BANK SEARCH (BM25)
+# -------------------------------
+# Inverted index over question text, hints and explanations. Postings are
+# compact arrays (doc id, weighted term frequency) appended as banks load, so
+# built-in banks, PDF uploads and AI sets can be added at any time. Subject
+# and difficulty filters are doc-id sets intersected before scoring.
+#
+# Re-adding a question with the same id (or text, when it has no id)
+# replaces the old entry; the old doc id is tombstoned and skipped.
+
+K1 = 1.2
+B = 0.75
+MIN_IDF = 0.05      # ~ a term in 95%+ of questions
+# question text counts double against hints/explanations
+FIELD_WEIGHTS = (("question", 2), ("hints", 1), ("explanation", 1), ("options", 1))
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or the this to what which with".split()
+)
+
+BANK_DIR = Path(__file__).parent
+BUILTIN_BANKS = {"math": "questions_math.json", "english": "questions_english.json"}
+# difficulties measured from real answers (written by backend/item_analysis.py)
+CALIBRATION_PATH = Path(os.getenv(
+    "SIGNSENSE_CALIBRATION",
+    Path(__file__).resolve().parents[2] / "data" / "item_calibration.json",
+))
+
+
+def tokenize(text) -> List[str]:
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(t) for t in text)
+    return [t for t in TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+def question_key(question: Dict) -> str:
+    return str(question.get("id") or question.get("question", ""))
+
+
+class QuestionIndex:
+    def __init__(self):
+        self.docs: List[Dict] = []
+        self.subjects: List[str] = []
+        self.difficulty: List[str] = []
+        self.sources: List[str] = []
+        self.lengths = array("f")
+        self.postings: Dict[str, array] = {}     # term -> [doc, tf, doc, tf, ...]
+        self.by_subject: Dict[str, Set[int]] = {}
+        self.by_difficulty: Dict[str, Set[int]] = {}
+        self.by_key: Dict[str, int] = {}
+        self.df: Dict[str, int] = {}
+        self.deleted: Set[int] = set()
+        self._total_length = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.docs) - len(self.deleted)
+
+    # -----------------------------------------------------
+    # BUILDING
+    # -----------------------------------------------------
+    @staticmethod
+    def _term_freqs(question: Dict) -> Dict[str, int]:
+        tf: Dict[str, int] = {}
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(question.get(field)):
+                tf[token] = tf.get(token, 0) + weight
+        return tf
+
+    def add(self, question: Dict, subject: str, source: str = "bank") -> int:
+        tf = self._term_freqs(question)
+        length = float(sum(tf.values()))
+        difficulty = str(question.get("difficulty") or "unknown").lower()
+        subject = (subject or "unknown").lower()
+
+        with self._lock:
+            key = question_key(question)
+            old = self.by_key.get(key)
+            if old is not None:
+                self._remove(old)
+
+            doc = len(self.docs)
+            self.docs.append(question)
+            self.subjects.append(subject)
+            self.difficulty.append(difficulty)
+            self.sources.append(source)
+            self.lengths.append(length)
+            self._total_length += length
+            self.by_subject.setdefault(subject, set()).add(doc)
+            self.by_difficulty.setdefault(difficulty, set()).add(doc)
+            self.by_key[key] = doc
+            for token, count in tf.items():
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = array("I")
+                postings.append(doc)
+                postings.append(count)
+                self.df[token] = self.df.get(token, 0) + 1
+        return doc
+
+    def add_many(self, questions: Iterable[Dict], subject: str, source: str = "bank") -> int:
+        count = 0
+        for q in questions:
+            if q.get("question"):
+                self.add(q, subject, source)
+                count += 1
+        return count
+
+    def _remove(self, doc: int):
+        self.deleted.add(doc)
+        for token in self._term_freqs(self.docs[doc]):
+            self.df[token] -= 1
+        self._total_length -= self.lengths[doc]
+        self.by_subject.get(self.subjects[doc], set()).discard(doc)
+        self.by_difficulty.get(self.difficulty[doc], set()).discard(doc)
+
+    def set_difficulty(self, key: str, difficulty: str) -> bool:
+        """Move a question to another difficulty bucket (e.g. after item analysis)."""
+        with self._lock:
+            doc = self.by_key.get(key)
+            if doc is None:
+                return False
+            difficulty = difficulty.lower()
+            self.by_difficulty.get(self.difficulty[doc], set()).discard(doc)
+            self.by_difficulty.setdefault(difficulty, set()).add(doc)
+            self.difficulty[doc] = difficulty
+            self.docs[doc]["difficulty"] = difficulty
+            return True
+
+    # -----------------------------------------------------
+    # SEARCH
+    # -----------------------------------------------------
+    def _allowed(self, subject: Optional[str], difficulty: Optional[str]) -> Optional[Set[int]]:
+        sets = []
+        if subject:
+            sets.append(self.by_subject.get(subject.lower(), set()))
+        if difficulty:
+            sets.append(self.by_difficulty.get(difficulty.lower(), set()))
+        if not sets:
+            return None
+        sets.sort(key=len)
+        return set.intersection(*sets) if len(sets) > 1 else sets[0]
+
+    @timed("signsense_search_seconds")
+    def search(self, query: str, subject: str = None, difficulty: str = None,
+               limit: int = 20) -> List[Dict]:
+        """Best matches as {"question", "subject", "difficulty", "source", "score"}."""
+        with self._lock:
+            allowed = self._allowed(subject, difficulty)
+            terms = set(tokenize(query))
+
+            if not terms:
+                # browsing by filter only
+                docs = sorted(allowed) if allowed is not None else \
+                    [d for d in range(len(self.docs)) if d not in self.deleted]
+                return [self._hit(d, 0.0) for d in docs[:limit]]
+
+            n_docs = max(len(self), 1)
+            avg_len = self._total_length / n_docs or 1.0
+            idfs = {}
+            for term in terms:
+                df = self.df.get(term, 0)
+                if df > 0:
+                    idfs[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            # terms found in nearly every question barely move the ranking but
+            # cost a full posting scan; drop them when something rarer is there
+            informative = {t: w for t, w in idfs.items() if w >= MIN_IDF}
+            if informative:
+                idfs = informative
+
+            scores: Dict[int, float] = {}
+            for term, idf in idfs.items():
+                postings = self.postings[term]
+                for i in range(0, len(postings), 2):
+                    doc = postings[i]
+                    if doc in self.deleted or (allowed is not None and doc not in allowed):
+                        continue
+                    tf = postings[i + 1]
+                    norm = K1 * (1 - B + B * self.lengths[doc] / avg_len)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+            return [self._hit(doc, score) for doc, score in best]
+
+    def _hit(self, doc: int, score: float) -> Dict:
+        return {
+            "question": self.docs[doc],
+            "subject": self.subjects[doc],
+            "difficulty": self.difficulty[doc],
+            "source": self.sources[doc],
+            "score": round(score, 4),
+        }
+
+    def facets(self) -> Dict[str, List[str]]:
+        return {
+            "subjects": sorted(k for k, v in self.by_subject.items() if v),
+            "difficulties": sorted(k for k, v in self.by_difficulty.items() if v),
+        }
+
+
+# -------------------------------
+# SHARED INDEX
+# -------------------------------
+_index: Optional[QuestionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_question_index() -> QuestionIndex:
+    """Process-wide index, seeded with the built-in banks on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = QuestionIndex()
+                for subject, filename in BUILTIN_BANKS.items():
+                    try:
+                        with open(BANK_DIR / filename, "r", encoding="utf-8") as f:
+                            index.add_many(json.load(f), subject, source="builtin")
+                    except (OSError, ValueError):
+                        pass
+                load_calibration(index)
+                _index = index
+    return _index
+
+
+def load_calibration(index: QuestionIndex, path: Path = None) -> int:
+    """Apply calibrated difficulties from the last item-analysis run, if any."""
+    try:
+        with open(path or CALIBRATION_PATH, "r", encoding="utf-8") as f:
+            items = json.load(f).get("items", {})
+    except (OSError, ValueError):
+        return 0
+    return sum(index.set_difficulty(key, entry["difficulty"])
+               for key, entry in items.items() if entry.get("difficulty"))
+
+
+def index_questions(questions: Iterable[Dict], subject: str, source: str) -> int:
+    """Add an uploaded / generated set to the shared index."""
+    return get_question_index().add_many(questions, subject, source)
@@ -0,0 +1,380 @@
+import bisect
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# -------------------------------
+# SHARED STATE BACKENDS
+# -------------------------------
+# Local (non-Firestore) scores and classrooms used to live in module-level
+# dicts, so every Streamlit process had its own copy. These backends give
+# them one shared home. Values are JSON-compatible; writes go through
+# `update`, an atomic read-modify-write on one key.
+#
+# SIGNSENSE_STATE_BACKEND selects the backend:
+#   memory                         per-process dict (default, old behaviour)
+#   sqlite:////abs/path/state.db   shared file for processes on one host
+#   redis://host:6379/0            any Redis-protocol server
+# A comma-separated list shards keys across several backends by room code.
+
+Updater = Callable[[Optional[Any]], Optional[Any]]
+
+
+class StateBackend:
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any):
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        """Remove `key`; True if it existed (only one of several racing deleters wins)."""
+        raise NotImplementedError
+
+    def update(self, key: str, fn: Updater) -> Optional[Any]:
+        """
+        Atomically apply fn to the current value (None if missing) and store
+        its result. Returning None from fn leaves the key untouched.
+        """
+        raise NotImplementedError
+
+    def keys(self, prefix: str = "") -> List[str]:
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        return self.update(key, lambda v: int(v or 0) + amount)
+
+    def push(self, key: str, value: Any):
+        """Append to the FIFO list at `key`."""
+        raise NotImplementedError
+
+    def pop(self, key: str) -> Optional[Any]:
+        """Remove and return the oldest item of the list at `key` (None if empty)."""
+        raise NotImplementedError
+
+
+# -------------------------------
+# IN-MEMORY
+# -------------------------------
+class MemoryBackend(StateBackend):
+    """Per-process; values are stored and returned as-is (no copies)."""
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._lists: Dict[str, deque] = {}
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def update(self, key, fn):
+        with self._lock:
+            value = fn(self._data.get(key))
+            if value is not None:
+                self._data[key] = value
+            return value
+
+    def keys(self, prefix=""):
+        with self._lock:
+            return [k for k in self._data if k.startswith(prefix)]
+
+    def push(self, key, value):
+        with self._lock:
+            self._lists.setdefault(key, deque()).append(value)
+
+    def pop(self, key):
+        with self._lock:
+            items = self._lists.get(key)
+            return items.popleft() if items else None
+
+
+# -------------------------------
+# SQLITE (SHARED FILE)
+# -------------------------------
+class SQLiteBackend(StateBackend):
+    def __init__(self, path):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS lists ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, value TEXT NOT NULL)"
+        )
+        self._conn().execute("CREATE INDEX IF NOT EXISTS lists_key ON lists (key, seq)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
+
+    def delete(self, key):
+        return self._conn().execute("DELETE FROM kv WHERE key = ?", (key,)).rowcount > 0
+
+    def update(self, key, fn):
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front, so concurrent updaters in
+        # other processes queue instead of losing each other's writes.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+            value = fn(json.loads(row[0]) if row else None)
+            if value is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, json.dumps(value))
+                )
+            conn.execute("COMMIT")
+            return value
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def keys(self, prefix=""):
+        rows = self._conn().execute(
+            "SELECT key FROM kv WHERE key >= ? AND key < ?", (prefix, prefix + "\uffff")
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def push(self, key, value):
+        self._conn().execute(
+            "INSERT INTO lists (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
+
+    def pop(self, key):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT seq, value FROM lists WHERE key = ? ORDER BY seq LIMIT 1", (key,)
+            ).fetchone()
+            if row:
+                conn.execute("DELETE FROM lists WHERE seq = ?", (row[0],))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return json.loads(row[1]) if row else None
+
+
+# -------------------------------
+# REDIS PROTOCOL
+# -------------------------------
+class RedisBackend(StateBackend):
+    """
+    Works with any client exposing the redis-py API, so a local stand-in
+    (redis-server on localhost, fakeredis.FakeRedis()) can be passed as `client`.
+    """
+
+    MAX_RETRIES = 50
+
+    def __init__(self, url: str = "redis://127.0.0.1:6379/0", client=None):
+        if client is None:
+            import redis  # type: ignore
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, key):
+        raw = self.client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        self.client.set(key, json.dumps(value))
+
+    def delete(self, key):
+        return self.client.delete(key) > 0
+
+    def update(self, key, fn):
+        from redis.exceptions import WatchError  # type: ignore
+
+        for _ in range(self.MAX_RETRIES):
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    value = fn(json.loads(raw) if raw is not None else None)
+                    if value is None:
+                        pipe.unwatch()
+                        return None
+                    pipe.multi()
+                    pipe.set(key, json.dumps(value))
+                    pipe.execute()
+                    return value
+                except WatchError:
+                    time.sleep(0.001)
+        raise RuntimeError(f"Too much contention updating {key}")
+
+    def incr(self, key, amount=1):
+        # plain integers are valid JSON, so get() still works on counters
+        return int(self.client.incrby(key, amount))
+
+    def keys(self, prefix=""):
+        return [
+            k.decode("utf-8") if isinstance(k, bytes) else k
+            for k in self.client.scan_iter(match=f"{prefix}*")
+        ]
+
+    def push(self, key, value):
+        self.client.rpush(key, json.dumps(value))
+
+    def pop(self, key):
+        raw = self.client.lpop(key)
+        return json.loads(raw) if raw is not None else None
+
+
+# -------------------------------
+# CONSISTENT-HASH SHARDING
+# -------------------------------
+def routing_key(key: str) -> str:
+    """Keys look like "<namespace>:<room code>"; everything for one room shares a shard."""
+    return key.split(":", 1)[1] if ":" in key else key
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class ShardedBackend(StateBackend):
+    VNODES = 64
+
+    def __init__(self, nodes: List[StateBackend], names: List[str] = None):
+        self.nodes = nodes
+        names = names or [str(i) for i in range(len(nodes))]
+        ring = sorted(
+            (_hash(f"{name}#{v}"), i)
+            for i, name in enumerate(names)
+            for v in range(self.VNODES)
+        )
+        self._points = [p for p, _ in ring]
+        self._owners = [i for _, i in ring]
+
+    def node_for(self, key: str) -> StateBackend:
+        idx = bisect.bisect(self._points, _hash(routing_key(key))) % len(self._points)
+        return self.nodes[self._owners[idx]]
+
+    def get(self, key):
+        return self.node_for(key).get(key)
+
+    def set(self, key, value):
+        self.node_for(key).set(key, value)
+
+    def delete(self, key):
+        return self.node_for(key).delete(key)
+
+    def update(self, key, fn):
+        return self.node_for(key).update(key, fn)
+
+    def incr(self, key, amount=1):
+        return self.node_for(key).incr(key, amount)
+
+    def keys(self, prefix=""):
+        return [k for node in self.nodes for k in node.keys(prefix)]
+
+    def push(self, key, value):
+        self.node_for(key).push(key, value)
+
+    def pop(self, key):
+        return self.node_for(key).pop(key)
+
+
+# -------------------------------
+# CONFIGURATION
+# -------------------------------
+def backend_from_url(url: str) -> StateBackend:
+    url = url.strip()
+    if not url or url == "memory":
+        return MemoryBackend()
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unknown state backend: {url}")
+
+
+def backend_from_env(value: str = None) -> StateBackend:
+    value = os.getenv("SIGNSENSE_STATE_BACKEND", "memory") if value is None else value
+    urls = [u for u in value.split(",") if u.strip()]
+    if len(urls) > 1:
+        return ShardedBackend([backend_from_url(u) for u in urls], names=urls)
+    return backend_from_url(urls[0] if urls else "memory")
+
+
+_backend: Optional[StateBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> StateBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = backend_from_env()
+    return _backend
+
+
+class Namespace:
+    """Key prefix view, e.g. Namespace("classroom") maps code -> "classroom:<code>"."""
+
+    def __init__(self, prefix: str, backend: StateBackend = None):
+        self.prefix = prefix
+        self._backend = backend
+
+    @property
+    def backend(self) -> StateBackend:
+        return self._backend or get_backend()
+
+    def _key(self, code: str) -> str:
+        return f"{self.prefix}:{code}"
+
+    def get(self, code: str, default=None):
+        value = self.backend.get(self._key(code))
+        return default if value is None else value
+
+    def set(self, code: str, value):
+        self.backend.set(self._key(code), value)
+
+    def update(self, code: str, fn: Updater):
+        return self.backend.update(self._key(code), fn)
+
+    def delete(self, code: str) -> bool:
+        return self.backend.delete(self._key(code))
+
+    def codes(self) -> List[str]:
+        start = len(self.prefix) + 1
+        return [k[start:] for k in self.backend.keys(self.prefix + ":")]
+
+    def __contains__(self, code: str) -> bool:
+        return self.backend.get(self._key(code)) is not None
+
+    def snapshot(self, code: str, default=None):
+        """A copy that is safe to mutate regardless of backend."""
+        return copy.deepcopy(self.get(code, default))
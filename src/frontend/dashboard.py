@@ -6,12 +6,25 @@ def render_dashboard(engine):
 
     if not engine:
         st.info("No quiz data yet. Finish a quiz first.")
+        render_leaderboards()
         return
 
     st.subheader("Score")
     st.write(f"Total score: **{engine.score}**")
     st.write(f"Best streak: **{engine.best_streak}**")
 
+    st.subheader("Mastery")
+    from ai.knowledge_tracing import get_tracer, target_difficulty
+    from frontend.ui import current_learner
+    tracer = get_tracer()
+    learner = current_learner()
+    mastery = (tracer.mastery(learner) if learner else {}) or tracer.replay(engine.history, engine.subject)
+    if not mastery:
+        st.info("Answer a few questions to see your mastery estimate.")
+    for skill, p_known in sorted(mastery.items()):
+        st.progress(min(max(p_known, 0.0), 1.0),
+                    text=f"{skill.title()}: {p_known:.0%} mastered (next up: {target_difficulty(p_known)})")
+
     st.subheader("History")
     if not engine.history:
         st.info("No questions answered yet.")
@@ -23,3 +36,22 @@ def render_dashboard(engine):
                 f"  **Correct:** {'✅' if rec['correct'] else '❌'}  \n"
                 f"  **Points:** {rec['points']}"
             )
+
+    render_leaderboards()
+
+
+def render_leaderboards():
+    from backend.leaderboard import top_scores
+
+    st.subheader("🏆 Leaderboards")
+    col1, col2, col3 = st.columns(3)
+    window = col1.radio("Window", ["day", "week", "all"], index=2, horizontal=True,
+                        format_func=lambda w: {"day": "Today", "week": "This week", "all": "All time"}[w])
+    subject = col2.selectbox("Subject", ["All", "Math", "English"], key="board_subject")
+    mode = col3.selectbox("Mode", ["All", "standard", "isl", "adhd", "dyslexia"], key="board_mode")
+
+    rows = top_scores(window, None if subject == "All" else subject, None if mode == "All" else mode)
+    if rows:
+        st.table(rows)
+    else:
+        st.info("No scores in this window yet.")
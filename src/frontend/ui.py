@@ -1,7 +1,11 @@
 import streamlit as st
 import streamlit.components.v1 as components
+from streamlit.errors import StreamlitAPIException
 import html
+import json
+import time
 import urllib.parse
+import uuid
 
 
 # ---------------------------------------------------
@@ -11,6 +15,50 @@ def safe_text(s: str) -> str:
     return html.escape(s or "")
 
 
+def rerun_fragment():
+    """
+    Rerun only the calling @st.fragment. Streamlit refuses a fragment-scoped
+    rerun while the whole script is running (e.g. the click arrived with a
+    full rerun), so fall back to rerunning the app then.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+def job_owner() -> str:
+    """Per-browser-session id; the job scheduler caps concurrent jobs per owner."""
+    return st.session_state.setdefault("job_owner", uuid.uuid4().hex)
+
+
+def current_learner() -> str:
+    """
+    The solo learner's name ("" for a guest). Kept under a key no widget owns:
+    Streamlit drops a widget's key on the first rerun that doesn't draw it,
+    so other pages can't read the "Your Name" input's own key.
+    """
+    return st.session_state.get("learner", "")
+
+
+@st.fragment(run_every=1.0)
+def job_progress(job_id: str, label: str):
+    """
+    Poll a background job every second. Once it has finished, rerun the page
+    so the caller (which checks the status first) picks up the result.
+    """
+    from backend.jobs import FINISHED, get_scheduler
+
+    scheduler = get_scheduler()
+    status = scheduler.status(job_id)
+    if status is None or status["state"] in FINISHED:
+        st.rerun()
+    st.caption(f"⏳ {label}… ({status['state']}, {time.time() - status['submitted']:.0f}s)")
+    if st.button("Cancel", key=f"cancel_{job_id}"):
+        scheduler.cancel(job_id)
+        st.rerun()
+
+
 # ---------------------------------------------------
 # NEW: Browser-based Female TTS with Controls
 # ---------------------------------------------------
@@ -216,6 +264,50 @@ def isl_avatar(url_gif=None, url_video=None, width=300):
             st.write(url_video)
 
 
+# ---------------------------------------------------
+# ISL answer by signing
+# ---------------------------------------------------
+def isl_sign_answer(options, qid):
+    """
+    Recognise a signed option (A/B/C/D or the option text) from landmarks
+    recorded by the browser sign detector. Returns the option or None.
+    """
+    with st.expander("✋ Answer by signing"):
+        upload = st.file_uploader("Landmark recording (JSON)", type=["json"], key=f"sign_{qid}")
+        if not upload:
+            return None
+
+        from sign.recognizer import get_sign_index, label_to_option, parse_frames
+        from sign.stream import StreamingRecognizer
+
+        index = get_sign_index()
+        if index is None:
+            st.info("No sign vocabulary installed in models/signs yet.")
+            return None
+        try:
+            frames = parse_frames(json.load(upload))
+        except ValueError:
+            st.error("Could not read landmark frames from this file.")
+            return None
+
+        commit = StreamingRecognizer(index).recognize_answer(frames)
+        if not commit:
+            st.warning("No steady sign recognised – try recording again.")
+            return None
+        label = commit["label"]
+        option = label_to_option(label, options)
+        if option is None:
+            st.warning(f"Recognised sign “{label}”, which doesn't match an option.")
+            return None
+        st.success(f"Recognised sign **{label}** → {option}")
+
+        # apply once per recording so the learner can still change the radio
+        if st.session_state.get(f"signed_{qid}") != upload.file_id:
+            st.session_state[f"signed_{qid}"] = upload.file_id
+            return option
+        return None
+
+
 # ---------------------------------------------------
 # Neon theme
 # ---------------------------------------------------
@@ -293,6 +385,12 @@ def render_question_UI(question: dict, mode: str):
 
         return None
 
+    # ISL learners can sign the answer instead of clicking it
+    if mode in ("isl", "hybrid") and options:
+        signed = isl_sign_answer(options, qid)
+        if signed is not None:
+            st.session_state[f"answer_{qid}"] = signed
+
     # Radio for normal modes
     selected = st.radio("Choose your answer:", options, key=f"answer_{qid}")
 
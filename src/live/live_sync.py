@@ -1,7 +1,12 @@
 import streamlit as st
 import json
+import os
 from pathlib import Path
-import random
+
+from backend.codes import ROOM_CODES
+from backend.lifecycle import touch
+from live.room_state import add_player, apply_answer, new_room
+from monitoring.metrics import timed
 
 # ---------------------------------------------------------
 # ROOM DATABASE (FOLDER)
@@ -9,6 +14,10 @@ import random
 ROOMS_DIR = Path(__file__).parent / "rooms"
 ROOMS_DIR.mkdir(exist_ok=True)
 
+# When set (e.g. ws://127.0.0.1:8765), rooms are served by live/room_server.py
+# instead of the JSON files below.
+ROOM_SERVER_URL = os.getenv("SIGNSENSE_ROOM_SERVER", "")
+
 
 def room_path(code: str) -> Path:
     return ROOMS_DIR / f"{code}.json"
@@ -17,7 +26,11 @@ def room_path(code: str) -> Path:
 # ---------------------------------------------------------
 # SAVE / LOAD DATA
 # ---------------------------------------------------------
+@timed("signsense_backend_seconds", backend="live_sync")
 def load_room(code: str):
+    if ROOM_SERVER_URL:
+        from live import room_client
+        return room_client.get_room(ROOM_SERVER_URL, code)
     try:
         with open(room_path(code), "r", encoding="utf-8") as f:
             return json.load(f)
@@ -25,26 +38,78 @@ def load_room(code: str):
         return None
 
 
+@timed("signsense_backend_seconds", backend="live_sync")
 def save_room(code: str, data: dict):
     with open(room_path(code), "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
+    touch("room", code, finished=data.get("state") == "finished")
 
 
 # ---------------------------------------------------------
 # CREATE NEW ROOM (HOST)
 # ---------------------------------------------------------
+@timed("signsense_backend_seconds", backend="live_sync")
 def create_room():
-    code = str(random.randint(10000, 99999))
-    room = {
-        "code": code,
-        "state": "waiting",      # waiting → playing → finished
-        "question_index": 0,
-        "players": {},           # {name: {"answer": "", "score": 0}}
-    }
+    if ROOM_SERVER_URL:
+        from live import room_client
+        return room_client.create_room(ROOM_SERVER_URL)
+
+    code = ROOM_CODES.allocate(is_taken=lambda c: room_path(c).exists())
+    room = new_room(code)        # state: waiting → playing → finished
     save_room(code, room)
     return room
 
 
+# ---------------------------------------------------------
+# ROOM ACTIONS (FILE OR ROOM SERVER)
+# ---------------------------------------------------------
+@timed("signsense_backend_seconds", backend="live_sync")
+def control_room(code: str, op: str):
+    """op is one of "start", "next", "end"."""
+    if ROOM_SERVER_URL:
+        from live import room_client
+        room_client.control_room(ROOM_SERVER_URL, code, op)
+        return
+
+    room = load_room(code)
+    if not room:
+        return
+    if op == "start":
+        room["state"] = "playing"
+    elif op == "next":
+        room["question_index"] += 1
+    elif op == "end":
+        room["state"] = "finished"
+    save_room(code, room)
+
+
+@timed("signsense_backend_seconds", backend="live_sync")
+def join_room(code: str, name: str):
+    if ROOM_SERVER_URL:
+        from live import room_client
+        room_client.join_room(ROOM_SERVER_URL, code, name)
+        return
+
+    room = load_room(code)
+    if room and add_player(room, name):
+        save_room(code, room)
+
+
+@timed("signsense_backend_seconds", backend="live_sync")
+def submit_answer(code: str, name: str, q_index: int, selected: str, correct_answer: str = None):
+    if ROOM_SERVER_URL:
+        from live import room_client
+        room_client.submit_answer(ROOM_SERVER_URL, code, name, q_index, selected, correct_answer)
+        return
+
+    room = load_room(code)
+    if not room or name not in room["players"]:
+        return
+    # moves the option counter (and score) if the player changes their answer
+    apply_answer(room, name, q_index, selected, correct_answer)
+    save_room(code, room)
+
+
 # ---------------------------------------------------------
 # HOST INTERFACE
 # ---------------------------------------------------------
@@ -87,18 +152,19 @@ def host_interface(engine):
 
     # Host Controls
     col1, col2, col3 = st.columns(3)
+    action = None
     with col1:
         if st.button("▶ Start Quiz"):
-            room["state"] = "playing"
-            save_room(code, room)
+            action = "start"
     with col2:
         if st.button("➡ Next Question"):
-            room["question_index"] += 1
-            save_room(code, room)
+            action = "next"
     with col3:
         if st.button("⛔ End Session"):
-            room["state"] = "finished"
-            save_room(code, room)
+            action = "end"
+    if action:
+        control_room(code, action)
+        room = load_room(code) or room
 
     # Current question preview
     if room["state"] == "playing":
@@ -108,6 +174,14 @@ def host_interface(engine):
             st.markdown(f"### 📖 Current Question ({q_index + 1})")
             st.write(q.get("question", ""))
             st.write("Options:", q.get("options", []))
+
+            # counters are kept per question on submit, so this is O(options)
+            tally = room.get("tallies", {}).get(str(q_index), {})
+            st.markdown("### 🗳 Answer Distribution")
+            if tally:
+                st.bar_chart({opt: tally.get(opt, 0) for opt in q.get("options", [])})
+            else:
+                st.write("_No answers yet._")
         else:
             st.info("No more questions in the quiz.")
 
@@ -122,7 +196,7 @@ def host_interface(engine):
     # Manual refresh
     st.caption("Tip: Click the 🔄 Refresh button to see latest joins/answers.")
     if st.button("🔄 Refresh Host View"):
-        st.experimental_rerun()
+        st.rerun()
 
 
 # ---------------------------------------------------------
@@ -145,8 +219,8 @@ def player_interface(engine):
 
     # Register player if new
     if name not in room["players"]:
-        room["players"][name] = {"answer": "", "score": 0}
-        save_room(code, room)
+        join_room(code, name)
+        room = load_room(code) or room
 
     st.success(f"Joined Room **{code}** as **{name}**")
 
@@ -154,7 +228,7 @@ def player_interface(engine):
     if room["state"] == "waiting":
         st.warning("⏳ Waiting for host to start the quiz...")
         if st.button("🔄 Refresh"):
-            st.experimental_rerun()
+            st.rerun()
         return
 
     # Session finished
@@ -163,7 +237,7 @@ def player_interface(engine):
         st.markdown("### Your Final Score")
         st.write(room["players"][name]["score"])
         if st.button("🔄 Refresh"):
-            st.experimental_rerun()
+            st.rerun()
         return
 
     # Show current question
@@ -171,7 +245,7 @@ def player_interface(engine):
     if q_index >= len(engine.questions):
         st.info("No more questions. Waiting for host to end session.")
         if st.button("🔄 Refresh"):
-            st.experimental_rerun()
+            st.rerun()
         return
 
     q = engine.questions[q_index]
@@ -184,7 +258,7 @@ def player_interface(engine):
         return
 
     # Pre-select previously given answer if any
-    previous = room["players"][name].get("answer", "")
+    previous = room["players"][name].get("answers", {}).get(str(q_index), "")
     try:
         default_index = options.index(previous) if previous in options else 0
     except ValueError:
@@ -198,18 +272,11 @@ def player_interface(engine):
     )
 
     if st.button("✅ Submit Answer"):
-        room = load_room(code) or room
-        room["players"][name]["answer"] = selected
-
-        # Update score
-        if selected == q.get("answer"):
-            room["players"][name]["score"] += 100
-
-        save_room(code, room)
+        submit_answer(code, name, q_index, selected, q.get("answer"))
         st.success("Answer submitted! Click 🔄 Refresh after host moves to next question.")
 
     if st.button("🔄 Refresh"):
-        st.experimental_rerun()
+        st.rerun()
 
 
 # ---------------------------------------------------------
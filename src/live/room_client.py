@@ -0,0 +1,94 @@
+import json
+import threading
+from typing import Dict, Optional
+
+from websockets.sync.client import connect  # type: ignore
+
+# ---------------------------------------------------------
+# SYNC CLIENT FOR THE ROOM SERVER
+# ---------------------------------------------------------
+# Used from Streamlit script threads, so it is blocking. One connection is
+# kept per thread and reopened when the server drops it.
+#
+# A failed request is retried once on a fresh connection only when the
+# server cannot have seen it (connecting or sending failed), or when the op is
+# safe to repeat. A lost reply to "create", "next" or "answer" is reported,
+# not resent, so it cannot create a second room or skip a question.
+
+TIMEOUT = 3.0
+IDEMPOTENT_OPS = ("get", "subscribe", "join")
+
+_local = threading.local()
+
+
+class RoomServerError(Exception):
+    pass
+
+
+def _connection(url: str):
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "url", None) != url:
+        conn = _local.conn = connect(url, open_timeout=TIMEOUT)
+        _local.url = url
+    return conn
+
+
+def _drop_connection():
+    """Close this thread's connection (a broken or desynchronised one is never reused)."""
+    conn, _local.conn = getattr(_local, "conn", None), None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def request(url: str, op: str, **params) -> Dict:
+    request_id = _local.next_id = getattr(_local, "next_id", 0) + 1
+    payload = json.dumps({"op": op, "id": request_id, **params})
+    for attempt in range(2):
+        sent = False
+        try:
+            conn = _connection(url)
+            conn.send(payload)
+            sent = True
+            # skip pushed events and any late reply to an earlier request
+            while True:
+                reply = json.loads(conn.recv(timeout=TIMEOUT))
+                if "ok" in reply and reply.get("id") == request_id:
+                    break
+            break
+        except Exception as e:
+            _drop_connection()
+            if attempt or (sent and op not in IDEMPOTENT_OPS):
+                raise RoomServerError(f"Room server unavailable: {e}") from e
+    if not reply["ok"]:
+        raise RoomServerError(reply.get("error", "Request failed"))
+    return reply
+
+
+def create_room(url: str) -> Dict:
+    return request(url, "create")["room"]
+
+
+def get_room(url: str, code: str) -> Optional[Dict]:
+    try:
+        return request(url, "get", code=code)["room"]
+    except RoomServerError:
+        return None
+
+
+def join_room(url: str, code: str, name: str) -> Dict:
+    return request(url, "join", code=code, name=name)["room"]
+
+
+def control_room(url: str, code: str, op: str) -> Dict:
+    return request(url, op, code=code)["room"]
+
+
+def submit_answer(url: str, code: str, name: str, q_index: int, answer: str,
+                  correct_answer: Optional[str] = None) -> Dict:
+    return request(
+        url, "answer", code=code, name=name, q_index=q_index,
+        answer=answer, correct_answer=correct_answer,
+    )["player"]
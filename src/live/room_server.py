@@ -0,0 +1,228 @@
+"""
+Asyncio WebSocket room server for live quizzes.
+
+Rooms live in memory; every change is pushed to the room's subscribers and
+answer tallies are aggregated as they arrive. Rooms are snapshotted to
+live/rooms/<code>.json in the same format live_sync uses, so the file-based
+rooms keep working as a fallback.
+
+Run from the repo root:
+
+    python src/live/room_server.py --port 8765
+
+and point the Streamlit app at it with SIGNSENSE_ROOM_SERVER=ws://127.0.0.1:8765.
+
+Protocol (JSON text frames): a request is {"op": ..., "id": optional, ...}
+and every request gets one reply {"id": ..., "ok": bool, ...}.
+
+    create                                  -> {"room": room}
+    get        code                         -> {"room": room}
+    join       code, name                   -> {"room": summary}
+    start | next | end   code               -> {"room": summary}
+    answer     code, name, q_index, answer, correct_answer (optional)
+                                            -> {"player": player}
+    subscribe  code                         -> {"room": summary}, then pushed
+                                               {"event": "state" | "tally", "room": summary}
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Set
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from websockets.asyncio.server import broadcast, serve  # type: ignore
+from websockets.exceptions import ConnectionClosed  # type: ignore
+
+from backend.codes import ROOM_CODES
+from live.room_state import add_player, apply_answer, new_room
+
+SNAPSHOT_DIR = Path(__file__).parent / "rooms"
+SNAPSHOT_INTERVAL = 2.0   # seconds between snapshots of changed rooms
+TALLY_INTERVAL = 0.2      # answer tallies are pushed at most this often per room
+
+
+def summary(room: Dict) -> Dict:
+    """What subscribers get pushed: small and independent of the room size."""
+    q_key = str(room["question_index"])
+    return {
+        "code": room["code"],
+        "state": room["state"],
+        "question_index": room["question_index"],
+        "players": len(room["players"]),
+        "tally": room.get("tallies", {}).get(q_key, {}),
+    }
+
+
+class RoomServer:
+    def __init__(self, snapshot_dir: Path = SNAPSHOT_DIR):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.rooms: Dict[str, Dict] = {}
+        self.subscribers: Dict[str, Set] = {}
+        self.subscriptions: Dict[object, Set[str]] = {}   # ws -> room codes
+        self.dirty: Set[str] = set()
+        self.tally_pending: Set[str] = set()
+
+    # -----------------------------------------------------
+    # SNAPSHOTS
+    # -----------------------------------------------------
+    def load_snapshots(self):
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.snapshot_dir.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    room = json.load(f)
+                room.setdefault("tallies", {})
+                self.rooms[room["code"]] = room
+            except Exception:
+                continue
+
+    @staticmethod
+    def _write(path: Path, payload: str):
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        tmp.replace(path)
+
+    async def snapshot_dirty(self):
+        codes, self.dirty = self.dirty, set()
+        for code in codes:
+            room = self.rooms.get(code)
+            if room is None:
+                continue
+            payload = json.dumps(room)
+            await asyncio.to_thread(self._write, self.snapshot_dir / f"{code}.json", payload)
+
+    async def snapshot_loop(self):
+        while True:
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
+            try:
+                await self.snapshot_dirty()
+            except Exception:
+                pass
+
+    # -----------------------------------------------------
+    # BROADCAST
+    # -----------------------------------------------------
+    def push(self, code: str, event: str):
+        subs = self.subscribers.get(code)
+        if subs:
+            broadcast(subs, json.dumps({"event": event, "room": summary(self.rooms[code])}))
+
+    async def tally_loop(self):
+        # Coalesce answer bursts into one push per room per interval.
+        while True:
+            await asyncio.sleep(TALLY_INTERVAL)
+            codes, self.tally_pending = self.tally_pending, set()
+            for code in codes:
+                if code in self.rooms:
+                    self.push(code, "tally")
+
+    # -----------------------------------------------------
+    # OPERATIONS
+    # -----------------------------------------------------
+    def create(self) -> Dict:
+        code = ROOM_CODES.allocate(is_taken=lambda c: c in self.rooms)
+        room = self.rooms[code] = new_room(code)
+        self.dirty.add(code)
+        return room
+
+    def handle_request(self, ws, msg: Dict) -> Dict:
+        op = msg.get("op")
+        if op == "create":
+            return {"room": self.create()}
+
+        code = str(msg.get("code", ""))
+        room = self.rooms.get(code)
+        if room is None:
+            raise KeyError("Room not found")
+
+        if op == "get":
+            return {"room": room}
+
+        if op == "subscribe":
+            self.subscribers.setdefault(code, set()).add(ws)
+            self.subscriptions.setdefault(ws, set()).add(code)
+            return {"room": summary(room)}
+
+        if op == "join":
+            name = str(msg.get("name", "")).strip()
+            if not name:
+                raise ValueError("Name required")
+            if add_player(room, name):
+                self.dirty.add(code)
+            return {"room": summary(room)}
+
+        if op in ("start", "next", "end"):
+            if op == "start":
+                room["state"] = "playing"
+            elif op == "next":
+                room["question_index"] += 1
+            else:
+                room["state"] = "finished"
+            self.dirty.add(code)
+            self.push(code, "state")
+            return {"room": summary(room)}
+
+        if op == "answer":
+            name = str(msg.get("name", ""))
+            if name not in room["players"]:
+                raise KeyError("Player not in room")
+            q_index = int(msg.get("q_index", room["question_index"]))
+            player = apply_answer(room, name, q_index, msg["answer"], msg.get("correct_answer"))
+            self.dirty.add(code)
+            self.tally_pending.add(code)
+            return {"player": player}
+
+        raise ValueError(f"Unknown op: {op}")
+
+    async def handler(self, ws):
+        try:
+            async for raw in ws:
+                msg = {}
+                try:
+                    msg = json.loads(raw)
+                    reply = {"ok": True, **self.handle_request(ws, msg)}
+                except Exception as e:
+                    reply = {"ok": False, "error": str(e.args[0] if e.args else e)}
+                reply["id"] = msg.get("id") if isinstance(msg, dict) else None
+                await ws.send(json.dumps(reply))
+        except ConnectionClosed:
+            pass
+        finally:
+            for code in self.subscriptions.pop(ws, ()):
+                self.subscribers.get(code, set()).discard(ws)
+
+    async def serve(self, host: str, port: int, ready: asyncio.Event = None):
+        self.load_snapshots()
+        tasks = [asyncio.create_task(self.snapshot_loop()), asyncio.create_task(self.tally_loop())]
+        try:
+            async with serve(self.handler, host, port, max_queue=64) as server:
+                self.port = server.sockets[0].getsockname()[1]
+                if ready is not None:
+                    ready.set()
+                await asyncio.Future()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.snapshot_dirty()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SignSense live room server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--snapshot-dir", default=str(SNAPSHOT_DIR))
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(RoomServer(Path(args.snapshot_dir)).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
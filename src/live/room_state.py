@@ -0,0 +1,68 @@
+from typing import Dict, Optional
+
+# ---------------------------------------------------------
+# ROOM DOCUMENT
+# ---------------------------------------------------------
+# Plain-dict room shared by the JSON-file rooms (live_sync) and the
+# websocket room server, so snapshots from one can be read by the other.
+#
+# {
+#   "code": "12345",
+#   "state": "waiting",            # waiting → playing → finished
+#   "question_index": 0,
+#   "players": {name: {"answer": "", "score": 0, "answers": {q_index: option}}},
+#   "tallies": {q_index: {option: count}},
+# }
+#
+# q_index keys are strings so the document survives a JSON round trip.
+
+POINTS_PER_ANSWER = 100
+
+
+def new_room(code: str) -> Dict:
+    return {
+        "code": code,
+        "state": "waiting",
+        "question_index": 0,
+        "players": {},
+        "tallies": {},
+    }
+
+
+def add_player(room: Dict, name: str) -> bool:
+    if name in room["players"]:
+        return False
+    room["players"][name] = {"answer": "", "score": 0, "answers": {}}
+    return True
+
+
+def apply_answer(room: Dict, name: str, q_index: int, selected: str,
+                 correct_answer: Optional[str] = None) -> Dict:
+    """
+    Record `selected` for question `q_index`. Changing an earlier answer moves
+    the player's tally count and score instead of adding to them again.
+    """
+    player = room["players"].setdefault(name, {"answer": "", "score": 0, "answers": {}})
+    answers = player.setdefault("answers", {})
+    key = str(q_index)
+    tally = room.setdefault("tallies", {}).setdefault(key, {})
+
+    previous = answers.get(key)
+    if previous is not None:
+        tally[previous] = tally.get(previous, 1) - 1
+        if tally[previous] <= 0:
+            del tally[previous]
+        if correct_answer is not None and previous == correct_answer:
+            player["score"] -= POINTS_PER_ANSWER
+
+    answers[key] = selected
+    player["answer"] = selected
+    tally[selected] = tally.get(selected, 0) + 1
+    if correct_answer is not None and selected == correct_answer:
+        player["score"] += POINTS_PER_ANSWER
+
+    return player
+
+
+def scoreboard(room: Dict) -> Dict[str, int]:
+    return {name: info.get("score", 0) for name, info in room["players"].items()}
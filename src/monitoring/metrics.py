@@ -0,0 +1,248 @@
+import bisect
+import functools
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# ---------------------------------------------------------
+# PER-THREAD BUFFERS
+# ---------------------------------------------------------
+# Every thread records into its own buffer, so the hot path never takes a
+# lock. The exporter sums all buffers when it renders. Buffers of threads that
+# have exited (Streamlit starts a new script thread on every rerun) are folded
+# into one retired buffer and dropped, so the list only holds live threads.
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class _Buffer:
+    __slots__ = ("counters", "histograms", "owner")
+
+    def __init__(self, owner: threading.Thread = None):
+        self.counters: Dict[Key, float] = {}
+        # key -> [bucket counts..., +Inf count, sum]
+        self.histograms: Dict[Key, List[float]] = {}
+        self.owner = weakref.ref(owner) if owner is not None else None
+
+    def alive(self) -> bool:
+        thread = self.owner() if self.owner is not None else None
+        return thread is not None and thread.is_alive()
+
+    def merge_into(self, counters: Dict[Key, float], histograms: Dict[Key, List[float]]):
+        for key, value in list(self.counters.items()):
+            counters[key] = counters.get(key, 0) + value
+        for key, hist in list(self.histograms.items()):
+            total = histograms.setdefault(key, [0.0] * len(hist))
+            for i, v in enumerate(hist):
+                total[i] += v
+
+
+_local = threading.local()
+_buffers: List[_Buffer] = []
+_retired = _Buffer()          # totals of buffers whose thread has exited
+_buffers_lock = threading.Lock()
+
+
+def _buffer() -> _Buffer:
+    buf = getattr(_local, "buf", None)
+    if buf is None:
+        buf = _local.buf = _Buffer(threading.current_thread())
+        with _buffers_lock:
+            _retire_dead()
+            _buffers.append(buf)
+    return buf
+
+
+def _retire_dead():
+    """Fold buffers of exited threads into _retired (caller holds _buffers_lock)."""
+    live = []
+    for buf in _buffers:
+        if buf.alive():
+            live.append(buf)
+        else:
+            buf.merge_into(_retired.counters, _retired.histograms)
+    _buffers[:] = live
+
+
+def _key(name: str, labels: Dict[str, str]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# ---------------------------------------------------------
+# RECORDING API
+# ---------------------------------------------------------
+def inc(name: str, value: float = 1, **labels):
+    counters = _buffer().counters
+    key = _key(name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, **labels):
+    histograms = _buffer().histograms
+    key = _key(name, labels)
+    hist = histograms.get(key)
+    if hist is None:
+        hist = histograms[key] = [0.0] * (len(BUCKETS) + 2)
+    hist[bisect.bisect_left(BUCKETS, seconds)] += 1
+    hist[-1] += seconds
+
+
+@contextmanager
+def timer(name: str, **labels):
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        observe(name, time.monotonic() - start, **labels)
+
+
+def timed(name: str, **labels):
+    """Decorator form of `timer`; adds the wrapped function's name as the `fn` label."""
+
+    def decorator(func):
+        fn_labels = dict(labels, fn=func.__name__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.monotonic() - start, **fn_labels)
+
+        return wrapper
+
+    return decorator
+
+
+# ---------------------------------------------------------
+# EXPORT
+# ---------------------------------------------------------
+def snapshot() -> Tuple[Dict[Key, float], Dict[Key, List[float]]]:
+    counters: Dict[Key, float] = {}
+    histograms: Dict[Key, List[float]] = {}
+    with _buffers_lock:
+        _retire_dead()
+        _retired.merge_into(counters, histograms)
+        for buf in _buffers:
+            buf.merge_into(counters, histograms)
+    return counters, histograms
+
+
+def _fmt_labels(labels, extra=()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def render_prometheus() -> str:
+    counters, histograms = snapshot()
+    lines = []
+
+    for name in sorted({k[0] for k in counters}):
+        lines.append(f"# TYPE {name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_fmt_labels(labels)} {value:g}")
+
+    for name in sorted({k[0] for k in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (n, labels), hist in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0.0
+            for bound, count in zip(BUCKETS, hist):
+                cumulative += count
+                lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', f'{bound:g}')])} {cumulative:g}")
+            cumulative += hist[len(BUCKETS)]
+            lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {cumulative:g}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {hist[-1]:.6f}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {cumulative:g}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(render_prometheus(), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def _file_writer(path: str, interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            write_metrics_file(path)
+        except Exception:
+            pass
+
+
+_exporter_lock = threading.Lock()
+_exporter_started = False
+
+
+def start_exporter():
+    """
+    Start the exporters configured through the environment, once per process:
+    SIGNSENSE_METRICS_PORT  -> Prometheus text endpoint on 127.0.0.1:<port>/metrics
+    SIGNSENSE_METRICS_FILE  -> file rewritten every SIGNSENSE_METRICS_INTERVAL seconds
+    """
+    global _exporter_started
+    if _exporter_started:
+        return
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+        port = os.getenv("SIGNSENSE_METRICS_PORT")
+        if port:
+            try:
+                start_metrics_server(int(port))
+            except Exception:
+                # another worker on this host already owns the port
+                pass
+
+        path = os.getenv("SIGNSENSE_METRICS_FILE")
+        if path:
+            interval = float(os.getenv("SIGNSENSE_METRICS_INTERVAL", "15"))
+            threading.Thread(
+                target=_file_writer, args=(path, interval), name="metrics-file", daemon=True
+            ).start()
@@ -0,0 +1,134 @@
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict
+
+from monitoring.metrics import inc
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+# SIGNSENSE_PROFILE_RATE      fraction of reruns to sample (0 disables, 1 = every rerun)
+# SIGNSENSE_PROFILE_DIR       where collapsed stacks are written
+# SIGNSENSE_PROFILE_INTERVAL  seconds between stack samples
+
+PROFILE_DIR = Path(os.getenv("SIGNSENSE_PROFILE_DIR", Path(__file__).resolve().parents[2] / "profiles"))
+SAMPLE_INTERVAL = float(os.getenv("SIGNSENSE_PROFILE_INTERVAL", "0.005"))
+FLUSH_EVERY = 10  # profiled reruns per page between file writes
+
+_sample_rate = float(os.getenv("SIGNSENSE_PROFILE_RATE", "0") or 0)
+
+
+def get_sample_rate() -> float:
+    return _sample_rate
+
+
+def set_sample_rate(rate: float):
+    """Process-wide switch, used by the admin page."""
+    global _sample_rate
+    _sample_rate = max(0.0, min(1.0, float(rate)))
+
+
+# ---------------------------------------------------------
+# PER-PAGE AGGREGATES
+# ---------------------------------------------------------
+_lock = threading.Lock()
+_stacks: Dict[str, Counter] = {}
+_pending: Dict[str, int] = {}
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", Path(code.co_filename).stem)
+    return f"{module}:{code.co_name}"
+
+
+def _collapse(leaf, root) -> str:
+    names = []
+    frame = leaf
+    while frame is not None:
+        names.append(_frame_name(frame))
+        if frame is root:
+            break
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+def flush(page: str = None):
+    """Write the aggregated stacks as <page>.<pid>.collapsed (flamegraph.pl / speedscope input)."""
+    with _lock:
+        pages = [page] if page else list(_stacks)
+        snapshot = {p: dict(_stacks.get(p, {})) for p in pages}
+        for p in pages:
+            _pending[p] = 0
+
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    for p, stacks in snapshot.items():
+        path = PROFILE_DIR / f"{p}.{os.getpid()}.collapsed"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count}\n")
+        tmp.replace(path)
+
+
+# ---------------------------------------------------------
+# SAMPLER
+# ---------------------------------------------------------
+class _Sampler(threading.Thread):
+    def __init__(self, thread_id: int, root_frame, interval: float):
+        super().__init__(name="rerun-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.samples = Counter()
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_collapse(frame, self.root_frame)] += 1
+
+
+class profile_rerun:
+    """
+    Context manager around one page render. When the rerun is not sampled the
+    cost is one float comparison (and one random() call when enabled).
+    """
+
+    def __init__(self, page: str):
+        self.page = page
+        self.sampler = None
+
+    def __enter__(self):
+        rate = _sample_rate
+        if rate <= 0 or random.random() >= rate:
+            return self
+        self.sampler = _Sampler(threading.get_ident(), sys._getframe(1), SAMPLE_INTERVAL)
+        self.sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        sampler = self.sampler
+        if sampler is None:
+            return False
+        sampler.done.set()
+        sampler.join()
+        inc("signsense_profiled_reruns_total", page=self.page)
+
+        with _lock:
+            _stacks.setdefault(self.page, Counter()).update(sampler.samples)
+            _pending[self.page] = _pending.get(self.page, 0) + 1
+            due = _pending[self.page] >= FLUSH_EVERY
+
+        if due:
+            try:
+                flush(self.page)
+            except Exception:
+                pass
+        return False
@@ -1,5 +1,82 @@
+import time
+
 import streamlit as st
 
+from backend.logic import QuizEngine
+from frontend.ui import current_learner, render_question_UI, rerun_fragment
+from revision.scheduler import RevisionScheduler, item_id, quality_from_attempt
+
+
+def get_scheduler(learner: str) -> RevisionScheduler:
+    """The solo quiz learner's schedule; guests (blank name) get one for this session only."""
+    schedulers = st.session_state.setdefault("revision_schedulers", {})
+    if learner not in schedulers:
+        schedulers[learner] = RevisionScheduler(learner) if learner else RevisionScheduler("guest", None)
+    return schedulers[learner]
+
+
+def render_card(q: dict, mode: str):
+    """Cards without options (e.g. from imports) are answered as free text."""
+    if q.get("options"):
+        return render_question_UI(q, mode)
+    st.markdown(f"**{q.get('question', '')}**")
+    typed = st.text_input("Your answer", key=f"revision_text_{item_id(q)}").strip()
+    if not typed:
+        return None
+    # case/whitespace-insensitive, like classroom grading
+    answer = str(q.get("answer", ""))
+    return q.get("answer") if typed.lower() == answer.strip().lower() else typed
+
+
+def sync_history(engine, scheduler: RevisionScheduler):
+    """Feed answers the scheduler has not seen yet (tracked per engine)."""
+    synced = st.session_state.setdefault("revision_synced", {})
+    key = (scheduler.learner, id(engine))
+    start = synced.get(key, 0)
+    questions = {item_id(q): q for q in engine.questions}
+
+    changed = False
+    for rec in engine.history[start:]:
+        ref = {"id": rec.get("id"), "question": rec["question"]}
+        question = questions.get(item_id(ref)) or {**ref, "options": [], "answer": rec["correct_answer"]}
+        if scheduler.record_attempt(question, rec["correct"], rec.get("time_taken")):
+            changed = True
+    synced[key] = len(engine.history)
+
+    if changed:
+        scheduler.save()
+
+
+@st.fragment
+def render_revision_quiz(scheduler: RevisionScheduler):
+    """Answering a card reruns only this fragment; closing reruns the page."""
+    rev = st.session_state.revision_engine
+    q = rev.get_current_question()
+    if not q:
+        st.success("Revision session complete. Come back when more items are due! 🎉")
+        if st.button("Close revision session"):
+            del st.session_state.revision_engine
+            st.rerun()
+        return
+
+    feedback = st.session_state.pop("revision_feedback", None)
+    if feedback:
+        (st.success if feedback[0] else st.error)(feedback[1])
+
+    st.caption(f"Revision item {rev.current_index + 1} of {len(rev.questions)}")
+    selected = render_card(q, rev.mode)
+
+    if st.button("Check ➜", key="revision_check") and selected:
+        result = rev.check_answer(selected)
+        scheduler.review(item_id(q), quality_from_attempt(result["correct"], result["time"]))
+        scheduler.save()
+        st.session_state.revision_feedback = (
+            result["correct"],
+            "Correct!" if result["correct"] else f"Correct answer: {result['correct_answer']}",
+        )
+        rev.next_question()
+        rerun_fragment()
+
 
 def render_revision_page(engine):
     st.title("🔁 Revision Lab")
@@ -8,6 +85,33 @@ def render_revision_page(engine):
         st.info("No completed quiz history to revise yet.")
         return
 
+    # same learner as the solo quiz that produced the history
+    learner = current_learner()
+    if not learner:
+        st.caption("Enter your name on the Solo Quiz page to keep your revision schedule.")
+    scheduler = get_scheduler(learner)
+    sync_history(engine, scheduler)
+
+    if "revision_engine" in st.session_state:
+        render_revision_quiz(scheduler)
+        return
+
+    due = scheduler.due()
+    next_due = scheduler.next_due_time()
+    st.subheader("🗓 Spaced Repetition")
+    if due:
+        st.write(f"**{len(due)}** item(s) due for review now.")
+        if st.button("Start revision quiz"):
+            st.session_state.revision_engine = QuizEngine.for_questions(
+                engine.mode, engine.subject, [card.question for card in due]
+            )
+            st.rerun()
+    elif next_due:
+        hours = max(0, (next_due - time.time()) / 3600)
+        st.write(f"Nothing due right now. Next review in about {hours:.1f} hours.")
+    else:
+        st.write("No items scheduled yet.")
+
     st.write("Review the questions you got wrong:")
 
     wrong = [h for h in engine.history if not h["correct"]]
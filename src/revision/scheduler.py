@@ -0,0 +1,158 @@
+import hashlib
+import heapq
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# ---------------------------------------------------------
+# SM-2 SPACED REPETITION
+# ---------------------------------------------------------
+# One schedule per learner, persisted as JSON under data/revision/.
+# Due cards sit in a heap keyed by next-review time; rescheduling pushes a
+# new entry and stale entries are skipped when they reach the top.
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data" / "revision"
+DAY = 24 * 60 * 60
+MIN_EASE = 1.3
+
+
+def item_id(question: Dict) -> str:
+    qid = question.get("id")
+    if qid:
+        return str(qid)
+    return hashlib.sha1(question.get("question", "").encode("utf-8")).hexdigest()[:12]
+
+
+def quality_from_attempt(correct: bool, time_taken: Optional[float]) -> int:
+    """Map a quiz attempt onto SM-2's 0-5 recall quality."""
+    if not correct:
+        return 1
+    if time_taken is not None and time_taken <= 5:
+        return 5
+    if time_taken is not None and time_taken > 15:
+        return 3
+    return 4
+
+
+class Card:
+    __slots__ = ("item_id", "question", "ease", "interval", "reps", "lapses", "due")
+
+    def __init__(self, item_id: str, question: Dict, ease: float = 2.5, interval: float = 0.0,
+                 reps: int = 0, lapses: int = 0, due: float = 0.0):
+        self.item_id = item_id
+        self.question = question
+        self.ease = ease
+        self.interval = interval   # days
+        self.reps = reps
+        self.lapses = lapses
+        self.due = due
+
+    def review(self, quality: int, now: float):
+        if quality < 3:
+            self.reps = 0
+            self.lapses += 1
+            self.interval = 0.0     # see it again in this session's next pass
+        else:
+            self.reps += 1
+            if self.reps == 1:
+                self.interval = 1.0
+            elif self.reps == 2:
+                self.interval = 6.0
+            else:
+                self.interval = round(self.interval * self.ease, 2)
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        self.due = now + self.interval * DAY
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class RevisionScheduler:
+    def __init__(self, learner: str, data_dir: Optional[Path] = DATA_DIR):
+        """data_dir=None keeps the schedule in memory only (guest learners)."""
+        self.learner = learner
+        self.path = None if data_dir is None else (
+            Path(data_dir) / f"{re.sub(r'[^A-Za-z0-9_-]+', '_', learner) or 'learner'}.json"
+        )
+        self.cards: Dict[str, Card] = {}
+        self._heap: List = []
+        self.load()
+
+    # -----------------------------------------------------
+    # PERSISTENCE
+    # -----------------------------------------------------
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            data = []   # no file yet, or in-memory only
+        self.cards = {c["item_id"]: Card(**c) for c in data}
+        self._heap = [(c.due, c.item_id) for c in self.cards.values()]
+        heapq.heapify(self._heap)
+
+    def save(self):
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([c.to_dict() for c in self.cards.values()], f)
+        tmp.replace(self.path)
+
+    # -----------------------------------------------------
+    # SCHEDULING
+    # -----------------------------------------------------
+    def _push(self, card: Card):
+        heapq.heappush(self._heap, (card.due, card.item_id))
+
+    def record_attempt(self, question: Dict, correct: bool, time_taken: Optional[float] = None,
+                       now: Optional[float] = None) -> Optional[Card]:
+        """
+        Feed a quiz answer in. Wrong answers start a card (due immediately);
+        answers to questions already on the schedule count as a review.
+        """
+        now = time.time() if now is None else now
+        key = item_id(question)
+        card = self.cards.get(key)
+        if card is None:
+            if correct:
+                return None
+            card = self.cards[key] = Card(key, question, due=now)
+            self._push(card)
+            return card
+        return self.review(key, quality_from_attempt(correct, time_taken), now)
+
+    def review(self, key: str, quality: int, now: Optional[float] = None) -> Optional[Card]:
+        card = self.cards.get(key)
+        if card is None:
+            return None
+        card.review(quality, time.time() if now is None else now)
+        self._push(card)
+        return card
+
+    def due(self, now: Optional[float] = None, limit: int = 20) -> List[Card]:
+        """Cards due at `now`, earliest first. O(k log n) for k returned cards."""
+        now = time.time() if now is None else now
+        found, entries = [], []
+        while self._heap and self._heap[0][0] <= now and len(found) < limit:
+            entry = heapq.heappop(self._heap)
+            card = self.cards.get(entry[1])
+            if card is None or card.due != entry[0]:
+                continue   # stale entry from an earlier schedule
+            found.append(card)
+            entries.append(entry)
+        for entry in entries:
+            heapq.heappush(self._heap, entry)
+        return found
+
+    def next_due_time(self) -> Optional[float]:
+        while self._heap:
+            due, key = self._heap[0]
+            card = self.cards.get(key)
+            if card is not None and card.due == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
@@ -0,0 +1,237 @@
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from monitoring.metrics import timed
+
+# ---------------------------------------------------------
+# ISL SIGN RECOGNITION (HAND LANDMARKS -> LABEL)
+# ---------------------------------------------------------
+# Same embedding as the browser detector: 21 hand landmarks x (x, y, z),
+# flattened to 63 values. Before matching, every frame is moved so the wrist
+# sits at the origin and scaled by the wrist -> middle-finger-knuckle length,
+# so distance from the camera and hand position in the frame don't matter.
+#
+# The vocabulary is one contiguous float32 matrix; a batch of frames is
+# matched in a single vectorised pass (|x|^2 - 2 x.y + |y|^2). Large
+# in-memory vocabularies switch to a scipy cKDTree when scipy is installed.
+# The tree keeps its own float64 copy of the matrix (twice the float32 size,
+# on top of it), so a memory-mapped vocabulary stays on brute force unless
+# use_tree=True asks for the tree. It is built on the first query.
+
+N_POINTS = 21
+DIM = N_POINTS * 3
+WRIST, MIDDLE_MCP = 0, 9
+
+TREE_THRESHOLD = 4096      # vocabulary rows before the KD-tree pays off
+MAX_DISTANCE = 1.5         # same cut-off as the browser detector
+
+SIGNS_DIR = Path(os.getenv(
+    "SIGNSENSE_SIGNS_DIR",
+    Path(__file__).resolve().parents[2] / "models" / "signs",
+))
+
+
+def normalize_landmarks(frames) -> np.ndarray:
+    """(n, 21, 3) or (n, 63) landmarks -> (n, 63) float32, translation/scale free."""
+    pts = np.asarray(frames, dtype=np.float32)
+    if pts.ndim == 1 or (pts.ndim == 2 and pts.shape == (N_POINTS, 3)):
+        pts = pts[None]
+    pts = pts.reshape(len(pts), N_POINTS, 3)
+
+    pts = pts - pts[:, WRIST:WRIST + 1, :]
+    scale = np.linalg.norm(pts[:, MIDDLE_MCP, :], axis=1)
+    # degenerate frames (knuckle on the wrist) fall back to the hand's extent
+    fallback = np.linalg.norm(pts, axis=2).max(axis=1)
+    scale = np.where(scale > 1e-6, scale, fallback)
+    scale[scale <= 1e-6] = 1.0
+    pts /= scale[:, None, None]
+    return np.ascontiguousarray(pts.reshape(len(pts), DIM))
+
+
+def _load_tree():
+    try:
+        from scipy.spatial import cKDTree  # type: ignore
+        return cKDTree
+    except Exception:
+        return None
+
+
+class SignIndex:
+    def __init__(self, embeddings, labels: Sequence[str], normalized: bool = False,
+                 use_tree: Optional[bool] = None):
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if not normalized:
+            matrix = normalize_landmarks(matrix)
+        if matrix.ndim != 2 or matrix.shape[1] != DIM:
+            raise ValueError(f"Embeddings must be (n, {DIM}), got {matrix.shape}")
+        if len(labels) != len(matrix):
+            raise ValueError("One label per embedding row is required")
+        if not len(matrix):
+            raise ValueError("Sign vocabulary is empty")
+
+        # np.load(mmap_mode="r") arrays stay memory-mapped (no copy) when
+        # they are already float32 and C-contiguous
+        self.matrix = matrix if matrix.flags.c_contiguous else np.ascontiguousarray(matrix)
+        self.labels = np.asarray(labels, dtype=object)
+        self.sq_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+
+        self._tree = None
+        if use_tree is None:
+            use_tree = len(self.matrix) >= TREE_THRESHOLD and not isinstance(embeddings, np.memmap)
+        self._use_tree = use_tree
+        self._tree_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def _get_tree(self):
+        """Built once, on first use; copies the matrix to float64 (see above)."""
+        if self._use_tree and self._tree is None:
+            with self._tree_lock:
+                if self._use_tree and self._tree is None:
+                    tree_cls = _load_tree()
+                    if tree_cls is None:
+                        self._use_tree = False
+                    else:
+                        self._tree = tree_cls(self.matrix)
+        return self._tree
+
+    @property
+    def vocabulary(self) -> List[str]:
+        return sorted(set(self.labels.tolist()))
+
+    @timed("signsense_sign_seconds")
+    def query(self, frames, k: int = 1, normalized: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and L2 distances of the k nearest rows, each shaped (n_frames, k)."""
+        x = np.asarray(frames, dtype=np.float32) if normalized else normalize_landmarks(frames)
+        if x.ndim == 1:
+            x = x[None]
+        k = max(1, min(k, len(self.matrix)))
+
+        tree = self._get_tree()
+        if tree is not None:
+            dist, idx = tree.query(x, k=k)
+            return idx.reshape(len(x), k), dist.reshape(len(x), k).astype(np.float32)
+
+        d2 = np.einsum("ij,ij->i", x, x)[:, None] - 2.0 * (x @ self.matrix.T) + self.sq_norms[None, :]
+        np.maximum(d2, 0.0, out=d2)
+        if k == 1:
+            idx = d2.argmin(axis=1)[:, None]
+        else:
+            part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            order = np.take_along_axis(d2, part, axis=1).argsort(axis=1)
+            idx = np.take_along_axis(part, order, axis=1)
+        return idx, np.sqrt(np.take_along_axis(d2, idx, axis=1))
+
+    def predict(self, frames, k: int = 3, max_distance: float = MAX_DISTANCE,
+                normalized: bool = False) -> List[Optional[Tuple[str, float]]]:
+        """Per frame: (label, distance) by majority of the k nearest, or None if too far."""
+        idx, dist = self.query(frames, k=k, normalized=normalized)
+        results = []
+        for row_idx, row_dist in zip(idx, dist):
+            close = row_dist <= max_distance
+            if not close.any():
+                results.append(None)
+                continue
+            votes = Counter(self.labels[row_idx[close]].tolist())
+            label, _ = votes.most_common(1)[0]
+            best = float(row_dist[close][self.labels[row_idx[close]] == label].min())
+            results.append((label, best))
+        return results
+
+    def recognize(self, frames, **kwargs) -> Optional[Tuple[str, float]]:
+        """One label for a whole clip: majority over the frames that matched."""
+        matched = [p for p in self.predict(frames, **kwargs) if p]
+        if not matched:
+            return None
+        votes = Counter(label for label, _ in matched)
+        label, _ = votes.most_common(1)[0]
+        return label, min(d for l, d in matched if l == label)
+
+    # -----------------------------------------------------
+    # FILES
+    # -----------------------------------------------------
+    @classmethod
+    def from_files(cls, embeddings_path: Path, labels: Sequence[str], **kwargs) -> "SignIndex":
+        matrix = np.load(embeddings_path, mmap_mode="r")
+        return cls(matrix, labels, normalized=True, **kwargs)
+
+
+# ---------------------------------------------------------
+# ANSWER MAPPING
+# ---------------------------------------------------------
+def parse_frames(payload) -> np.ndarray:
+    """
+    Accepts what the browser detector records: a list of frames (each 21
+    [x, y, z] points or 63 numbers), or {"frames": [...]}.
+    """
+    if isinstance(payload, dict):
+        payload = payload.get("frames", payload.get("landmarks", []))
+    frames = np.asarray(payload, dtype=np.float32)
+    if frames.size == 0 or frames.size % DIM:
+        raise ValueError("Expected frames of 21 landmarks x 3 coordinates")
+    return frames.reshape(-1, DIM)
+
+
+def label_to_option(label: str, options: Sequence[str]) -> Optional[str]:
+    """Signed letter A/B/C/... picks that option; otherwise match the option text."""
+    label = (label or "").strip()
+    if len(label) == 1 and label.isalpha():
+        idx = ord(label.upper()) - ord("A")
+        if 0 <= idx < len(options):
+            return options[idx]
+    for opt in options:
+        if str(opt).strip().lower() == label.lower():
+            return opt
+    return None
+
+
+# ---------------------------------------------------------
+# SHARED INDEX
+# ---------------------------------------------------------
+_index: Optional[SignIndex] = None
+_index_lock = threading.Lock()
+_index_loaded = False
+
+
+def current_vocabulary_dir(signs_dir: Path = SIGNS_DIR) -> Path:
+    """The version named in models/signs/CURRENT (see train_embeddings.py)."""
+    current = signs_dir / "CURRENT"
+    if current.exists():
+        return signs_dir / current.read_text(encoding="utf-8").strip()
+    return signs_dir
+
+
+def _load_default_index() -> Optional[SignIndex]:
+    vocab_dir = current_vocabulary_dir()
+    embeddings = vocab_dir / "embeddings.npy"
+    labels_path = vocab_dir / "labels.txt"
+    if not embeddings.exists() or not labels_path.exists():
+        return None
+    labels = labels_path.read_text(encoding="utf-8").splitlines()
+    return SignIndex.from_files(embeddings, labels)
+
+
+def get_sign_index() -> Optional[SignIndex]:
+    """The installed vocabulary (models/signs), or None if there isn't a usable one."""
+    global _index, _index_loaded
+    if not _index_loaded:
+        with _index_lock:
+            if not _index_loaded:
+                try:
+                    _index = _load_default_index()
+                except Exception:
+                    _index = None
+                _index_loaded = True
+    return _index
+
+
+def set_sign_index(index: Optional[SignIndex]):
+    global _index, _index_loaded
+    with _index_lock:
+        _index, _index_loaded = index, True
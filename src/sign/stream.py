@@ -0,0 +1,155 @@
+import queue
+import time
+from collections import Counter, deque
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from sign.recognizer import MAX_DISTANCE, SignIndex, normalize_landmarks
+
+# ---------------------------------------------------------
+# STREAMING SIGN RECOGNITION
+# ---------------------------------------------------------
+# Frames arrive one at a time (webcam, websocket, recorded clip). They are
+# micro-batched so matching is one vectorised query per batch instead of a
+# full scan per frame, then smoothed:
+#   - a sliding window majority vote over the last `window` frame labels,
+#   - an EMA of per-label match strength (1 - distance / max_distance),
+# and a label is committed only when both agree, clear `min_confidence`, and
+# hold for `min_hold` frames. After a commit the stream must go quiet (no
+# hand / no match) or change sign before it can commit again, so one signed
+# answer produces exactly one commit.
+
+STOP = object()   # put on a queue to end run_queue (None means "no hand")
+
+
+class StreamingRecognizer:
+    def __init__(self, index: SignIndex, batch_size: int = 16, max_latency: float = 0.1,
+                 window: int = 9, ema_alpha: float = 0.35, min_votes: float = 0.6,
+                 min_confidence: float = 0.3, min_hold: int = 4, k: int = 3,
+                 max_distance: float = MAX_DISTANCE):
+        self.index = index
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.window = window
+        self.ema_alpha = ema_alpha
+        self.min_votes = min_votes
+        self.min_confidence = min_confidence
+        self.min_hold = min_hold
+        self.k = k
+        self.max_distance = max_distance
+        self.reset()
+
+    def reset(self):
+        """Start a new answer: forget the window, EMA and the last commit."""
+        self._recent: deque = deque(maxlen=self.window)
+        self._ema: Dict[str, float] = {}
+        self._candidate: Optional[str] = None
+        self._held = 0
+        self._committed: Optional[str] = None
+        self.frames_seen = 0
+
+    # -----------------------------------------------------
+    # SMOOTHING
+    # -----------------------------------------------------
+    def _step(self, prediction) -> Optional[Dict]:
+        self.frames_seen += 1
+        label = prediction[0] if prediction else None
+        strength = 1.0 - prediction[1] / self.max_distance if prediction else 0.0
+
+        decay = 1.0 - self.ema_alpha
+        for key in list(self._ema):
+            self._ema[key] *= decay
+            if self._ema[key] < 1e-3:
+                del self._ema[key]
+        if label is not None:
+            self._ema[label] = self._ema.get(label, 0.0) + self.ema_alpha * strength
+
+        self._recent.append(label)
+        top, votes = Counter(self._recent).most_common(1)[0]
+        share = votes / self.window
+
+        if top is None or share < self.min_votes or self._ema.get(top, 0.0) < self.min_confidence:
+            if top is None and share >= self.min_votes:
+                self._committed = None     # hand dropped: ready for the next sign
+            self._candidate, self._held = None, 0
+            return None
+
+        if top != self._candidate:
+            self._candidate, self._held = top, 0
+        self._held += 1
+        if self._held < self.min_hold or top == self._committed:
+            return None
+
+        self._committed = top
+        return {"label": top, "confidence": round(self._ema[top], 3), "frame": self.frames_seen - 1}
+
+    def _match(self, batch: List[np.ndarray]) -> List[Optional[Dict]]:
+        frames = normalize_landmarks(np.stack(batch))
+        predictions = self.index.predict(frames, k=self.k, max_distance=self.max_distance,
+                                         normalized=True)
+        commits = []
+        for prediction in predictions:
+            commit = self._step(prediction)
+            if commit:
+                commits.append(commit)
+        return commits
+
+    # -----------------------------------------------------
+    # SOURCES
+    # -----------------------------------------------------
+    def run(self, frames: Iterable) -> Iterator[Dict]:
+        """Consume an iterable of frames (None = no hand) and yield commits."""
+        batch: List[np.ndarray] = []
+        for frame in frames:
+            batch, commits = self._add(batch, frame)
+            yield from commits
+            if len(batch) >= self.batch_size:
+                yield from self._match(batch)
+                batch = []
+        if batch:
+            yield from self._match(batch)
+
+    def run_queue(self, source: "queue.Queue", stop=STOP) -> Iterator[Dict]:
+        """
+        Consume frames from a queue until `stop` arrives. A partial batch is
+        matched once it is `max_latency` seconds old, so slow producers still
+        get timely commits.
+        """
+        batch: List[np.ndarray] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = source.get(timeout=timeout)
+            except queue.Empty:
+                yield from self._match(batch)
+                batch, deadline = [], None
+                continue
+            if item is stop:
+                break
+            batch, commits = self._add(batch, item)
+            yield from commits
+            if batch and deadline is None:
+                deadline = time.monotonic() + self.max_latency
+            if len(batch) >= self.batch_size:
+                yield from self._match(batch)
+                batch, deadline = [], None
+        if batch:
+            yield from self._match(batch)
+
+    def _add(self, batch: List[np.ndarray], frame):
+        if frame is not None:
+            batch.append(np.asarray(frame, dtype=np.float32).reshape(-1))
+            return batch, []
+        # a no-hand frame: match what is pending first so ordering is preserved
+        commits = self._match(batch) if batch else []
+        commit = self._step(None)
+        return [], commits + ([commit] if commit else [])
+
+    def recognize_answer(self, frames: Iterable) -> Optional[Dict]:
+        """The first committed sign in a clip, i.e. one answer."""
+        self.reset()
+        for commit in self.run(frames):
+            return commit
+        return None
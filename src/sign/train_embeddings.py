@@ -0,0 +1,244 @@
+"""
+Compile recorded hand-landmark sequences into a sign vocabulary.
+
+Each recording is one file, either JSON or CSV:
+
+    {"label": "A", "frames": [[x, y, z] * 21, ...]}   JSON (frames may be flat 63-lists)
+    [[...63 numbers...], ...]                          JSON, label from the folder name
+    x0,y0,z0,...,x20,y20,z20                           CSV, one frame per row; an optional
+                                                       leading "label" column is used too
+
+Files are read one at a time. Every frame is normalised exactly as the
+recogniser does at query time. Duplicate recordings, whose normalised
+frames match to 3 decimals, are skipped, and each recording is averaged
+into a prototype vector. With --mode label, the prototypes are further
+averaged into one vector per sign. Only running sums and a digest set are
+held in memory, so tens of thousands of recordings are fine.
+
+The output is a new version directory under models/signs/:
+
+    models/signs/v3/embeddings.npy   float32 (rows, 63), loaded with mmap_mode="r"
+    models/signs/v3/labels.txt       one label per row
+    models/signs/v3/manifest.json    counts, mode and checksum
+    models/signs/CURRENT             "v3" (switched atomically once v3 is complete)
+
+A run that yields no rows fails with a non-zero exit and publishes nothing.
+
+Run from the repo root:
+
+    python src/sign/train_embeddings.py recordings/ --mode recording
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sign.recognizer import DIM, SIGNS_DIR, normalize_landmarks
+
+CHUNK_ROWS = 4096   # rows copied per step into the final .npy
+
+
+# ---------------------------------------------------------
+# READING RECORDINGS
+# ---------------------------------------------------------
+def read_recording(path: Path) -> Tuple[Optional[str], np.ndarray]:
+    """(label or None, raw frames as (n, 63) float32)."""
+    label = None
+    if path.suffix.lower() == ".csv":
+        rows = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if not row:
+                    continue
+                if len(row) == DIM + 1:
+                    label, row = label or row[0], row[1:]
+                try:
+                    rows.append([float(v) for v in row])
+                except ValueError:
+                    continue   # header line
+        frames = np.asarray(rows, dtype=np.float32)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if isinstance(payload, dict):
+            label = payload.get("label")
+            payload = payload.get("frames", payload.get("landmarks", []))
+        frames = np.asarray(payload, dtype=np.float32)
+
+    if frames.size == 0 or frames.size % DIM:
+        raise ValueError(f"{path}: expected frames of 21 landmarks x 3 coordinates")
+    return label, frames.reshape(-1, DIM)
+
+
+def iter_recordings(root: Path) -> Iterator[Path]:
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            if name.lower().endswith((".json", ".csv")):
+                yield Path(dirpath) / name
+
+
+def label_for(path: Path, root: Path, label: Optional[str]) -> str:
+    if label:
+        return str(label).strip()
+    if path.parent != root:
+        return path.parent.name
+    return path.stem.split("_", 1)[0]   # A_001.json -> A
+
+
+def digest(frames: np.ndarray) -> bytes:
+    return hashlib.sha1(np.round(frames, 3).tobytes()).digest()
+
+
+# ---------------------------------------------------------
+# COMPILER
+# ---------------------------------------------------------
+class EmptyVocabularyError(ValueError):
+    pass
+
+
+def next_version(out_dir: Path) -> str:
+    versions = [
+        int(p.name[1:]) for p in out_dir.glob("v*") if p.is_dir() and p.name[1:].isdigit()
+    ]
+    return f"v{max(versions, default=0) + 1}"
+
+
+def compile_vocabulary(root: Path, out_dir: Path = SIGNS_DIR, mode: str = "recording",
+                       min_frames: int = 1) -> Dict:
+    root, out_dir = Path(root), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    seen = set()
+    stats = {"recordings": 0, "duplicates": 0, "skipped": 0, "frames": 0}
+    label_sums: Dict[str, np.ndarray] = {}
+    label_counts: Dict[str, int] = {}
+    labels = []
+
+    # per-recording prototypes are appended to a raw scratch file, so memory
+    # stays flat however many recordings there are
+    with tempfile.TemporaryFile(dir=out_dir) as scratch:
+        for path in iter_recordings(root):
+            try:
+                label, frames = read_recording(path)
+            except (ValueError, json.JSONDecodeError, OSError) as exc:
+                stats["skipped"] += 1
+                print(f"skip: {exc}", file=sys.stderr)
+                continue
+
+            frames = frames[np.isfinite(frames).all(axis=1)]
+            if len(frames) < min_frames:
+                stats["skipped"] += 1
+                continue
+
+            normed = normalize_landmarks(frames)
+            key = digest(normed)
+            if key in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(key)
+
+            label = label_for(path, root, label)
+            proto = normed.mean(axis=0, dtype=np.float64)
+            stats["recordings"] += 1
+            stats["frames"] += len(normed)
+            label_counts[label] = label_counts.get(label, 0) + 1
+
+            if mode == "label":
+                label_sums[label] = label_sums.get(label, 0) + proto
+            else:
+                scratch.write(proto.astype(np.float32).tobytes())
+                labels.append(label)
+
+        # an empty vocabulary would replace a working one and break every
+        # sign answer, so nothing is written and CURRENT is left alone
+        if not (label_sums if mode == "label" else labels):
+            raise EmptyVocabularyError(
+                f"No usable recordings in {root} ({stats['skipped']} skipped, "
+                f"{stats['duplicates']} duplicates); {out_dir / 'CURRENT'} not changed"
+            )
+
+        version = next_version(out_dir)
+        target = out_dir / version
+        target.mkdir()
+        npy_path = target / "embeddings.npy"
+
+        if mode == "label":
+            labels = sorted(label_sums)
+            matrix = np.stack([label_sums[l] / label_counts[l] for l in labels])
+            np.save(npy_path, matrix.astype(np.float32))
+        else:
+            out = np.lib.format.open_memmap(npy_path, mode="w+", dtype=np.float32,
+                                            shape=(len(labels), DIM))
+            scratch.seek(0)
+            row_bytes = DIM * 4
+            for start in range(0, len(labels), CHUNK_ROWS):
+                buf = scratch.read(row_bytes * CHUNK_ROWS)
+                chunk = np.frombuffer(buf, dtype=np.float32).reshape(-1, DIM)
+                out[start:start + len(chunk)] = chunk
+            out.flush()
+            del out
+
+    with open(target / "labels.txt", "w", encoding="utf-8") as f:
+        f.write("\n".join(labels))
+
+    sha = hashlib.sha256()
+    with open(npy_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+
+    manifest = {
+        "version": version,
+        "created": time.time(),
+        "mode": mode,
+        "rows": len(labels),
+        "dim": DIM,
+        "signs": label_counts,
+        "sha256": sha.hexdigest(),
+        **stats,
+    }
+    with open(target / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # publish: readers only ever see a complete version
+    tmp = out_dir / "CURRENT.tmp"
+    tmp.write_text(version, encoding="utf-8")
+    os.replace(tmp, out_dir / "CURRENT")
+    return manifest
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", type=Path, help="folder of .json/.csv recordings")
+    parser.add_argument("--out", type=Path, default=SIGNS_DIR)
+    parser.add_argument("--mode", choices=["recording", "label"], default="recording",
+                        help="one prototype per recording (better k-NN) or one per sign")
+    parser.add_argument("--min-frames", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        manifest = compile_vocabulary(args.recordings, args.out, args.mode, args.min_frames)
+    except EmptyVocabularyError as exc:
+        parser.exit(1, f"error: {exc}\n")
+    print(f"{manifest['version']}: {manifest['rows']} rows, {len(manifest['signs'])} signs "
+          f"from {manifest['recordings']} recordings "
+          f"({manifest['duplicates']} duplicates, {manifest['skipped']} skipped)")
+    print(f"Written to {args.out / manifest['version']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,25 +5,39 @@ BASE_DIR = Path(__file__).resolve().parent / "src"
 sys.path.append(str(BASE_DIR))
 
 import streamlit as st
+import importlib
 import time
 import os
-import re
 
 # ---------------------------------------------------------
 # IMPORT EXISTING MODULES
 # ---------------------------------------------------------
+# Only what every rerun needs. Page modules and backends (Firestore, SQLite
+# profiles, OpenAI, PyPDF2) are imported on the first visit to a page that
+# uses them, so a fresh worker can serve its first page sooner.
+# benchmarks/bench_import.py tracks the cold-start cost.
 from backend.logic import QuizEngine
-from backend.cloud_store import (
-    create_classroom,
-    join_classroom,
-    add_classroom_question,
-    submit_classroom_answer,
-    get_classroom_state,
-)
-from frontend.ui import apply_theme, render_question_UI
-from frontend.dashboard import render_dashboard
-from revision.revision_ui import render_revision_page
-from ai.ai_builder import ai_quiz_builder
+from backend.lifecycle import start_sweeper
+from frontend.ui import (apply_theme, current_learner, job_owner, job_progress, render_question_UI,
+                         rerun_fragment)
+from monitoring.metrics import inc, start_exporter, timed
+from monitoring.profiler import profile_rerun
+
+# ---------------------------------------------------------
+# LAZY PAGE REGISTRY
+# ---------------------------------------------------------
+# Navigation label -> "module:function" for pages that live outside this file.
+PAGE_MODULES = {
+    "🔁 Revision Lab": "revision.revision_ui:render_revision_page",
+    "📊 Dashboard": "frontend.dashboard:render_dashboard",
+    "🤖 Admin / AI Quiz Builder": "ai.ai_builder:ai_quiz_builder",
+}
+
+
+def load_page(label):
+    """Import a page module on first use (later calls hit sys.modules)."""
+    module, func = PAGE_MODULES[label].split(":")
+    return getattr(importlib.import_module(module), func)
 
 # ---------------------------------------------------------
 # SESSION STATE INIT
@@ -32,80 +46,38 @@ st.session_state.setdefault("cognitive_log", {})
 st.session_state.setdefault("chat_history", [])
 
 # ---------------------------------------------------------
-# PDF HELPERS (NEW)
+# COGNITIVE LOGGING
+# ---------------------------------------------------------
+def log_cognitive(student, question, meta):
+    st.session_state.cognitive_log.setdefault(student, {}).setdefault(question, []).append(meta)
+
+# ---------------------------------------------------------
+# LEARNER PROFILE CHECKPOINTS
 # ---------------------------------------------------------
-def extract_text_from_pdf(pdf_file):
+# Only named learners are saved: a blank name is a guest whose progress lives
+# in this browser session, so two guests never share or overwrite a profile.
+def checkpoint_engine(learner, engine, new_session=False):
+    if not learner:
+        return
     try:
-        import PyPDF2
-        reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() or ""
-        return text
+        from backend.profile_store import get_profile_store
+        store = get_profile_store()
+        if new_session:
+            store.start_session(learner, engine)
+        else:
+            store.checkpoint(learner, engine)
     except Exception:
-        return ""
-
+        pass  # progress still lives in session_state
 
-def generate_questions_from_pdf(text):
-    """
-    Generic MCQ parser for independent dataset PDFs.
-    Supports standard formats like:
-    1. Question
-    a) Option
-    b) Option
-    c) Option
-    d) Option
-    """
-
-    questions = []
-    lines = [l.strip() for l in text.split("\n") if l.strip()]
-
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        # Detect question (starts with number + dot)
-        if re.match(r"^\d+\.", line):
-            question_text = re.sub(r"^\d+\.\s*", "", line)
-            options = []
-
-            j = i + 1
-            while j < len(lines) and len(options) < 4:
-                if re.match(r"^[a-dA-D][\)\.]", lines[j]):
-                    option = re.sub(r"^[a-dA-D][\)\.]\s*", "", lines[j])
-                    options.append(option)
-                j += 1
-
-            if len(options) >= 2:
-                questions.append({
-                    "question": question_text,
-                    "options": options,
-                    "answer": options[0],  # placeholder
-                })
-
-            i = j
-        else:
-            i += 1
-
-    # Fallback (never crash)
-    if not questions:
-        questions = [{
-            "question": "Dataset loaded successfully, but no MCQs detected.",
-            "options": [
-                "Check PDF format",
-                "Ensure MCQ structure",
-                "Try another dataset"
-            ],
-            "answer": "Check PDF format",
-        }]
-
-    return questions
 
-# ---------------------------------------------------------
-# COGNITIVE LOGGING
-# ---------------------------------------------------------
-def log_cognitive(student, question, meta):
-    st.session_state.cognitive_log.setdefault(student, {}).setdefault(question, []).append(meta)
+def restore_engine(learner):
+    if not learner:
+        return None
+    try:
+        from backend.profile_store import get_profile_store
+        return get_profile_store().restore(learner)
+    except Exception:
+        return None
 
 # ---------------------------------------------------------
 # DYNAMIC FLOW OVERLAY
@@ -120,48 +92,119 @@ def dynamic_flow_overlay(question, subject):
 # ---------------------------------------------------------
 # AI LEARNING ASSISTANT
 # ---------------------------------------------------------
+def ask_assistant(question: str, owner: str = None, classroom: str = None) -> str:
+    """The OpenAI call behind "Ask AI"; runs on a job worker thread."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return "AI not connected. In production, this explains steps."
+
+    from backend.admission import Overloaded, get_admission
+    admission = get_admission()
+    try:
+        from openai import OpenAI, RateLimitError
+        client = OpenAI(api_key=api_key)
+        admission.acquire("openai", user=owner, classroom=classroom)
+        try:
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "Explain concepts step-by-step."},
+                    {"role": "user", "content": question},
+                ],
+                max_tokens=200,
+            )
+            return response.choices[0].message.content
+        except RateLimitError:
+            # upstream quota hit: pause everyone's OpenAI calls. No retry here;
+            # admission would shed it while the pause lasts.
+            admission.backoff("openai", 2.0)
+            return "AI is busy right now. Please try again in a minute."
+    except Overloaded as exc:
+        return f"Lots of questions right now. Please ask again in {exc.retry_after:.0f}s."
+    except Exception:
+        return "AI temporarily unavailable."
+
+
+@st.fragment
+@timed("signsense_fragment_seconds")
 def render_chatbot():
-    st.sidebar.divider()
-    st.sidebar.subheader("🤖 AI Learning Assistant")
+    """Sidebar assistant; call inside `with st.sidebar` so asking reruns only the chat."""
+    st.divider()
+    st.subheader("🤖 AI Learning Assistant")
+
+    user_input = st.text_input("Ask how to think:", key="chat_input")
 
-    user_input = st.sidebar.text_input("Ask how to think:", key="chat_input")
+    from backend.jobs import DONE, FINISHED, PRIORITY_INTERACTIVE, get_scheduler
+    scheduler = get_scheduler()
+    job_id = st.session_state.get("chat_job")
 
-    if st.sidebar.button("Ask AI"):
+    if st.button("Ask AI", disabled=job_id is not None):
         if not user_input.strip():
             return
 
         st.session_state.chat_history.append(("You", user_input))
-
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            reply = "AI not connected. In production, this explains steps."
+        job_id = st.session_state.chat_job = scheduler.submit(
+            ask_assistant, user_input, job_owner(), st.session_state.get("joined_code"),
+            owner=job_owner(), kind="chat", priority=PRIORITY_INTERACTIVE,
+        )
+
+    if job_id is not None:
+        status = scheduler.status(job_id)
+        if status is None or status["state"] in FINISHED:
+            reply = status["result"] if status and status["state"] == DONE else "AI temporarily unavailable."
+            st.session_state.chat_history.append(("AI", reply))
+            del st.session_state.chat_job
         else:
-            try:
-                from openai import OpenAI
-                client = OpenAI(api_key=api_key)
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "Explain concepts step-by-step."},
-                        {"role": "user", "content": user_input},
-                    ],
-                    max_tokens=200,
-                )
-                reply = response.choices[0].message.content
-            except Exception:
-                reply = "AI temporarily unavailable."
-
-        st.session_state.chat_history.append(("AI", reply))
+            job_progress(job_id, "Thinking")
 
     for who, msg in st.session_state.chat_history[-6:]:
-        st.sidebar.markdown(f"**{who}:** {msg}")
+        st.markdown(f"**{who}:** {msg}")
 
 # ---------------------------------------------------------
 # SOLO QUIZ (WITH PDF UPLOAD)
 # ---------------------------------------------------------
+def pdf_import_status(pdf_file):
+    """
+    Parse each upload once, in a worker process. Returns the questions when
+    ready, otherwise shows progress (or the failure) and returns None.
+    """
+    from backend.jobs import CANCELLED, DONE, FINISHED, get_scheduler
+    from backend.pdf_import import questions_from_pdf_bytes
+
+    scheduler = get_scheduler()
+    jobs = st.session_state.setdefault("pdf_jobs", {})
+    status = scheduler.status(jobs[pdf_file.file_id]) if pdf_file.file_id in jobs else None
+    if status is None:
+        # new upload, or its result was evicted from the job store
+        jobs[pdf_file.file_id] = scheduler.submit(
+            questions_from_pdf_bytes, pdf_file.getvalue(),
+            owner=job_owner(), kind="pdf_import", process=True,
+        )
+        status = scheduler.status(jobs[pdf_file.file_id])
+
+    if status["state"] not in FINISHED:
+        job_progress(status["id"], "Reading PDF")
+        return None
+    if status["state"] == DONE and status["result"]:
+        st.success("PDF loaded successfully.")
+        return status["result"]
+    if status["state"] == CANCELLED:
+        st.info("PDF import cancelled. Upload the file again to retry.")
+        return None
+    st.warning("Could not extract text from PDF.")
+    return None
+
+
+@timed("signsense_page_seconds")
 def solo_quiz():
     st.header("📘 Solo Quiz")
 
+    if "solo_learner" not in st.session_state:
+        # the widget key was dropped while another page was open
+        st.session_state.solo_learner = current_learner()
+    learner = st.text_input("Your Name", key="solo_learner",
+                            placeholder="Enter a name to save your progress").strip()
+    st.session_state.learner = learner
     mode = st.selectbox("Accessibility Mode", ["standard", "isl", "adhd", "dyslexia"])
     subject = st.selectbox("Subject", ["Math", "English"]).lower()
 
@@ -171,35 +214,66 @@ def solo_quiz():
         ["Built-in Quiz", "Upload PDF Dataset"]
     )
 
-    pdf_text = None
+    pdf_questions = None
     if source == "Upload PDF Dataset":
         pdf_file = st.file_uploader("Upload PDF file", type=["pdf"])
         if pdf_file:
-            pdf_text = extract_text_from_pdf(pdf_file)
-            if pdf_text.strip():
-                st.success("PDF loaded successfully.")
-            else:
-                st.warning("Could not extract text from PDF.")
+            pdf_questions = pdf_import_status(pdf_file)
 
     if st.button("Start / Restart Quiz"):
         engine = QuizEngine(mode, subject)
+        from ai.knowledge_tracing import get_tracer, order_questions
+        tracer = get_tracer()
+        mastery = tracer.mastery(learner) if learner else {}
+        p_known = mastery.get(subject, tracer.params(subject)["p_init"])
+        engine.questions = order_questions(engine.questions, p_known)
 
-        if source == "Upload PDF Dataset" and pdf_text:
-            engine.questions = generate_questions_from_pdf(pdf_text)
+        if source == "Upload PDF Dataset" and pdf_questions:
+            from backend.dedupe import ingest_questions
+            engine.questions, duplicates = ingest_questions(pdf_questions, subject, source="pdf")
+            st.session_state.import_duplicates = duplicates
 
         st.session_state.engine = engine
         st.session_state.q_start_time = time.time()
-        st.experimental_rerun()
+        checkpoint_engine(learner, engine, new_session=True)
+        st.rerun()
 
     engine = st.session_state.get("engine")
+    if not engine:
+        # browser refresh / new worker: pick up where this learner left off
+        restored = restore_engine(learner)
+        if restored:
+            engine = st.session_state.engine = restored
+            st.session_state.q_start_time = time.time()
+            if not engine.get_current_question():
+                st.session_state.scored_engine = engine   # scored when it was finished
+            st.info(f"Resumed your quiz at question {engine.current_index + 1}.")
     if not engine:
         st.info("Click Start to begin.")
         return
 
+    duplicates = st.session_state.pop("import_duplicates", None)
+    if duplicates:
+        repeats = sum(1 for d in duplicates if d["in_batch"])
+        st.caption(f"Import: {repeats} repeated question(s) skipped, "
+                   f"{len(duplicates) - repeats} already in the question bank.")
+
+    quiz_step(learner, mode, subject)
+
+
+@st.fragment
+@timed("signsense_fragment_seconds")
+def quiz_step(learner, mode, subject):
+    """Current question and Back/Next; clicks here rerun only this fragment."""
+    engine = st.session_state.engine
     q = engine.get_current_question()
     if not q:
         st.balloons()
         st.success("🎉 Quiz completed!")
+        if st.session_state.get("scored_engine") is not engine:
+            from backend.leaderboard import record_score
+            record_score(learner or "Anonymous", engine.score, mode, subject)
+            st.session_state.scored_engine = engine
         return
 
     selected = render_question_UI(q, mode)
@@ -213,7 +287,8 @@ def solo_quiz():
         if engine.current_index > 0:
             if st.button("⬅ Back"):
                 engine.current_index -= 1
-                st.experimental_rerun()
+                checkpoint_engine(learner, engine)
+                rerun_fragment()
 
     with col2:
         if st.button("Next ➜"):
@@ -228,16 +303,23 @@ def solo_quiz():
                         "hesitation": time_spent > 10,
                     },
                 )
-                engine.check_answer(selected)
+                result = engine.check_answer(selected)
+                from ai.knowledge_tracing import get_tracer, skill_of
+                if learner:
+                    get_tracer().observe(learner, skill_of(q, subject), result["correct"])
 
             engine.next_question()
+            checkpoint_engine(learner, engine)
             st.session_state.q_start_time = time.time()
-            st.experimental_rerun()
+            rerun_fragment()
 
 # ---------------------------------------------------------
 # STUDENT CLASSROOM
 # ---------------------------------------------------------
+@timed("signsense_page_seconds")
 def student_classroom():
+    from backend.cloud_store import get_classroom_state, join_classroom
+
     st.header("🎓 Student Classroom")
 
     name = st.text_input("Your Name")
@@ -255,21 +337,39 @@ def student_classroom():
     if "joined_code" in st.session_state:
         classroom = get_classroom_state(st.session_state.joined_code)
         for i, q in enumerate(classroom.get("questions", [])):
-            st.markdown(f"**Q{i+1}: {q}**")
-            ans = st.text_input("Answer", key=f"ans_{i}")
-            if st.button("Submit", key=f"submit_{i}"):
-                submit_classroom_answer(
-                    st.session_state.joined_code,
-                    st.session_state.student,
-                    i,
-                    ans,
-                )
-                st.success("Submitted")
+            classroom_answer(st.session_state.joined_code, st.session_state.student, i, q)
+
+
+@st.fragment
+@timed("signsense_fragment_seconds")
+def classroom_answer(code, student, i, q):
+    """One question card; picking or submitting an answer reruns just this card."""
+    from backend.cloud_store import submit_classroom_answer
+
+    st.markdown(f"**Q{i+1}: {q['question']}**")
+    if q["options"]:
+        ans = st.radio("Answer", q["options"], key=f"ans_{i}")
+    else:
+        ans = st.text_input("Answer", key=f"ans_{i}")
+    if st.button("Submit", key=f"submit_{i}"):
+        from backend.admission import Overloaded, get_admission
+        from backend.cloud_store import cloud_enabled
+        try:
+            get_admission().acquire("firestore" if cloud_enabled() else "state_backend",
+                                    user=f"{code}/{student}", classroom=code)
+        except Overloaded as exc:
+            st.warning(f"Lots of answers arriving at once. Please submit again in {exc.retry_after:.0f}s.")
+        else:
+            submit_classroom_answer(code, student, i, ans)
+            st.success("Submitted")
 
 # ---------------------------------------------------------
 # TEACHER CLASSROOM + COGNITIVE CARDS
 # ---------------------------------------------------------
+@timed("signsense_page_seconds")
 def teacher_classroom():
+    from backend.cloud_store import create_classroom
+
     st.header("🧑‍🏫 Insight Classroom")
 
     # -------- Classroom creation --------
@@ -279,21 +379,9 @@ def teacher_classroom():
             st.balloons()
     else:
         st.success(f"Classroom Code: {st.session_state.class_code}")
-
-        question = st.text_input("Upload Question for Students")
-        if st.button("Add Question") and question:
-            add_classroom_question(st.session_state.class_code, question)
-            st.success("Question added")
-
-        classroom = get_classroom_state(st.session_state.class_code)
-        students = classroom.get("students", {})
-
-        st.subheader("👥 Students")
-        if not students:
-            st.info("No students joined yet.")
-        else:
-            for name, data in students.items():
-                st.write(f"• {name} — {data.get('status', 'Joined')}")
+        question_form(st.session_state.class_code)
+        question_bank_search(st.session_state.class_code)
+        classroom_results(st.session_state.class_code)
 
     st.divider()
     st.subheader("🧠 Cognitive Replay")
@@ -324,11 +412,103 @@ def teacher_classroom():
 
                 st.divider()
 
+@st.fragment
+@timed("signsense_fragment_seconds")
+def question_form(code):
+    """Typing options or picking the answer key reruns only the form."""
+    from backend.cloud_store import add_classroom_question
+
+    question = st.text_input("Upload Question for Students")
+    options_text = st.text_area("Options (one per line, leave empty for free text)")
+    options = [o.strip() for o in options_text.split("\n") if o.strip()]
+    answer = None
+    if options:
+        answer = st.selectbox("Correct option", options)
+    else:
+        answer = st.text_input("Answer key (optional)") or None
+
+    if st.button("Add Question") and question:
+        add_classroom_question(code, question, options, answer)
+        st.toast("Question added")
+        st.rerun()  # results below list the new question
+
+
+@st.fragment
+@timed("signsense_fragment_seconds")
+def question_bank_search(code):
+    """Search every loaded bank and push the picked questions in one write."""
+    from backend.cloud_store import add_classroom_questions
+    from backend.search import get_question_index
+
+    index = get_question_index()
+    facets = index.facets()
+
+    with st.expander("🔎 Search question banks"):
+        query = st.text_input("Search questions, hints and explanations", key="bank_query")
+        col1, col2 = st.columns(2)
+        with col1:
+            subject = st.selectbox("Subject", ["any"] + facets["subjects"], key="bank_subject")
+        with col2:
+            difficulty = st.selectbox("Difficulty", ["any"] + facets["difficulties"], key="bank_difficulty")
+
+        hits = index.search(
+            query,
+            subject=None if subject == "any" else subject,
+            difficulty=None if difficulty == "any" else difficulty,
+            limit=25,
+        )
+        if not hits:
+            st.info("No matching questions.")
+            return
+
+        picked = []
+        for i, hit in enumerate(hits):
+            q = hit["question"]
+            label = f"{q['question']}  ·  {hit['subject']} / {hit['difficulty']}"
+            if st.checkbox(label, key=f"bank_pick_{i}_{q.get('id') or i}"):
+                picked.append(q)
+
+        if st.button(f"Push {len(picked)} selected to classroom", disabled=not picked):
+            added = add_classroom_questions(code, picked)
+            st.toast(f"Added {added} question(s)")
+            st.rerun()  # results panel lists them
+
+
+@st.fragment
+@timed("signsense_fragment_seconds")
+def classroom_results(code):
+    """Students and per-question results; refreshing re-reads only this panel."""
+    from backend.cloud_store import get_classroom_state
+
+    st.button("🔄 Refresh results", key="refresh_results")
+    classroom = get_classroom_state(code)
+    students = classroom.get("students", {})
+
+    st.subheader("👥 Students")
+    if not students:
+        st.info("No students joined yet.")
+    else:
+        for name, data in students.items():
+            st.write(f"• {name} — {data.get('status', 'Joined')} — score {data.get('score', 0)}")
+
+    st.subheader("📊 Question Results")
+    for i, q in enumerate(classroom.get("questions", [])):
+        st.markdown(f"**Q{i+1}: {q['question']}**")
+        if q["correct"] is None:
+            st.caption(f"{q['responses']} responses (no answer key)")
+        else:
+            st.caption(f"{q['correct']} / {q['responses']} correct")
+        if q["distribution"] and q["responses"]:
+            st.bar_chart(q["distribution"])
+
 # ---------------------------------------------------------
 # MAIN
 # ---------------------------------------------------------
+@timed("signsense_rerun_seconds")
 def main():
     st.set_page_config(page_title="SignSense", layout="wide")
+    start_exporter()
+    start_sweeper()
     apply_theme()
 
     page = st.sidebar.radio(
@@ -342,29 +522,30 @@ def main():
             "🤖 Admin / AI Quiz Builder",
         ],
     )
-
-    if page == "📘 Solo Quiz":
-        solo_quiz()
-    elif page == "🔁 Revision Lab":
-        engine = st.session_state.get("engine")
-        if engine:
-            render_revision_page(engine)
-        else:
-            st.info("Start a quiz first.")
-    elif page == "📊 Dashboard":
-        engine = st.session_state.get("engine")
-        if engine:
-            render_dashboard(engine)
-        else:
-            st.info("Complete a quiz first.")
-    elif page == "🎓 Student Classroom":
-        student_classroom()
-    elif page == "🧑‍🏫 Teacher Classroom":
-        teacher_classroom()
-    elif page == "🤖 Admin / AI Quiz Builder":
-        ai_quiz_builder()
-
-    render_chatbot()
+    page_name = page.split(" ", 1)[-1]
+    inc("signsense_reruns_total", page=page_name)
+
+    with profile_rerun(page_name.lower().replace(" / ", "_").replace(" ", "_")):
+        if page == "📘 Solo Quiz":
+            solo_quiz()
+        elif page == "🔁 Revision Lab":
+            engine = st.session_state.get("engine")
+            if engine:
+                load_page(page)(engine)
+            else:
+                st.info("Start a quiz first.")
+        elif page == "📊 Dashboard":
+            # leaderboards are shown even before this session's first quiz
+            load_page(page)(st.session_state.get("engine"))
+        elif page == "🎓 Student Classroom":
+            student_classroom()
+        elif page == "🧑‍🏫 Teacher Classroom":
+            teacher_classroom()
+        elif page == "🤖 Admin / AI Quiz Builder":
+            load_page(page)()
+
+        with st.sidebar:
+            render_chatbot()
 
 # ---------------------------------------------------------
 if __name__ == "__main__":
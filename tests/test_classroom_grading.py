@@ -0,0 +1,53 @@
+from backend.cloud_store import (
+    _tally_changes,
+    add_classroom_questions,
+    create_classroom,
+    get_classroom_state,
+    join_classroom,
+    submit_classroom_answer,
+)
+
+QUESTION = {"question": "2 + 2?", "options": ["3", "4", "5"], "answer": "4"}
+
+
+def test_first_answer_counts_a_response():
+    assert _tally_changes(QUESTION, None, "4") == {"responses": 1, "options.1": 1, "correct": 1, "score": 1}
+    assert _tally_changes(QUESTION, None, "3") == {"responses": 1, "options.0": 1}
+
+
+def test_answer_moving_between_options():
+    # wrong -> right: option counts move, correct and score go up, no new response
+    assert _tally_changes(QUESTION, "3", "4") == {"options.0": -1, "options.1": 1, "correct": 1, "score": 1}
+    # right -> wrong
+    assert _tally_changes(QUESTION, "4", "5") == {"options.1": -1, "options.2": 1, "correct": -1, "score": -1}
+
+
+def test_resubmitting_the_same_answer_changes_nothing():
+    assert _tally_changes(QUESTION, "4", "4") == {}
+    assert _tally_changes(QUESTION, "3", "3") == {}
+
+
+def test_unkeyed_free_text_only_counts_responses():
+    question = {"question": "Why?", "options": [], "answer": None}
+    assert _tally_changes(question, None, "because") == {"responses": 1}
+    assert _tally_changes(question, "because", "no idea") == {}
+
+
+def test_submits_keep_tallies_and_scores_consistent():
+    code = create_classroom()
+    add_classroom_questions(code, [QUESTION])
+    join_classroom(code, "amy")
+    join_classroom(code, "bo")
+
+    submit_classroom_answer(code, "amy", 0, "3")
+    submit_classroom_answer(code, "amy", 0, "4")   # moves to the right option
+    submit_classroom_answer(code, "amy", 0, "4")   # resubmit, no change
+    submit_classroom_answer(code, "bo", 0, "5")
+
+    state = get_classroom_state(code)
+    q = state["questions"][0]
+    assert q["responses"] == 2
+    assert q["correct"] == 1
+    assert q["distribution"] == {"3": 0, "4": 1, "5": 1}
+    assert state["students"]["amy"] == {"status": "Answered", "score": 1}
+    assert state["students"]["bo"]["score"] == 0
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from backend.codes import CodeAllocator, CodeSpaceExhausted
+from backend.state_backend import MemoryBackend, SQLiteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_allocator(request, tmp_path):
+    """Each call is a separate allocator; for sqlite also separate connections, as in another process."""
+    shared = MemoryBackend()
+
+    def make(size=None):
+        backend = shared if request.param == "memory" else SQLiteBackend(tmp_path / "codes.sqlite3")
+        return CodeAllocator("test", "0123456789", 4, size=size, backend=backend)
+
+    return make
+
+
+def test_concurrent_allocations_are_unique(make_allocator):
+    codes, lock = [], threading.Lock()
+
+    def work():
+        allocator = make_allocator()
+        mine = [allocator.allocate() for _ in range(200)]
+        with lock:
+            codes.extend(mine)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(codes) == 1600
+    assert len(set(codes)) == len(codes)
+
+
+def test_whole_space_is_used_before_exhaustion(make_allocator):
+    allocator = make_allocator(size=50)
+    codes = {allocator.allocate() for _ in range(50)}
+    assert len(codes) == 50
+    with pytest.raises(CodeSpaceExhausted):
+        allocator.allocate()
+
+
+def test_released_codes_are_reused_first_in_order(make_allocator):
+    allocator = make_allocator()
+    first, second, third = (allocator.allocate() for _ in range(3))
+    allocator.release(second)
+    allocator.release(first)
+    assert allocator.allocate() == second
+    assert allocator.allocate() == first
+    assert allocator.allocate() not in {first, second, third}
+
+
+def test_released_code_is_handed_out_once(make_allocator):
+    allocator = make_allocator(size=50)
+    codes = [allocator.allocate() for _ in range(50)]
+    allocator.release(codes[0])
+    assert allocator.allocate() == codes[0]
+    with pytest.raises(CodeSpaceExhausted):
+        allocator.allocate()
+
+
+def test_taken_codes_are_skipped(make_allocator):
+    allocator = make_allocator()
+    taken = {allocator.encode(0), allocator.encode(1)}
+    assert allocator.allocate(is_taken=taken.__contains__) == allocator.encode(2)
+
+
+def test_codes_have_the_configured_shape():
+    allocator = CodeAllocator("shape", "ABC", 3, prefix="CLS-", backend=MemoryBackend())
+    codes = {allocator.allocate() for _ in range(27)}
+    assert len(codes) == 27
+    assert all(c.startswith("CLS-") and len(c) == 7 and set(c[4:]) <= set("ABC") for c in codes)
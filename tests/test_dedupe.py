@@ -0,0 +1,104 @@
+import pytest
+
+from backend import dedupe, search
+from backend.dedupe import DedupeIndex, dedupe_questions, ingest_questions
+from backend.search import QuestionIndex
+
+BASE = {
+    "id": "q1",
+    "question": "What is the capital city of France?",
+    "options": ["Paris", "London", "Berlin", "Madrid"],
+    "hints": ["It is on the Seine"],
+}
+
+
+@pytest.fixture
+def fresh_indexes(monkeypatch):
+    """Empty shared search/dedupe indexes instead of the built-in banks."""
+    bank = QuestionIndex()
+    monkeypatch.setattr(search, "_index", bank)
+    monkeypatch.setattr(dedupe, "_index", DedupeIndex())
+    return bank
+
+
+def test_near_duplicate_matches_and_different_question_does_not():
+    index = DedupeIndex()
+    index.add(BASE)
+
+    reworded = dict(BASE, id="q2", question="What is the capital city of France")
+    unrelated = {"question": "Which planet is known as the red planet?", "options": ["Mars", "Venus", "Jupiter"]}
+    assert [key for key, _ in index.matches(reworded)] == ["q1"]
+    assert index.matches(reworded)[0][1] >= dedupe.THRESHOLD
+    assert index.matches(unrelated) == []
+
+
+def test_signature_is_deterministic():
+    copy = dict(BASE, id="other")
+    assert dedupe.similarity(dedupe.signature(BASE), dedupe.signature(copy)) == 1.0
+
+
+def test_replacing_an_item_drops_its_old_buckets():
+    index = DedupeIndex()
+    index.add(BASE)
+    index.add({"id": "q1", "question": "Name the largest ocean on Earth", "options": ["Pacific", "Atlantic"]})
+
+    assert len(index) == 1
+    assert index.matches(BASE) == []
+
+
+def test_merge_mode_folds_hints_into_bank_item():
+    index = DedupeIndex()
+    bank_item = dict(BASE, hints=list(BASE["hints"]))
+    index.add(bank_item)
+    dup = dict(BASE, id="q2", hints=["It is in Europe"], explanation="Paris is the capital.")
+
+    fresh, report = dedupe_questions([dup], index, mode="merge")
+    assert fresh == []
+    assert report[0]["duplicate_of"] == "q1" and not report[0]["in_batch"]
+    assert bank_item["hints"] == ["It is on the Seine", "It is in Europe"]
+    assert bank_item["explanation"] == "Paris is the capital."
+    assert "duplicate_of" not in dup
+
+
+def test_flag_mode_marks_duplicates_within_batch():
+    index = DedupeIndex()
+    first, second = dict(BASE), dict(BASE, id="q2")
+
+    fresh, report = dedupe_questions([first, second], index, mode="flag")
+    assert fresh == [first]
+    assert second["duplicate_of"] == "q1"
+    assert report[0]["in_batch"]
+    assert first["hints"] == BASE["hints"]
+
+
+def test_ingest_indexes_new_questions_and_drops_repeats_within_upload(fresh_indexes):
+    bank = fresh_indexes
+    first, repeat = dict(BASE), dict(BASE, id="q2")
+    other = {"id": "q3", "question": "Which planet is known as the red planet?", "options": ["Mars", "Venus"]}
+
+    quiz, report = ingest_questions([first, repeat, other], "geography", "pdf")
+    assert quiz == [first, other]
+    assert len(report) == 1
+    assert sorted(bank.by_key) == ["q1", "q3"]
+
+    # a second upload repeating the bank keeps the item for the quiz but does not re-index it
+    again = dict(BASE, id="q4")
+    quiz, report = ingest_questions([again], "geography", "pdf")
+    assert quiz == [again]
+    assert report[0]["duplicate_of"] == "q1" and not report[0]["in_batch"]
+    assert sorted(bank.by_key) == ["q1", "q3"]
+
+
+def test_placeholders_reach_the_quiz_but_are_never_indexed(fresh_indexes):
+    bank = fresh_indexes
+    placeholder = {
+        "question": "Dataset loaded successfully, but no MCQs detected.",
+        "options": ["Check PDF format", "Ensure MCQ structure"],
+        "answer": "Check PDF format",
+        "placeholder": True,
+    }
+
+    quiz, report = ingest_questions([placeholder], "pdf", "pdf")
+    assert quiz == [placeholder] and report == []
+    assert len(bank) == 0
+    assert len(dedupe.get_dedupe_index()) == 0
@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from backend.jobs import (CANCELLED, DONE, FAILED, PRIORITY_BULK, PRIORITY_INTERACTIVE,
+                          PRIORITY_NORMAL, QUEUED, RUNNING, JobScheduler)
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def make_scheduler():
+    """In-process (thread) schedulers; the gate is opened before they shut down."""
+    gate = threading.Event()
+    schedulers = []
+
+    def make(**kwargs):
+        scheduler = JobScheduler(processes=1, **kwargs)
+        schedulers.append(scheduler)
+        return scheduler
+
+    make.gate = gate
+    yield make
+    gate.set()
+    for scheduler in schedulers:
+        scheduler.shutdown()
+
+
+def start_blocker(scheduler, gate, owner="blocker"):
+    """Submit a job that holds a worker until the gate opens; returns once it runs."""
+    started = threading.Event()
+
+    def block():
+        started.set()
+        assert gate.wait(TIMEOUT)
+
+    job_id = scheduler.submit(block, owner=owner)
+    assert started.wait(TIMEOUT)
+    return job_id
+
+
+def test_runs_in_priority_then_submission_order(make_scheduler):
+    scheduler = make_scheduler(workers=1)
+    blocker = start_blocker(scheduler, make_scheduler.gate)
+    ran = []
+    jobs = [
+        scheduler.submit(ran.append, "bulk", priority=PRIORITY_BULK),
+        scheduler.submit(ran.append, "normal-1", priority=PRIORITY_NORMAL),
+        scheduler.submit(ran.append, "chat", priority=PRIORITY_INTERACTIVE),
+        scheduler.submit(ran.append, "normal-2", priority=PRIORITY_NORMAL),
+    ]
+    assert scheduler.stats()["queued"] == 4
+
+    make_scheduler.gate.set()
+    for job_id in [blocker] + jobs:
+        assert scheduler.wait(job_id, TIMEOUT)["state"] == DONE
+    assert ran == ["chat", "normal-1", "normal-2", "bulk"]
+
+
+def test_per_user_cap_lets_other_owners_through(make_scheduler):
+    scheduler = make_scheduler(workers=2, per_user=1)
+    first = start_blocker(scheduler, make_scheduler.gate, owner="alice")
+    second = scheduler.submit(lambda: "alice again", owner="alice", priority=PRIORITY_INTERACTIVE)
+    other = scheduler.submit(lambda: "bob", owner="bob", priority=PRIORITY_BULK)
+
+    # bob's lower-priority job takes the free worker; alice's second job waits for her first
+    assert scheduler.wait(other, TIMEOUT)["result"] == "bob"
+    assert scheduler.status(second)["state"] == QUEUED
+    assert scheduler.status(first)["state"] == RUNNING
+    assert [j["id"] for j in scheduler.jobs_for("alice")] == [first, second]
+
+    make_scheduler.gate.set()
+    assert scheduler.wait(second, TIMEOUT)["result"] == "alice again"
+    assert scheduler.jobs_for("alice") == []
+
+
+def test_cancelled_queued_job_never_runs(make_scheduler):
+    scheduler = make_scheduler(workers=1)
+    blocker = start_blocker(scheduler, make_scheduler.gate)
+    ran = []
+    cancelled = scheduler.submit(ran.append, "cancelled", priority=PRIORITY_INTERACTIVE)
+    kept = scheduler.submit(ran.append, "kept")
+
+    assert scheduler.cancel(cancelled)
+    assert scheduler.status(cancelled)["state"] == CANCELLED
+    assert not scheduler.cancel(cancelled)
+    assert not scheduler.cancel("unknown")
+
+    make_scheduler.gate.set()
+    assert scheduler.wait(blocker, TIMEOUT)["state"] == DONE
+    assert scheduler.wait(kept, TIMEOUT)["state"] == DONE
+    assert ran == ["kept"]
+    assert scheduler.stats() == {"queued": 0, "running": 0, "stored_results": 3}
+
+
+def test_cancelling_a_running_job_drops_its_result(make_scheduler):
+    scheduler = make_scheduler(workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def work():
+        started.set()
+        assert release.wait(TIMEOUT)
+        return "too late"
+
+    job_id = scheduler.submit(work)
+    assert started.wait(TIMEOUT)
+    assert scheduler.cancel(job_id)
+    release.set()
+
+    status = scheduler.wait(job_id, TIMEOUT)
+    assert status["state"] == CANCELLED and status["result"] is None
+
+
+def test_failure_is_reported(make_scheduler):
+    scheduler = make_scheduler(workers=1)
+
+    def broken():
+        raise ValueError("bad pdf")
+
+    status = scheduler.wait(scheduler.submit(broken, kind="pdf_import"), TIMEOUT)
+    assert status["state"] == FAILED
+    assert status["error"] == "ValueError: bad pdf"
+    assert status["kind"] == "pdf_import"
+
+
+def test_result_store_is_bounded(make_scheduler):
+    scheduler = make_scheduler(workers=1, capacity=2)
+    ids = [scheduler.submit(lambda i=i: i) for i in range(3)]
+    for job_id in ids:
+        scheduler.wait(job_id, TIMEOUT)
+
+    assert scheduler.status(ids[0]) is None
+    assert [scheduler.status(j)["result"] for j in ids[1:]] == [1, 2]
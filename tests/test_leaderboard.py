@@ -0,0 +1,99 @@
+import calendar
+import random
+
+import pytest
+
+from backend.leaderboard import DAY, Leaderboards, bucket_id
+from backend.state_backend import MemoryBackend, Namespace
+
+# Wednesday 2026-10-14 12:00 UTC (ISO week 2026-W42)
+NOW = calendar.timegm((2026, 10, 14, 12, 0, 0))
+SUBJECTS = ["math", "english"]
+MODES = ["standard", "isl"]
+
+
+@pytest.fixture
+def boards():
+    return Leaderboards(Namespace("leaderboard", MemoryBackend()), capacity=8)
+
+
+def synthetic_events(n, players, days, seed=0):
+    rng = random.Random(seed)
+    events = [{
+        "name": f"player{rng.randrange(players)}",
+        "score": rng.randrange(1000),
+        "mode": rng.choice(MODES),
+        "subject": rng.choice(SUBJECTS),
+        "now": NOW - rng.random() * days * DAY,
+    } for _ in range(n)]
+    events.sort(key=lambda e: e["now"])
+    return events
+
+
+def brute_force(events, k, window=None, subject=None, days=None):
+    if days is not None:
+        buckets = {bucket_id("day", NOW - d * DAY) for d in range(days)}
+    best = {}
+    for e in events:
+        if window and bucket_id(window, e["now"]) != bucket_id(window, NOW):
+            continue
+        if days is not None and bucket_id("day", e["now"]) not in buckets:
+            continue
+        if subject and e["subject"] != subject:
+            continue
+        best[e["name"]] = max(best.get(e["name"], -1), e["score"])
+    return sorted(best.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+
+
+def pairs(rows):
+    return [(r["name"], r["score"]) for r in rows]
+
+
+def test_matches_brute_force(boards):
+    # many more players than the bucket capacity, so eviction and merging are exercised
+    events = synthetic_events(3000, players=60, days=20)
+    for e in events:
+        boards.record(e["name"], e["score"], e["mode"], e["subject"], now=e["now"])
+
+    for k in (1, 5, 8):
+        assert pairs(boards.top("all", k=k, now=NOW)) == brute_force(events, k)
+        assert pairs(boards.top("all", "math", k=k, now=NOW)) == brute_force(events, k, subject="math")
+        assert pairs(boards.top("day", k=k, now=NOW)) == brute_force(events, k, window="day")
+        assert pairs(boards.top("week", k=k, now=NOW)) == brute_force(events, k, window="week")
+        for days in (1, 7, 20):
+            assert pairs(boards.top_days(days, k=k, now=NOW)) == brute_force(events, k, days=days)
+        assert pairs(boards.top_days(7, "english", k=k, now=NOW)) == \
+            brute_force(events, k, subject="english", days=7)
+
+
+def test_top_days_keeps_each_players_best_across_days(boards):
+    boards.record("ana", 50, "standard", "math", now=NOW - 2 * DAY)
+    boards.record("ana", 30, "standard", "math", now=NOW)
+    boards.record("ben", 40, "standard", "math", now=NOW - DAY)
+    boards.record("cy", 90, "standard", "math", now=NOW - 3 * DAY)
+
+    assert pairs(boards.top_days(3, now=NOW)) == [("ana", 50), ("ben", 40)]
+    assert pairs(boards.top_days(4, now=NOW)) == [("cy", 90), ("ana", 50), ("ben", 40)]
+    assert pairs(boards.top_days(1, now=NOW)) == [("ana", 30)]
+    assert pairs(boards.top_days(1000, now=NOW)) == pairs(boards.top_days(boards.day_retention, now=NOW))
+
+
+def test_prune_drops_buckets_past_retention(boards):
+    for offset in (31, 30, 14, 7, 0):
+        boards.record(f"p{offset}", offset, "standard", "math", now=NOW - offset * DAY)
+
+    windows = {}
+    for key in boards.buckets.codes():
+        window, bucket = key.split(":")[:2]
+        windows.setdefault(window, set()).add(bucket)
+
+    # the oldest kept day is NOW - (DAY_RETENTION - 1) days
+    assert windows["day"] == {"2026-09-14", "2026-09-30", "2026-10-07", "2026-10-14"}
+    # the current and the previous ISO week
+    assert windows["week"] == {"2026-W41", "2026-W42"}
+    assert windows["all"] == {"all"}
+    assert pairs(boards.top("all", k=10, now=NOW))[-1] == ("p0", 0)
+    assert pairs(boards.top_days(31, k=1, now=NOW)) == [("p30", 30)]
+
+    assert boards.prune(NOW + DAY) == 4   # 2026-09-14, one per subject/mode slice
+    assert boards.prune(NOW + DAY) == 0
@@ -0,0 +1,31 @@
+import time
+
+from backend.cloud_store import create_classroom
+from backend.codes import CLASSROOM_CODES, ROOM_CODES
+from backend.lifecycle import LifecycleManager
+from live import live_sync
+
+
+def test_expiring_a_classroom_twice_releases_its_code_once(tmp_path):
+    manager = LifecycleManager(archive_dir=tmp_path)
+    code = create_classroom()
+    now = time.time()
+
+    manager.expire("classroom", code, now)
+    manager.expire("classroom", code, now)   # another process / later sweep
+
+    first, second = CLASSROOM_CODES.allocate(), CLASSROOM_CODES.allocate()
+    assert first != second
+
+
+def test_expiring_a_room_twice_releases_its_code_once(tmp_path):
+    manager = LifecycleManager(archive_dir=tmp_path)
+    code = ROOM_CODES.allocate()
+    live_sync.room_path(code).write_text("{}", encoding="utf-8")
+    now = time.time()
+
+    manager.expire("room", code, now)
+    manager.expire("room", code, now)
+
+    first, second = ROOM_CODES.allocate(), ROOM_CODES.allocate()
+    assert first != second
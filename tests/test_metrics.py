@@ -0,0 +1,23 @@
+import threading
+
+from monitoring import metrics
+
+
+def test_exited_thread_buffers_are_retired_and_totals_kept():
+    def work():
+        metrics.inc("test_retire_total")
+        metrics.observe("test_retire_seconds", 0.01)
+
+    for _ in range(50):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    counters, histograms = metrics.snapshot()
+    assert len(metrics._buffers) <= threading.active_count()
+    assert counters[("test_retire_total", ())] == 50
+    assert sum(histograms[("test_retire_seconds", ())][:-1]) == 50
+
+    # a second snapshot does not count the retired buffers twice
+    counters, _ = metrics.snapshot()
+    assert counters[("test_retire_total", ())] == 50
@@ -0,0 +1,28 @@
+import pytest
+
+from backend.logic import QuizEngine
+from backend.profile_store import ProfileStore
+
+
+class FailingEngine(QuizEngine):
+    def to_state(self):
+        raise RuntimeError("serialization failed")
+
+
+def test_failed_checkpoint_rolls_back_and_later_writes_still_work(tmp_path):
+    store = ProfileStore(tmp_path / "profiles.sqlite3")
+    engine = QuizEngine("standard", "math")
+    store.start_session("amy", engine)
+
+    broken = FailingEngine.__new__(FailingEngine)
+    broken.__dict__.update(engine.__dict__)
+    with pytest.raises(RuntimeError):
+        store.checkpoint("amy", broken)
+    assert not store._conn.in_transaction
+
+    engine.check_answer("x")
+    engine.next_question()
+    store.checkpoint("amy", engine)
+    restored = store.restore("amy")
+    assert restored.current_index == 1
+    assert len(restored.history) == 1
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from websockets.sync.client import connect
+
+from live import room_client
+from live.room_server import RoomServer
+
+
+@pytest.fixture
+def server_url(tmp_path):
+    server = RoomServer(tmp_path)
+    ready = threading.Event()
+    loop = asyncio.new_event_loop()
+    tasks = []
+
+    async def run():
+        started = asyncio.Event()
+        tasks.append(asyncio.create_task(server.serve("127.0.0.1", 0, started)))
+        await started.wait()
+        ready.set()
+        try:
+            await tasks[0]
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=lambda: loop.run_until_complete(run()), daemon=True)
+    thread.start()
+    assert ready.wait(10)
+    yield f"ws://127.0.0.1:{server.port}"
+    room_client._drop_connection()
+    loop.call_soon_threadsafe(tasks[0].cancel)
+    thread.join(5)
+    loop.close()
+
+
+def test_create_join_answer_subscribe(server_url):
+    room = room_client.create_room(server_url)
+    code = room["code"]
+    assert room["players"] == {}
+
+    joined = room_client.join_room(server_url, code, "amy")
+    assert joined["players"] == 1
+    assert room_client.join_room(server_url, code, "amy")["players"] == 1   # idempotent
+
+    with connect(server_url) as watcher:
+        watcher.send(json.dumps({"op": "subscribe", "code": code, "id": "w1"}))
+        reply = json.loads(watcher.recv(timeout=3))
+        assert reply["ok"] and reply["id"] == "w1" and reply["room"]["code"] == code
+
+        room_client.control_room(server_url, code, "start")
+        assert json.loads(watcher.recv(timeout=3))["event"] == "state"
+
+        player = room_client.submit_answer(server_url, code, "amy", 0, "4", correct_answer="4")
+        assert player["answers"]["0"] == "4"
+
+        # answer bursts are coalesced into one tally push
+        event = json.loads(watcher.recv(timeout=3))
+        assert event["event"] == "tally"
+        assert event["room"]["tally"]
+
+    assert room_client.get_room(server_url, code)["players"]["amy"]["answers"] == {"0": "4"}
+
+
+def test_unknown_room_gets_an_error_reply(server_url):
+    with pytest.raises(room_client.RoomServerError, match="Room not found"):
+        room_client.join_room(server_url, "00000", "amy")
+    assert room_client.get_room(server_url, "00000") is None
+
+    with pytest.raises(room_client.RoomServerError, match="Player not in room"):
+        code = room_client.create_room(server_url)["code"]
+        room_client.submit_answer(server_url, code, "ghost", 0, "4")
+
+
+def test_failed_request_closes_its_connection(server_url, monkeypatch):
+    room_client.get_room(server_url, "00000")
+    conn = room_client._local.conn
+
+    def broken_send(payload):
+        raise OSError("network down")
+
+    monkeypatch.setattr(conn, "send", broken_send)
+    room_client.create_room(server_url)          # retried on a fresh connection
+    assert room_client._local.conn is not conn
+    with pytest.raises(Exception):
+        conn.recv(timeout=0.1)                   # the old socket was closed
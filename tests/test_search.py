@@ -0,0 +1,71 @@
+from backend.search import QuestionIndex
+
+
+def question(qid, text, difficulty="easy", **extra):
+    return {"id": qid, "question": text, "difficulty": difficulty, **extra}
+
+
+def keys(hits):
+    return [hit["question"]["id"] for hit in hits]
+
+
+def make_index():
+    index = QuestionIndex()
+    index.add_many([
+        question("m1", "Solve the quadratic equation x squared minus four"),
+        question("m2", "Find the area of a triangle", difficulty="hard"),
+        question("m3", "Factor the quadratic expression", difficulty="hard"),
+    ], "math")
+    index.add_many([
+        question("e1", "Choose the correct past tense verb"),
+        question("e2", "Which word is a quadratic adjective", difficulty="hard"),
+    ], "english")
+    return index
+
+
+def test_ranks_by_term_matches():
+    index = make_index()
+    hits = index.search("quadratic equation")
+    assert keys(hits)[0] == "m1"
+    assert set(keys(hits)) == {"m1", "m3", "e2"}
+    assert hits[0]["score"] > hits[1]["score"] > 0
+
+
+def test_subject_and_difficulty_filters():
+    index = make_index()
+    assert set(keys(index.search("quadratic", subject="math"))) == {"m1", "m3"}
+    assert keys(index.search("quadratic", subject="MATH", difficulty="hard")) == ["m3"]
+    assert keys(index.search("quadratic", subject="history")) == []
+    # no query terms: browse by filter
+    assert keys(index.search("", difficulty="hard")) == ["m2", "m3", "e2"]
+    assert index.facets() == {"subjects": ["english", "math"], "difficulties": ["easy", "hard"]}
+
+
+def test_replacing_a_question_reindexes_it():
+    index = make_index()
+    index.add(question("m1", "Convert the fraction to a decimal", difficulty="medium"), "math")
+
+    assert len(index) == 5
+    assert "m1" not in keys(index.search("equation"))
+    assert keys(index.search("fraction decimal")) == ["m1"]
+    assert keys(index.search("", difficulty="easy", subject="math")) == []
+    assert keys(index.search("", difficulty="medium")) == ["m1"]
+    assert index.df["equation"] == 0 and index.df["fraction"] == 1
+
+
+def test_questions_without_id_are_keyed_by_text():
+    index = QuestionIndex()
+    index.add({"question": "What is two plus two", "explanation": "first"}, "math")
+    index.add({"question": "What is two plus two", "explanation": "second"}, "math")
+
+    hits = index.search("two plus")
+    assert len(index) == 1
+    assert [h["question"]["explanation"] for h in hits] == ["second"]
+
+
+def test_set_difficulty_moves_filter_bucket():
+    index = make_index()
+    assert index.set_difficulty("m1", "Hard")
+    assert not index.set_difficulty("missing", "hard")
+    assert set(keys(index.search("quadratic", difficulty="hard"))) == {"m1", "m3", "e2"}
+    assert keys(index.search("", difficulty="easy")) == ["e1"]
@@ -0,0 +1,60 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sign import recognizer
+from sign.recognizer import DIM, SignIndex
+from sign.train_embeddings import EmptyVocabularyError, compile_vocabulary
+
+SCRIPT = Path(__file__).resolve().parents[1] / "src" / "sign" / "train_embeddings.py"
+
+
+def write_recording(folder: Path, name: str, label: str, seed: int):
+    frames = np.random.default_rng(seed).normal(size=(5, DIM)).tolist()
+    (folder / name).write_text(json.dumps({"label": label, "frames": frames}), encoding="utf-8")
+
+
+def test_empty_compile_is_refused_and_current_is_kept(tmp_path):
+    recordings, out = tmp_path / "recordings", tmp_path / "signs"
+    recordings.mkdir()
+    write_recording(recordings, "a.json", "A", 0)
+    good = compile_vocabulary(recordings, out)
+
+    for path in recordings.iterdir():
+        path.unlink()
+    (recordings / "broken.json").write_text("not json", encoding="utf-8")
+    for mode in ("recording", "label"):
+        with pytest.raises(EmptyVocabularyError):
+            compile_vocabulary(recordings, out, mode=mode)
+
+    assert (out / "CURRENT").read_text(encoding="utf-8") == good["version"]
+    assert sorted(p.name for p in out.iterdir() if p.is_dir()) == [good["version"]]
+
+
+def test_cli_exits_non_zero_on_empty_folder(tmp_path):
+    (tmp_path / "recordings").mkdir()
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), str(tmp_path / "recordings"), "--out", str(tmp_path / "signs")],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 1
+    assert not (tmp_path / "signs" / "CURRENT").exists()
+
+
+def test_sign_index_rejects_empty_vocabulary():
+    with pytest.raises(ValueError):
+        SignIndex(np.zeros((0, DIM), dtype=np.float32), [], normalized=True)
+
+
+def test_get_sign_index_is_none_for_an_empty_vocabulary(tmp_path, monkeypatch):
+    np.save(tmp_path / "embeddings.npy", np.zeros((0, DIM), dtype=np.float32))
+    (tmp_path / "labels.txt").write_text("", encoding="utf-8")
+    monkeypatch.setattr(recognizer, "current_vocabulary_dir", lambda: tmp_path)
+    monkeypatch.setattr(recognizer, "_index_loaded", False)
+    monkeypatch.setattr(recognizer, "_index", None)
+
+    assert recognizer.get_sign_index() is None
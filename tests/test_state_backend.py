@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from backend.state_backend import MemoryBackend, Namespace, ShardedBackend, SQLiteBackend
+
+THREADS = 8
+PER_THREAD = 100
+
+
+@pytest.fixture(params=["memory", "sqlite", "sharded"])
+def make_backend(request, tmp_path):
+    """Returns a factory; for sqlite each call is a separate connection set, as in another process."""
+    if request.param == "memory":
+        backend = MemoryBackend()
+        return lambda: backend
+    if request.param == "sqlite":
+        return lambda: SQLiteBackend(tmp_path / "state.sqlite3")
+    return lambda: ShardedBackend([SQLiteBackend(tmp_path / "a.sqlite3"),
+                                   SQLiteBackend(tmp_path / "b.sqlite3")])
+
+
+def run_threads(target, n=THREADS):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_concurrent_updates_are_not_lost(make_backend):
+    def work(i):
+        backend = make_backend()
+        for _ in range(PER_THREAD):
+            backend.update("counter", lambda v: (v or 0) + 1)
+            backend.update("seen", lambda v: sorted(set(v or []) | {i}))
+
+    run_threads(work)
+    backend = make_backend()
+    assert backend.get("counter") == THREADS * PER_THREAD
+    assert backend.get("seen") == list(range(THREADS))
+
+
+def test_incr_is_atomic(make_backend):
+    run_threads(lambda i: [make_backend().incr("n") for _ in range(PER_THREAD)])
+    assert make_backend().get("n") == THREADS * PER_THREAD
+
+
+def test_update_returning_none_leaves_the_key(make_backend):
+    backend = make_backend()
+    backend.set("k", {"a": 1})
+    assert backend.update("k", lambda v: None) is None
+    assert backend.get("k") == {"a": 1}
+    assert backend.update("missing", lambda v: None) is None
+    assert backend.get("missing") is None
+
+
+def test_delete_reports_whether_the_key_existed(make_backend):
+    backend = make_backend()
+    backend.set("k", 1)
+    assert backend.delete("k") is True
+    assert backend.delete("k") is False
+
+
+def test_lists_are_fifo_and_each_item_pops_once(make_backend):
+    backend = make_backend()
+    for i in range(THREADS * PER_THREAD):
+        backend.push("q", i)
+    popped = []
+    lock = threading.Lock()
+
+    def work(_):
+        mine = make_backend()
+        while True:
+            item = mine.pop("q")
+            if item is None:
+                return
+            with lock:
+                popped.append(item)
+
+    run_threads(work)
+    assert sorted(popped) == list(range(THREADS * PER_THREAD))
+    assert backend.pop("q") is None
+
+
+def test_namespace_keys_are_prefixed(make_backend):
+    backend = make_backend()
+    rooms = Namespace("room", backend)
+    rooms.set("123", {"x": 1})
+    Namespace("other", backend).set("456", 1)
+    assert rooms.codes() == ["123"]
+    assert "123" in rooms and "456" not in rooms
+    assert backend.get("room:123") == {"x": 1}